@@ -1,9 +1,10 @@
 import json
+import logging
 import os
 import sys
 import threading
 import time
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 import pytz
 import requests
@@ -12,13 +13,27 @@ from PySide6.QtCore import QRect, Qt, QSize, QPropertyAnimation, QTimer, QTime,
 from PySide6.QtGui import QPixmap, QCursor, QColor, QFont, QIcon
 from PySide6.QtSvgWidgets import QSvgWidget
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QPushButton, QLabel, QVBoxLayout, QStackedWidget, QSpacerItem, \
-    QSizePolicy, QButtonGroup, QGraphicsOpacityEffect, QTimeEdit, QGraphicsDropShadowEffect, QScrollArea
-from deepdiff import DeepDiff
+    QSizePolicy, QButtonGroup, QGraphicsOpacityEffect, QTimeEdit, QGraphicsDropShadowEffect, QLineEdit, QTableView, \
+    QHeaderView
 
 from sd_qt.sd_desktop.ThemeManager import ThemeManager
 from sd_qt.sd_desktop.checkBox import CustomCheckBox
 from sd_qt.sd_desktop.toggleSwitch import SwitchControl
-from sd_qt.sd_desktop.util import retrieve_settings, credentials, add_settings, get_events
+from sd_qt.sd_desktop import client, metrics
+from sd_qt.sd_desktop.activity_list import ActivityDelegate, ActivityModel
+from sd_qt.sd_desktop.aggregates import format_duration, usage_aggregates
+from sd_qt.sd_desktop.client import response_cache
+from sd_qt.sd_desktop.credential_store import credential_store
+from sd_qt.sd_desktop.history import day_history
+from sd_qt.sd_desktop.rollover import day_rollover
+from sd_qt.sd_desktop.schedule_diff import ScheduleTracker
+from sd_qt.sd_desktop.scheduler import task_scheduler
+from sd_qt.sd_desktop.settings_queue import settings_writer
+from sd_qt.sd_desktop.snapshot import pack_rows, unpack_rows
+from sd_qt.sd_desktop.sync_helper import sync_helper
+from sd_qt.sd_desktop.timeline import TimelineWidget
+from sd_qt.sd_desktop.util import retrieve_settings, credentials, add_settings, get_events, settings_path, \
+    patch_settings, cached_rows, day_bounds_utc, events_day, today_rows
 
 base_path = os.path.abspath(os.path.join(__file__, "../../.."))
 resources_path = os.path.join(base_path, "sd_qt", "sd_desktop", "resources")
@@ -26,7 +41,7 @@ resources_path = os.path.join(base_path, "sd_qt", "sd_desktop", "resources")
 darkTheme = os.path.join(resources_path, "DarkTheme")
 lightTheme = os.path.join(resources_path, "LightTheme")
 
-host = "http://localhost:7600/api"
+logger = logging.getLogger(__name__)
 
 class TransparentLabel(QLabel):
 
@@ -55,11 +70,13 @@ class PageLoaderRunnable(QRunnable):
 class Dashboard(QWidget):
     signout_signal = Signal()
 
-    def __init__(self, signout):
+    def __init__(self, signout, snapshot=None):
         super().__init__()
         self.theme_manager = ThemeManager()
         self.theme_manager.theme_Changed.connect(self.change_theme)
         self.signout = signout
+        self.snapshot = snapshot or {}
+        self.sidebar_buttons = {}
 
         self.horizontalLayout = QHBoxLayout(self)
         self.horizontalLayout.setContentsMargins(0, 0, 0, 0)
@@ -77,6 +94,13 @@ class Dashboard(QWidget):
         # Automatically load all pages once when the Dashboard is initialized
         self.startBackgroundPageLoading()
 
+        # Reopen the page that was showing when the last session ended
+        page_index = self.snapshot.get("page", 0)
+        if page_index in self.sidebar_buttons:
+            self.sidebar_buttons[page_index].setChecked(True)
+            self.onButtonClicked(page_index)
+        self.snapshot = None
+
     def setupSidebar(self):
         self.sidebar = QWidget(parent=self)
         self.sidebar.setFixedSize(QSize(220, 600))
@@ -156,6 +180,8 @@ class Dashboard(QWidget):
         button.setStyleSheet(self.getButtonStyleSheet())
         button.setCheckable(True)
         button.clicked.connect(lambda: self.onButtonClicked(page_index))
+        if page_index >= 0:
+            self.sidebar_buttons[page_index] = button
         return button
 
     def createButton(self, text, icon_path, height):
@@ -234,7 +260,7 @@ class Dashboard(QWidget):
         if page_name in self.pages and self.pages[page_name] is not None:
             self.stackedWidget.setCurrentIndex(page_index)
         else:
-            print(f"Error: Page '{page_name}' not loaded.")
+            logger.error("Page '%s' not loaded.", page_name)
 
     def setupStack(self):
         self.stackedWidget = QStackedWidget(parent=self)
@@ -261,7 +287,7 @@ class Dashboard(QWidget):
         start_time = time.time()  # Start timing
 
         if page_name == 'Activities':
-            self.pages['Activities'] = ActivitiesPage(self.theme_manager)
+            self.pages['Activities'] = ActivitiesPage(self.theme_manager, self.snapshot.get("activities"))
             self.stackedWidget.addWidget(self.pages['Activities'])
         elif page_name == 'GeneralSettings':
             self.pages['GeneralSettings'] = GeneralSettingsWidget()
@@ -279,6 +305,10 @@ class Dashboard(QWidget):
     def onButtonClicked(self, page_index):
         self.stackedWidget.setCurrentIndex(page_index)
 
+    def snapshot_state(self):
+        """What the next start needs to reopen the dashboard as it is now; see snapshot.py."""
+        return {"page": self.stackedWidget.currentIndex(), "activities": self.pages['Activities'].snapshot_state()}
+
     def change_theme(self):
         theme = self.theme_manager.get_theme()
         stacked_widget_background, app_logo = self.getThemeColors(theme)
@@ -336,23 +366,40 @@ class Dashboard(QWidget):
 
 
 class ActivitiesPage(QWidget):
-    def __init__(self, theme_manager):
+    def __init__(self, theme_manager, snapshot=None):
         super().__init__()
         self.theme_manager = theme_manager
-        self.displayed_events = set()
-        self.current_index = 0
-        self.scrollAreaWidgetContents = QWidget()
+        self.current_day = date.today()
+        self.snapshot_ids = None  # Ids of rows shown from the snapshot until the first refresh
+        self.pending_scroll = None
 
         # Connect theme change signal to style update method
         self.theme_manager.theme_Changed.connect(self.update_events_style)
 
-        # Set up a timer for periodic updates
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.add_dynamic_blocks)
-        self.timer.start(30000)  # Update every 30 seconds
+        # Past days are loaded in the background and kept in a bounded LRU
+        self.history = day_history()
+        self.history.day_loaded.connect(self.on_day_loaded)
+
+        # At local midnight the page moves on to the new day and the refresh archives the old one
+        day_rollover().day_changed.connect(self.on_day_changed)
+
+        # With the sync helper process running, today's rows arrive from it instead
+        self.sync_helper = sync_helper()
+        self.live_day = None
+        self.live_rows = {}  # Row id -> today's row as last received from the helper
+        self.live_totals = []
+        if self.sync_helper:
+            self.sync_helper.rows_received.connect(self.on_helper_rows)
+            self.sync_helper.totals_received.connect(self.on_helper_totals)
+            self.sync_helper.refresh(full=True)
+        else:
+            # Fetch events every 30 seconds on a worker thread and render them here, starting right away
+            task_scheduler().add_job("activities_refresh", get_events, 30, priority=5, blocking=True,
+                                     on_done=self.add_dynamic_blocks, owner=self, run_now=True)
 
         # Initialize UI components
         self.init_ui()
+        self.restore_snapshot(snapshot)
 
     def init_ui(self):
         # Header for the Activities page
@@ -363,42 +410,244 @@ class ActivitiesPage(QWidget):
         font.setWeight(QtGui.QFont.Weight.Bold)
         self.Activites_header.setFont(font)
 
+        # Filters the list on every keystroke through the model's search index
+        self.search_box = QLineEdit(self)
+        self.search_box.setGeometry(330, 22, 240, 32)
+        self.search_box.setPlaceholderText("Search apps and windows")
+        self.search_box.setClearButtonEnabled(True)
+
         # Date display widget
         self.Date_display = QWidget(self)
         self.Date_display.setGeometry(10, 70, 560, 51)
 
         self.Day = TransparentLabel("Today", self.Date_display)
-        self.Day.setGeometry(22, 15, 58, 20)
+        self.Day.setGeometry(22, 15, 200, 20)
         font.setPointSize(14 if sys.platform == "darwin" else 10)
         self.Day.setFont(font)
 
-        # Scroll area for event blocks
-        self.scrollArea = QScrollArea(self)
-        self.scrollArea.setGeometry(10, 120, 560, 460)
-        self.scrollArea.setWidgetResizable(True)
-
-        self.scrollAreaWidgetContents.setGeometry(0, 0, 560, 460)
-        self.main_layout = QVBoxLayout(self.scrollAreaWidgetContents)
-        self.main_layout.setContentsMargins(12, 5, 10, 5)
+        # Time tracked on the shown day, read from the usage aggregates
+        self.summary = TransparentLabel(self.Date_display)
+        self.summary.setGeometry(230, 15, 150, 20)
+        self.summary.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+        # Switch between the list and the timeline
+        self.view_button = QPushButton("Timeline", self.Date_display)
+        self.view_button.setGeometry(390, 10, 70, 30)
+        self.view_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.view_button.clicked.connect(self.toggle_view)
+
+        # Day navigator
+        self.previous_day_button = QPushButton("<", self.Date_display)
+        self.previous_day_button.setGeometry(470, 10, 30, 30)
+        self.previous_day_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.previous_day_button.setToolTip("Previous day")
+        self.previous_day_button.clicked.connect(lambda: self.show_day(self.current_day - timedelta(days=1)))
+
+        self.next_day_button = QPushButton(">", self.Date_display)
+        self.next_day_button.setGeometry(510, 10, 30, 30)
+        self.next_day_button.setCursor(QCursor(Qt.PointingHandCursor))
+        self.next_day_button.setToolTip("Next day")
+        self.next_day_button.setEnabled(False)
+        self.next_day_button.clicked.connect(lambda: self.show_day(self.current_day + timedelta(days=1)))
+
+        # Event rows, painted by the delegate. A one-column table with fixed row heights rather
+        # than a QListView, which lays out every row through the model on each reset
+        self.model = ActivityModel(self)
+        self.delegate = ActivityDelegate(self)
+        self.list_view = QTableView(self)
+        self.list_view.setGeometry(10, 120, 560, 460)
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.horizontalHeader().hide()
+        self.list_view.horizontalHeader().setStretchLastSection(True)
+        self.list_view.verticalHeader().hide()
+        self.list_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.list_view.verticalHeader().setDefaultSectionSize(ActivityDelegate.card_height + ActivityDelegate.spacing)
+        self.list_view.setShowGrid(False)
+        self.list_view.setVerticalScrollMode(QTableView.ScrollPerPixel)
+        self.list_view.setSelectionMode(QTableView.NoSelection)
+        self.list_view.setFocusPolicy(Qt.NoFocus)
+        self.search_box.textChanged.connect(self.model.set_filter)
+
+        # Alternative view: the whole day on one time axis
+        self.timeline = TimelineWidget(self)
+        self.timeline.setGeometry(10, 120, 560, 460)
+        self.timeline.hide()
+        self.set_timeline_day(self.current_day)
+
+    def add_dynamic_blocks(self, event_data):
+        if event_data is None:
+            # The refresh failed; keep showing the current rows until the next one succeeds
+            return
+        if self.current_day != date.today():
+            # Browsing history; the live refresh keeps filling the cache and is shown on return
+            return
+        start = time.perf_counter()
+        if event_data and events_day() != self.current_day:
+            # Rows of the day that just ended, from a refresh that started before midnight
+            task_scheduler().run_now("activities_refresh")
+            return
+        if event_data and self.snapshot_ids is not None:
+            # The first refresh since a warm start; rows from the snapshot that it
+            # doesn't know of are stale, so rebuild the list from the refresh instead
+            if not self.snapshot_ids.issubset(row['id'] for row in event_data):
+                self.clear_blocks()
+            self.snapshot_ids = None
+        # Add new events to the layout
+        if event_data:
+            self.show_blocks(event_data)
+        else:
+            self.update_events_style()  # Apply theme styles
+        self.update_summary()
+        metrics.observe("activities_refresh", time.perf_counter() - start)
+
+    def on_helper_rows(self, day, rows, reset):
+        if reset or day != self.live_day:
+            self.live_day = day
+            self.live_rows = {}
+        self.live_rows.update((row['id'], row) for row in rows)
+        if day != self.current_day:
+            return
+        if reset and self.snapshot_ids is None:
+            self.clear_blocks()
+        self.show_blocks(rows)
 
-        # Set the alignment to align items at the top
-        self.main_layout.setAlignment(Qt.AlignTop)
+    def on_helper_totals(self, day, totals):
+        # Totals end each batch of rows from the helper
+        if day != self.live_day:
+            return
+        self.live_totals = totals
+        if day != self.current_day:
+            return
+        if self.snapshot_ids is not None:
+            if not self.snapshot_ids.issubset(self.live_rows):
+                self.clear_blocks()
+                self.show_blocks(list(self.live_rows.values()))
+            self.snapshot_ids = None
+        self.update_summary()
+
+    def refresh_today(self):
+        if self.sync_helper:
+            self.sync_helper.refresh()
+        else:
+            task_scheduler().run_now("activities_refresh")
 
-        self.scrollArea.setWidget(self.scrollAreaWidgetContents)
+    def restore_snapshot(self, state):
+        """Show the rows saved when the last session ended, if they are today's."""
+        if not state or state.get("day") != date.today().isoformat() or state.get("gap") != today_rows.gap:
+            return
+        rows = unpack_rows(state.get("rows") or [])
+        if rows:
+            self.show_blocks(rows)
+            self.snapshot_ids = {row['id'] for row in rows}
+            self.pending_scroll = state.get("scroll")
+        if state.get("view") == "timeline":
+            self.toggle_view()
+
+    def snapshot_state(self):
+        """Today's rendered rows and how they were being viewed."""
+        if self.sync_helper:
+            day, rows = self.live_day, list(self.live_rows.values())
+        else:
+            day, rows = events_day(), cached_rows() or ()
+        return {
+            "day": day.isoformat() if day else None,
+            "gap": today_rows.gap,
+            "rows": pack_rows(rows),
+            "scroll": self.list_view.verticalScrollBar().value() if self.current_day == date.today() else 0,
+            "view": "list" if self.timeline.isHidden() else "timeline",
+        }
 
-    def add_dynamic_blocks(self):
-        event_data = get_events()
-        # Add new events to the layout
-        if event_data:
-            for event in event_data:
-                if event['id'] not in self.displayed_events:
-                    color = self.get_next_color()
-                    event_widget = self.create_event_widget(event, color)
-                    self.main_layout.addWidget(event_widget)
-                    self.displayed_events.add(event['id'])
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.pending_scroll:
+            # The scroll range is only known once the view has been laid out
+            scroll, self.pending_scroll = self.pending_scroll, None
+            QTimer.singleShot(0, lambda: self.list_view.verticalScrollBar().setValue(scroll))
+
+    def show_day(self, day):
+        """Switch the list to the local date `day`; past days come from the history cache."""
+        today = date.today()
+        day = min(day, today)
+        self.current_day = day
+        self.Day.setText(self.day_label(day, today))
+        self.next_day_button.setEnabled(day < today)
+        self.clear_blocks()
+        self.set_timeline_day(day)
+
+        if day == today:
+            if self.sync_helper:
+                self.show_blocks(list(self.live_rows.values()) if self.live_day == today else [])
+                self.update_summary()
+            else:
+                self.add_dynamic_blocks((cached_rows() if events_day() == today else None) or [])
+            self.refresh_today()
+            return
 
+        events = self.history.cached(day)
+        if events is not None:
+            self.show_blocks(events)
+        # A day cached from the store while the server was down is loaded again
+        self.history.request(day)
+        self.update_summary()
+        self.history.prefetch_around(day)
+
+    def on_day_changed(self, finished, today):
+        if self.current_day == finished:
+            # Follow the clock onto the new day; the refresh this triggers archives the finished one
+            self.show_day(today)
+        else:
+            self.Day.setText(self.day_label(self.current_day, today))
+            self.next_day_button.setEnabled(True)
+
+    def on_day_loaded(self, day, events):
+        if day == self.current_day:
+            self.show_blocks(events)
+            self.update_summary()
+
+    def update_summary(self):
+        if self.sync_helper and self.current_day == self.live_day:
+            totals = self.live_totals
+        elif self.current_day == date.today():
+            totals = usage_aggregates().day_totals(self.current_day)
+        else:
+            # The shared aggregates only hold today; past days' totals come with their history
+            totals = self.history.cached_totals(self.current_day) or []
+        if not totals:
+            self.summary.setText("")
+            self.summary.setToolTip("")
+            return
+        top_app, top_seconds = totals[0]
+        self.summary.setText(f"{format_duration(sum(seconds for _, seconds in totals))} · "
+                             f"{self.truncate_text(top_app, 16)} {format_duration(top_seconds)}")
+        self.summary.setToolTip("\n".join(f"{app}: {format_duration(seconds)}" for app, seconds in totals[:15]))
+
+    def day_label(self, day, today):
+        if day == today:
+            return "Today"
+        if day == today - timedelta(days=1):
+            return "Yesterday"
+        return day.strftime("%A, %d %B %Y")
+
+    def toggle_view(self):
+        timeline = not self.timeline.isVisible()
+        self.timeline.setVisible(timeline)
+        self.list_view.setVisible(not timeline)
+        self.view_button.setText("List" if timeline else "Timeline")
+
+    def set_timeline_day(self, day):
+        start, end = day_bounds_utc(day)
+        self.timeline.set_range(start.replace(tzinfo=pytz.utc).timestamp(), end.replace(tzinfo=pytz.utc).timestamp())
+
+    def show_blocks(self, events):
+        """Add new rows and update the time of rows that grew."""
+        self.timeline.update_events(events)
+        self.model.update_rows(events)
         self.update_events_style()  # Apply theme styles
 
+    def clear_blocks(self):
+        self.model.clear()
+
     def listView(self, events):
         list_view_events = []
         local_tz = datetime.now().astimezone().tzinfo
@@ -418,69 +667,18 @@ class ActivitiesPage(QWidget):
             list_view_events.append(formatted_event)
         return list_view_events
 
-    def create_event_widget(self, event, color):
-        event_widget = QWidget(self.scrollAreaWidgetContents)
-        event_widget.setFixedSize(525, 60)
-
-        # Store colors as properties on the widget
-        event_widget.setProperty('light_color', color['light_color'])
-        event_widget.setProperty('dark_color', color['dark_color'])
-
-        application_name = TransparentLabel(event_widget)
-        application_name.setGeometry(17, 15, 420, 30)
-        truncated_text = self.truncate_text(event['app'], 50)
-        application_name.setText(truncated_text)
-        if len(event['app']) > 50:
-            application_name.setToolTip(event['app'])
-
-        time_label = TransparentLabel(event_widget)
-        time_label.setGeometry(425, 15, 261, 30)
-        time_label.setText(event['time'])
-
-        return event_widget
-
     def update_events_style(self):
-        current_theme = self.theme_manager.get_theme()
-        for event_widget in self.scrollAreaWidgetContents.findChildren(QWidget):
-            light_color = event_widget.property('light_color')
-            dark_color = event_widget.property('dark_color')
-
-            # Choose color based on theme
-            bg_color = dark_color if current_theme == 'dark' else light_color
-            text_color = "white" if current_theme == 'dark' else "black"
-
-            stylesheet = (
-                "QWidget {"
-                f"background-color: {bg_color};"
-                "border-radius: 5px;"
-                f"color: {text_color};"
-                "}"
-            )
-            event_widget.setStyleSheet(stylesheet)
+        self.delegate.dark = self.theme_manager.get_theme() == 'dark'
+        self.list_view.viewport().update()
 
     def truncate_text(self, text, max_length):
         return text[:max_length] + "..." if len(text) > max_length else text
 
-    def get_next_color(self):
-        light_colors = [
-            "#F5E9DA", "#E8C6E6", "#CDC8EF", "#C0D8EC", "#C8E0FF", "#E2F0D6"
-        ]
-        dark_colors = [
-            "#443C32", "#271726", "#29263B", "#0E1E2B", "#111D2C", "#20261B"
-        ]
-
-        colors = {
-            "light_color": light_colors[self.current_index % len(light_colors)],
-            "dark_color": dark_colors[self.current_index % len(dark_colors)]
-        }
-        self.current_index = (self.current_index + 1) % len(light_colors)
-        return colors
-
     def get_credentials(self):
         try:
             return credentials()  # Assumes a function returning credentials
         except Exception as e:
-            print(f"Error retrieving credentials: {e}")
+            logger.error("Error retrieving credentials: %s", e)
             return None
 
     def change_theme(self, theme_settings):
@@ -491,14 +689,14 @@ class ActivitiesPage(QWidget):
                         border-bottom-left-radius: 0px;
                         border-bottom-right-radius: 0px;
                     """)
-        self.scrollArea.setStyleSheet(f"""
+        self.list_view.setStyleSheet(f"""
                         border: None;
                         background-color: {theme_settings.get("scroll_background")};
                         border-bottom-left-radius: 10px;
                         border-bottom-right-radius: 10px;
                     """)
         self.Day.setStyleSheet("background: transparent;")
-        self.scrollArea.verticalScrollBar().setStyleSheet(f"""
+        self.list_view.verticalScrollBar().setStyleSheet(f"""
                         QScrollBar:vertical {{
                             background: {theme_settings.get("scroll_background")};
                             width: 5px;
@@ -524,6 +722,8 @@ class ActivitiesPage(QWidget):
 
 
 class GeneralSettingsWidget(QWidget):
+    settings_revalidated = Signal(dict)
+
     def __init__(self):
         super().__init__()
 
@@ -541,12 +741,18 @@ class GeneralSettingsWidget(QWidget):
         self._setup_version_section()
         self.load_settings()
 
+        # Refresh the switches when a background revalidation brings newer settings
+        self.settings_revalidated.connect(self.apply_revalidated_settings)
+        notify = self.settings_revalidated.emit
+        response_cache.subscribe(settings_path, notify)
+        self.destroyed.connect(lambda: response_cache.unsubscribe(settings_path, notify))
+
     def load_settings(self):
         settings = retrieve_settings()
 
         # Check if settings were retrieved correctly
         if not isinstance(settings, dict):
-            print("Error: Settings data is not a dictionary.")
+            logger.error("Settings data is not a dictionary.")
             return
 
         try:
@@ -567,6 +773,13 @@ class GeneralSettingsWidget(QWidget):
             self.startup_checkbox.stateChanged.connect(lambda: threading.Thread(target=self._on_startup_status_change).start())
             self.idletime_checkbox.stateChanged.connect(lambda:  threading.Thread(target=self._on_idletime_status_change).start())
 
+    def apply_revalidated_settings(self, settings):
+        """Update the switches from newer server settings without re-sending them."""
+        for checkbox, key in ((self.startup_checkbox, 'launch'), (self.idletime_checkbox, 'idle_time')):
+            checkbox.blockSignals(True)
+            checkbox.setChecked(settings.get(key, False))
+            checkbox.blockSignals(False)
+
     def _setup_startup_section(self):
         self.startup = QWidget(parent=self)
         self.startup.setGeometry(QRect(10, 70, 550, 80))
@@ -686,17 +899,19 @@ class GeneralSettingsWidget(QWidget):
 
     def _send_request(self, endpoint, token, params):
         try:
-            response = requests.get(
-                host + endpoint,
-                headers={"Authorization": f"Bearer {token}"},
-                params=params
-            )
+            # Queued while the server is down and delivered once it's back
+            response = settings_writer().send(
+                endpoint,
+                lambda: client.request("GET", endpoint, headers={"Authorization": f"Bearer {token}"}, params=params),
+                "GET", endpoint, params=params, auth="bearer")
+            if response is None:
+                return
             if response.status_code == 200:
-                print(f"{endpoint} updated successfully")
+                logger.debug("%s updated successfully", endpoint)
             else:
-                print(f"Failed to update {endpoint}: {response.status_code}, {response.text}")
+                logger.warning("Failed to update %s: %s, %s", endpoint, response.status_code, response.text)
         except requests.RequestException as e:
-            print(f"An error occurred while sending the request: {e}")
+            logger.warning("An error occurred while sending the request: %s", e)
 
     def change_theme(self, theme_settings):
         self.startup_checkbox.set_circle_color(theme_settings.get('checkbox_color'))
@@ -714,6 +929,10 @@ class GeneralSettingsWidget(QWidget):
 
 
 class SchedulePage(QWidget):
+    schedule_saved = Signal(object, object)  # sent patch, server settings or None if the write failed
+    schedule_switch_saved = Signal(object)  # server settings, or None if the write was queued or failed
+    settings_revalidated = Signal(dict)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.installEventFilter(self)
@@ -726,11 +945,22 @@ class SchedulePage(QWidget):
         self.default_week_schedule = self.week_schedule.copy()
         self.settings = retrieve_settings()
         self.previous_schedule = self.settings.get('weekdays_schedule', {})
+        self.schedule_tracker = ScheduleTracker(self.previous_schedule)
+        self._save_enabled = None
+        # Before applySettingsAndStyle, which may already save the switch
+        self.schedule_switch_saved.connect(self.on_schedule_switch_saved)
         self.setupLabelsAndFonts()
         self.setupScheduleEnabler()
         self.setupDayWidget()
         self.setupButtons()
         self.applySettingsAndStyle()
+        self.schedule_saved.connect(self.on_schedule_saved)
+
+        # Re-baseline the schedule when a background revalidation brings newer settings
+        self.settings_revalidated.connect(self.apply_revalidated_settings)
+        notify = self.settings_revalidated.emit
+        response_cache.subscribe(settings_path, notify)
+        self.destroyed.connect(lambda: response_cache.unsubscribe(settings_path, notify))
 
     def setupLabelsAndFonts(self):
         font_bold = QFont()
@@ -839,9 +1069,6 @@ class SchedulePage(QWidget):
         font = QFont()
         font.setPointSize(14 if sys.platform == "darwin" else 10)
 
-        # Assuming ThemeManager instance is accessible as self.theme_manager
-        theme_manager = ThemeManager()
-
         for day in days:
             checkbox = CustomCheckBox(parent=self.day_widget)
             checkbox.setGeometry(day["x"], day["y"], 40, 40)
@@ -854,14 +1081,9 @@ class SchedulePage(QWidget):
             setattr(self, f"{day_name_lower}_checkbox", checkbox)
             setattr(self, f"{day_name_lower}_label", label)
 
-            # Connect theme change signal to the checkbox's change_theme method
-            theme_manager.theme_Changed.connect(checkbox.change_theme)
-
-            # Ensure checkbox updates save button state when changed
-            checkbox.stateChanged.connect(self.update_save_button_state)
-
-            # Set initial theme (to load the correct images based on the current theme)
-            checkbox.change_theme()
+            # Track the edited day and update the save button state
+            checkbox.stateChanged.connect(
+                lambda state, name=day["name"], box=checkbox: self.on_schedule_field_changed(name, box.isChecked()))
 
     def setupButtons(self):
         self.Reset = QPushButton("Reset", self.day_widget)
@@ -872,19 +1094,49 @@ class SchedulePage(QWidget):
         self.Save.setGeometry(435, 235, 100, 50)
         self.Save.clicked.connect(self.saveSchedule)
 
-        self.From_time.timeChanged.connect(self.update_save_button_state)
-        self.To_time.timeChanged.connect(self.update_save_button_state)
+        self.From_time.timeChanged.connect(
+            lambda time: self.on_schedule_field_changed('starttime', time.toString("HH:mm")))
+        self.To_time.timeChanged.connect(
+            lambda time: self.on_schedule_field_changed('endtime', time.toString("HH:mm")))
 
     def toggle_schedule_visibility(self):
-        self.day_widget.setVisible(self.Schedule_enabler_checkbox.isChecked())
-        threading.Thread(target=self.run_add_settings).start()
-
-    def run_add_settings(self):
-        add_settings('schedule', self.Schedule_enabler_checkbox.isChecked())
+        enabled = self.Schedule_enabler_checkbox.isChecked()
+        self.day_widget.setVisible(enabled)
+        # Only write when the switch differs from what the server already has
+        if self.settings.get('schedule', False) != enabled:
+            threading.Thread(target=self.run_add_settings, args=(enabled,)).start()
+
+    def run_add_settings(self, enabled):
+        """Save the schedule switch. Runs on a worker thread; the result goes to on_schedule_switch_saved."""
+        try:
+            settings = add_settings('schedule', enabled)
+        except requests.RequestException as e:
+            logger.warning("Failed to save the schedule switch: %s", e)
+            settings = None
+        self.schedule_switch_saved.emit(settings)
+
+    def on_schedule_switch_saved(self, settings):
+        if settings is not None:
+            self.settings = settings
+
+    def apply_revalidated_settings(self, settings):
+        """Take newer server settings as the acknowledged schedule, keeping the fields edited here."""
+        self.settings = settings
+        schedule = settings.get('weekdays_schedule')
+        if schedule:
+            edited = self.schedule_tracker.patch()
+            self.previous_schedule = schedule
+            self.schedule_tracker.reset(schedule)
+            # Moves the fields nobody edited to the server's values through on_schedule_field_changed
+            self.updateCheckboxStates(schedule | edited)
+        self.Schedule_enabler_checkbox.setChecked(settings.get('schedule', False))
+        self.update_save_button_state()
 
     def resetSchedule(self):
-        threading.Thread(target=self.save_schedule_settings, args=(self.default_week_schedule,)).start()
         self.updateCheckboxStates(self.default_week_schedule)
+        patch = self.schedule_tracker.patch()
+        if patch:
+            threading.Thread(target=self.save_schedule_settings, args=(patch,)).start()
 
         # Call update_save_button_state() to ensure Save button is properly updated after reset
         self.update_save_button_state()
@@ -911,16 +1163,18 @@ class SchedulePage(QWidget):
             'endtime': self.To_time.time().toString("HH:mm")
         }
 
-    def update_save_button_state(self):
-        current_schedule = self.get_current_schedule()
-        print(f"current_schedule: {current_schedule}")
-        print(f"settings:{self.settings}")
-        print(f"previous_schedule: {self.previous_schedule}")
+    def on_schedule_field_changed(self, field, value):
+        self.schedule_tracker.set_field(field, value)
+        self.update_save_button_state()
 
-        # Check if there are any differences between the current and previous schedule
-        schedule_changed = (current_schedule != self.previous_schedule)
+    def update_save_button_state(self):
+        # Dirty fields are tracked per edit, so this doesn't compare whole schedules
+        save_enabled = self.schedule_tracker.is_dirty() and not self.check_all_days_false()
+        if save_enabled == self._save_enabled:
+            return
+        self._save_enabled = save_enabled
 
-        if not schedule_changed or self.check_all_days_false():
+        if not save_enabled:
             # Disable save button only if the schedule hasn't changed or all days are unchecked
             self.Save.setEnabled(False)
             self.Reset.setEnabled(True)
@@ -944,14 +1198,28 @@ class SchedulePage(QWidget):
             self.Reset.setEnabled(True)
 
     def check_all_days_false(self):
-        return not any(getattr(self, f"{day}_checkbox").isChecked() for day in
-                       ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'])
-
-    def save_schedule_settings(self, schedule):
-        self.previous_schedule = schedule
-        add_settings('weekdays_schedule', schedule)
-        self.settings = retrieve_settings()
+        current = self.schedule_tracker.current
+        return not any(current.get(day) for day in
+                       ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
 
+    def save_schedule_settings(self, patch):
+        """Send only the changed schedule fields. Runs on a worker thread; the result goes to on_schedule_saved."""
+        try:
+            settings = patch_settings('weekdays_schedule', patch)
+        except requests.RequestException as e:
+            logger.warning("Failed to save schedule: %s", e)
+            settings = None
+        self.schedule_saved.emit(patch, settings)
+
+    def on_schedule_saved(self, patch, settings):
+        """Keep the server's answer as the settings, or re-enable Save so a failed write can be retried."""
+        if settings is not None:
+            self.settings = settings
+            self.schedule_tracker.acknowledge(patch)
+            self.previous_schedule = self.settings.get('weekdays_schedule', self.schedule_tracker.acknowledged)
+        # saveSchedule disabled the button without going through update_save_button_state
+        self._save_enabled = None
+        self.update_save_button_state()
 
     def saveSchedule(self):
         if self.check_all_days_false():
@@ -969,10 +1237,11 @@ class SchedulePage(QWidget):
         opacity_effect = QGraphicsOpacityEffect()
         opacity_effect.setOpacity(0.1)
         self.Save.setGraphicsEffect(opacity_effect)
+        self._save_enabled = False
 
-        # Save the current schedule in a background thread
-        week_schedule = self.get_current_schedule()
-        save_thread = threading.Thread(target=self.save_schedule_settings, args=(week_schedule,))
+        # Save the changed fields in a background thread
+        patch = self.schedule_tracker.patch()
+        save_thread = threading.Thread(target=self.save_schedule_settings, args=(patch,))
         save_thread.start()
 
     def applySettingsAndStyle(self):
@@ -982,6 +1251,9 @@ class SchedulePage(QWidget):
         # Apply the schedule settings to checkboxes and time fields
         self.updateCheckboxStates(saved_schedule)
 
+        # Start tracking edits from what the widgets now show
+        self.schedule_tracker = ScheduleTracker(self.previous_schedule, self.get_current_schedule())
+
         # Set the initial state of the "Record data only during my scheduled work hours" checkbox
         schedule_enabled = self.settings.get('schedule', False)
         self.Schedule_enabler_checkbox.setChecked(schedule_enabled)
@@ -1022,7 +1294,9 @@ class SchedulePage(QWidget):
 class UserProfileDrawer(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._details_digest = None
         QTimer.singleShot(0, self.load_user_details)
+        credential_store().credentials_changed.connect(self.load_user_details)
 
         self.profile_header = TransparentLabel(parent=self)
         self.profile_header.setGeometry(QtCore.QRect(10, 15, 300, 44))
@@ -1084,9 +1358,16 @@ class UserProfileDrawer(QWidget):
         user_details = credentials()  # Replace this with actual data fetching
 
         if not user_details:
+            self._details_digest = None
             self.clear_user_detail_fields()
             return
 
+        # Skip the relayout when the profile content hasn't changed since the last load
+        digest = hash(tuple(user_details.get(key, '') for key in ('firstname', 'email', 'companyName', 'phone')))
+        if digest == self._details_digest:
+            return
+        self._details_digest = digest
+
         # Update fields using helper function for consistent UI updates
         self._update_field(self.first_name_value, user_details.get('firstname', ''))
         self._update_field(self.email_value, user_details.get('email', ''))
@@ -1,9 +1,40 @@
 import sys
+import time
 import qdarktheme  # type: ignore
 from PySide6.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget
 from PySide6.QtCore import QSettings, Signal, QObject
 from PySide6.QtGui import QPalette, QColor
 
+from sd_qt.sd_desktop import metrics
+
+
+class ThemeNotifier(QObject):
+    """Process-wide theme broadcast.
+
+    Each ThemeManager only signals its own listeners; this forwards every
+    change to widgets that share one subscription, like CustomCheckBox.
+    """
+    theme_changed = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.theme = QSettings('ralvie.ai', 'theme').value('theme', 'auto')
+
+    def set_theme(self, theme: str) -> None:
+        if theme != self.theme:
+            self.theme = theme
+            self.theme_changed.emit(theme)
+
+
+_notifier = None
+
+
+def theme_notifier() -> ThemeNotifier:
+    global _notifier
+    if _notifier is None:
+        _notifier = ThemeNotifier()
+    return _notifier
+
 
 class ThemeManager(QObject):  # Inherit from QObject
     theme_Changed = Signal(str)  # Define the signal as a class attribute
@@ -15,8 +46,11 @@ class ThemeManager(QObject):  # Inherit from QObject
         self.theme_Changed.connect(self.apply_theme)  # Apply theme whenever theme_Changed is emitted
 
     def set_theme(self, theme: str) -> None:
+        start = time.perf_counter()
         self.settings.setValue('theme', theme)
         self.theme_Changed.emit(theme)  # Emit the signal with the theme parameter
+        theme_notifier().set_theme(theme)
+        metrics.observe("theme_switch", time.perf_counter() - start)
 
     def get_theme(self) -> str:
         return self.settings.value('theme', 'auto')
@@ -0,0 +1,191 @@
+import bisect
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QRectF, QSize, Qt
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QStyledItemDelegate
+
+from sd_qt.sd_desktop.search_index import SearchIndex, narrows
+
+light_colors = [QColor(color) for color in ("#F5E9DA", "#E8C6E6", "#CDC8EF", "#C0D8EC", "#C8E0FF", "#E2F0D6")]
+dark_colors = [QColor(color) for color in ("#443C32", "#271726", "#29263B", "#0E1E2B", "#111D2C", "#20261B")]
+
+TimeRole = Qt.UserRole + 1
+ColorRole = Qt.UserRole + 2
+
+
+class ActivityModel(QAbstractListModel):
+    """The Activities rows of one day, optionally narrowed to those matching a search.
+
+    Rows are only ever appended or updated in place, matched by row id.
+    Every row's app name and window titles go into a SearchIndex as they
+    arrive, so filtering is a lookup that yields the matching positions.
+    A query extending the previous one is searched within the previous
+    matches, and the view is told about a new filter as a layout change
+    rather than a reset, so it keeps its scroll bar and selection.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search_index = SearchIndex()
+        self._rows = []
+        self._times = []  # Time text last shown for each row
+        self._titles = []  # Number of each row's titles already indexed
+        self._positions = {}  # row id -> position
+        self._visible = None  # Ascending positions of the matching rows; None while every row is shown
+        self._matches = None  # The search result behind _visible, until rows are added or gain titles
+        self._query = ""
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) if self._visible is None else len(self._visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        position = index.row() if self._visible is None else self._visible[index.row()]
+        if role == Qt.DisplayRole:
+            return self._rows[position]['app']
+        if role == TimeRole:
+            return self._times[position]
+        if role == ColorRole:
+            return position % len(light_colors)
+        if role == Qt.ToolTipRole and len(self._rows[position]['app']) > 50:
+            return self._rows[position]['app']
+        return None
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._times = []
+        self._titles = []
+        self._positions = {}
+        self._visible = None if not self._query else []
+        self._matches = None
+        self.search_index.clear()
+        self.endResetModel()
+
+    def update_rows(self, rows):
+        """Append rows not seen before and refresh the ones whose time or titles changed."""
+        added = []
+        for row in rows:
+            position = self._positions.get(row['id'])
+            if position is None:
+                added.append(row)
+                continue
+            if self._index(position, row) and self._visible is not None:
+                self._reveal(position)
+            if row['time'] != self._times[position]:
+                self._times[position] = row['time']
+                view_row = self._view_row(position)
+                if view_row is not None:
+                    self.dataChanged.emit(self.index(view_row), self.index(view_row), [TimeRole])
+        if added:
+            self._append(added)
+
+    def set_filter(self, query):
+        """Show only rows matching `query`; an empty query shows everything."""
+        query = query.strip()
+        if query == self._query:
+            return
+        within = self._matches if self._matches is not None and narrows(query, self._query) else None
+        self._query = query
+        if not query:
+            self._matches = None
+            self._relayout(None)
+            return
+        self._matches, visible = self.search_index.search_ordered(query, within)
+        self._relayout(visible)
+
+    def _relayout(self, visible):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        positions = [index.row() if self._visible is None else self._visible[index.row()] for index in persistent]
+        self._visible = visible
+        view_rows = [self._view_row(position) for position in positions]
+        self.changePersistentIndexList(
+            persistent, [QModelIndex() if view_row is None else self.index(view_row) for view_row in view_rows])
+        self.layoutChanged.emit()
+
+    def _append(self, rows):
+        first = len(self._rows)
+        self._matches = None
+        if self._visible is None and self._query:
+            self._visible = list(range(first))  # Every row matched so far; the new ones may not
+        if self._visible is None:
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for position, row in enumerate(rows, first):
+            self._positions[row['id']] = position
+            self._rows.append(row)
+            self._times.append(row['time'])
+            self._titles.append(0)
+            self.search_index.add(position, row['app'])
+            self._index(position, row)
+        if self._visible is None:
+            self.endInsertRows()
+            return
+
+        matches = self.search_index.search(self._query)
+        shown = [position for position in range(first, len(self._rows)) if position in matches]
+        if shown:
+            self.beginInsertRows(QModelIndex(), len(self._visible), len(self._visible) + len(shown) - 1)
+            self._visible.extend(shown)
+            self.endInsertRows()
+
+    def _index(self, position, row):
+        """Index titles the row gained since last time; True if there were any."""
+        titles = row.get('titles') or ()
+        new_titles = titles[self._titles[position]:]
+        for title in new_titles:
+            self.search_index.add(position, title)
+        self._titles[position] = len(titles)
+        if new_titles:
+            self._matches = None
+        return bool(new_titles)
+
+    def _reveal(self, position):
+        # A hidden row whose new titles match the current search is shown in place
+        view_row = bisect.bisect_left(self._visible, position)
+        if view_row < len(self._visible) and self._visible[view_row] == position:
+            return
+        if position in self.search_index.search(self._query):
+            self.beginInsertRows(QModelIndex(), view_row, view_row)
+            self._visible.insert(view_row, position)
+            self.endInsertRows()
+
+    def _view_row(self, position):
+        if self._visible is None:
+            return position
+        view_row = bisect.bisect_left(self._visible, position)
+        return view_row if view_row < len(self._visible) and self._visible[view_row] == position else None
+
+
+class ActivityDelegate(QStyledItemDelegate):
+    """Paints an Activities row as a rounded card with the app name and time range."""
+    card_width = 525
+    card_height = 60
+    spacing = 6
+    margin = 12
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.dark = False
+
+    def sizeHint(self, option, index):
+        return QSize(self.margin + self.card_width, self.card_height + self.spacing)
+
+    def paint(self, painter, option, index):
+        card = QRectF(option.rect.x() + self.margin, option.rect.y() + self.spacing / 2,
+                      self.card_width, self.card_height)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush((dark_colors if self.dark else light_colors)[index.data(ColorRole)])
+        painter.drawRoundedRect(card, 5, 5)
+
+        painter.setPen(Qt.white if self.dark else Qt.black)
+        app = index.data(Qt.DisplayRole)
+        painter.drawText(card.adjusted(17, 15, -105, -15), Qt.AlignVCenter | Qt.AlignLeft,
+                         app[:50] + "..." if len(app) > 50 else app)
+        painter.drawText(card.adjusted(425, 15, 0, -15), Qt.AlignVCenter | Qt.AlignLeft, index.data(TimeRole))
+        painter.restore()
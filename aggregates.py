@@ -0,0 +1,140 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+time_format = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class UsageAggregates:
+    """Seconds spent per application, per local hour and per local day.
+
+    `apply` takes raw events as they are merged in and touches only those
+    events' buckets: an event seen before (same `event_id`, e.g. because it
+    is still growing) has its previous contribution subtracted before the
+    new one is added. Readers never rescan events.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}  # event_id -> (app, local start, local end)
+        self._hours = defaultdict(Counter)  # (date, hour) -> app -> seconds
+        self._days = defaultdict(Counter)  # date -> app -> seconds
+        self._forgotten = None  # dates before this one are no longer counted
+
+    def apply(self, events):
+        """Add or update the contribution of raw events."""
+        if not events:
+            return
+        local_tz = datetime.now().astimezone().tzinfo
+        with self._lock:
+            for event in events:
+                span = (event.get("application_name") or "",
+                        _local(event["start"], local_tz), _local(event["end"], local_tz))
+                previous = self._spans.get(event["event_id"])
+                if previous == span:
+                    continue
+                if previous is not None:
+                    self._add(previous, -1)
+                self._add(span, 1)
+                self._spans[event["event_id"]] = span
+
+    def day_totals(self, day):
+        """Seconds per application on local date `day`, largest first."""
+        with self._lock:
+            return self._days[day].most_common() if day in self._days else []
+
+    def day_total(self, day):
+        with self._lock:
+            return sum(self._days[day].values()) if day in self._days else 0
+
+    def hour_totals(self, day):
+        """{hour: {app: seconds}} for local date `day`."""
+        with self._lock:
+            return {hour: dict(self._hours[(day, hour)]) for hour in range(24) if (day, hour) in self._hours}
+
+    def app_total(self, app, day):
+        with self._lock:
+            return self._days[day][app] if day in self._days else 0
+
+    def forget_before(self, day):
+        """Drop every bucket and span for local dates before `day`, and stop counting those dates."""
+        with self._lock:
+            self._forgotten = day
+            for key in [key for key in self._days if key < day]:
+                del self._days[key]
+            for key in [key for key in self._hours if key[0] < day]:
+                del self._hours[key]
+            for event_id in [event_id for event_id, span in self._spans.items() if span[2].date() < day]:
+                del self._spans[event_id]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._hours.clear()
+            self._days.clear()
+            self._forgotten = None
+
+    def _add(self, span, sign):
+        # Split the span at local hour boundaries
+        app, start, end = span
+        while start < end:
+            bucket_end = min(end, start.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+            if self._forgotten is not None and start.date() < self._forgotten:
+                # An event reaching into a kept day must not bring a forgotten one back partially
+                start = bucket_end
+                continue
+            seconds = sign * int((bucket_end - start).total_seconds())
+            day = start.date()
+            hour_key = (day, start.hour)
+            self._hours[hour_key][app] += seconds
+            self._days[day][app] += seconds
+            if self._hours[hour_key][app] <= 0:
+                del self._hours[hour_key][app]
+                if not self._hours[hour_key]:
+                    del self._hours[hour_key]
+            if self._days[day][app] <= 0:
+                del self._days[day][app]
+                if not self._days[day]:
+                    del self._days[day]
+            start = bucket_end
+
+
+def day_totals(events, day):
+    """Seconds per application on local date `day` in `events`, largest first.
+
+    Computed on a throwaway UsageAggregates, for past days the process-wide
+    aggregates no longer hold.
+    """
+    aggregates = UsageAggregates()
+    aggregates.apply(events)
+    return aggregates.day_totals(day)
+
+
+def _local(timestamp, local_tz):
+    return datetime.strptime(timestamp, time_format).replace(tzinfo=pytz.utc).astimezone(local_tz).replace(tzinfo=None)
+
+
+def format_duration(seconds):
+    """Short human duration: 2h 05m, 12m or 40s."""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+_aggregates = None
+
+
+def usage_aggregates():
+    """Return the process-wide usage aggregates."""
+    global _aggregates
+    if _aggregates is None:
+        _aggregates = UsageAggregates()
+    return _aggregates
@@ -0,0 +1,31 @@
+"""Microbenchmark of credential access: direct keyring lookup vs. the memoized store.
+
+Run with the desktop client's environment (a real keyring entry for SD_KEYS):
+
+    python -m sd_qt.sd_desktop.benchmarks.bench_credentials
+"""
+import sys
+import timeit
+
+from sd_core.cache import cache_user_credentials
+
+from sd_qt.sd_desktop.credential_store import CredentialStore
+
+
+def main(number=1000):
+    if not cache_user_credentials("SD_KEYS"):
+        print("No SD_KEYS credentials in the keyring; sign in once before benchmarking.")
+        return 1
+
+    store = CredentialStore()
+    results = {
+        "keyring lookup (before)": timeit.repeat(lambda: cache_user_credentials("SD_KEYS"), number=number, repeat=5),
+        "memoized store (after)": timeit.repeat(store.get, number=number, repeat=5),
+    }
+    for name, timings in results.items():
+        print(f"{name:<26} {min(timings) / number * 1e6:10.2f} us/call")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
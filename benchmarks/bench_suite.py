@@ -0,0 +1,335 @@
+"""Headless benchmark suite for the desktop client.
+
+Runs the real widgets on the offscreen Qt platform against a local stand-in
+for the sd-server API (see stub_server.py) filled with synthetic events.
+Credentials stay in memory; QSettings and the data directory point at a
+temporary directory that is removed at exit (see sandbox.py).
+
+    python -m sd_qt.sd_desktop.benchmarks.bench_suite --threshold 0.2
+    python -m sd_qt.sd_desktop.benchmarks.bench_suite --baseline other.json --output results.json
+    python -m sd_qt.sd_desktop.benchmarks.bench_suite --save-baseline
+    python -m sd_qt.sd_desktop.benchmarks.bench_suite --replay capture.jsonl.gz
+
+Results are compared against baseline.json next to this file unless
+--baseline names another file (or is empty to skip the comparison). Any
+benchmark more than `threshold` and more than --min-delta ms slower than
+the baseline is reported and the exit status is 1; benchmarks under
+10 ms are compared by their fastest run, slower ones by their median. --save-baseline without
+a path refreshes the committed baseline.json.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import __version__ as pyside_version
+from PySide6.QtWidgets import QApplication
+
+from sd_qt.sd_desktop.benchmarks.sandbox import enter_sandbox
+
+_sandbox = enter_sandbox("sd-bench-")
+
+from sd_qt.sd_desktop import client, util
+from sd_qt.sd_desktop.credential_store import credential_store
+from sd_qt.sd_desktop.scheduler import task_scheduler
+from sd_qt.sd_desktop.stub_server import StubServer
+
+default_sizes = (100, 1000, 10000)
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def synthetic_events(count, now=None):
+    """`count` back-to-back events in the sd-server format, ending at `now`."""
+    now = now or datetime.utcnow().replace(microsecond=0)
+    start_of_day = now.replace(hour=0, minute=0, second=0)
+    step = max(1, int((now - start_of_day).total_seconds()) // max(count, 1))
+    events = []
+    for i in range(count):
+        start = start_of_day + timedelta(seconds=i * step)
+        events.append({
+            "event_id": i,
+            "application_name": f"Application {i % 37}",
+            "title": f"Window title {i}",
+            "start": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end": (start + timedelta(seconds=step)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    return events
+
+
+def measure(func, repeat, setup=None):
+    """Run `func` `repeat` times, each after an untimed `setup`, and return timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state) if setup else func()
+        timings.append(time.perf_counter() - start)
+        # Keep refresh jobs registered by the constructed pages from firing between runs
+        for name in task_scheduler().metrics():
+            task_scheduler().remove_job(name)
+        QApplication.processEvents()
+    return timings
+
+
+def summarize(timings):
+    return {
+        "runs": len(timings),
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+    }
+
+
+def run(repeat=5, sizes=default_sizes):
+    from sd_qt.sd_desktop.Dashboard import ActivitiesPage, Dashboard
+    from sd_qt.sd_desktop.ThemeManager import ThemeManager
+    from sd_qt.sd_desktop.coalesce import coalesce
+    from sd_qt.sd_desktop.main import MainWindow
+
+    results = {}
+
+    start = time.perf_counter()
+    window = MainWindow()
+    results["main_window_cold"] = summarize([time.perf_counter() - start])
+    window.watchdog.stop()
+    window.deleteLater()
+
+    results["dashboard_construct"] = summarize(measure(lambda: Dashboard(lambda: None).deleteLater(), repeat))
+
+    theme_manager = ThemeManager()
+    # The pages only show rows of the day the cache holds, as after a refresh
+    util.cache_day = date.today()
+    for count in sizes:
+        events = coalesce(util.listView(synthetic_events(count)))
+        pages = []
+
+        def new_page():
+            page = ActivitiesPage(theme_manager)
+            pages.append(page)
+            return page
+
+        results[f"add_dynamic_blocks_{count}"] = summarize(
+            measure(lambda page: page.add_dynamic_blocks(events), repeat, setup=new_page))
+        results[f"update_events_style_{count}"] = summarize(measure(pages[-1].update_events_style, repeat))
+        for page in pages:
+            page.deleteLater()
+        QApplication.processEvents()
+    util.cache_day = None
+
+    dashboard = Dashboard(lambda: None)
+    dashboard.show()
+    themes = iter(["dark", "light"] * repeat)
+    results["theme_switch"] = summarize(measure(lambda: dashboard.theme_manager.set_theme(next(themes)), repeat))
+    dashboard.deleteLater()
+
+    for count in sizes:
+        stub.events = synthetic_events(count)
+
+        def cold():
+            util.events_cache.clear()
+
+        def warm():
+            util.events_cache.clear()
+            util.get_events()
+            # One more event arrives after the cached tail, the steady-state refresh case
+            last = stub.events[-1]
+            stub.events.append(dict(last, event_id=last["event_id"] + 1, start=last["end"], end=last["end"]))
+
+        results[f"get_events_full_{count}"] = summarize(measure(lambda _: util.get_events(), repeat, setup=cold))
+        results[f"get_events_merge_{count}"] = summarize(measure(lambda _: util.get_events(), repeat, setup=warm))
+
+    results.update(run_timeline(repeat))
+    results.update(run_search(repeat))
+    results.update(run_export(repeat))
+    results.update(run_sources(repeat))
+    return results
+
+
+def run_sources(repeat=5, count=10000):
+    """Read a day of `count` events through the HTTP source and the datastore reader."""
+    from sd_qt.sd_desktop.datastore_fixture import build_datastore
+    from sd_qt.sd_desktop.event_source import DatastoreEventSource, HttpEventSource
+
+    events = synthetic_events(count)
+    stub.events = events
+    datastore = DatastoreEventSource(build_datastore(os.path.join(_sandbox, f"datastore_{count}.db"), events))
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    results = {}
+    for source in (HttpEventSource(), datastore):
+        results[f"event_source_{source.name}_{count}"] = summarize(
+            measure(lambda: source.events_between(start, start + timedelta(days=1)), repeat))
+    datastore.close()
+    return results
+
+
+def run_export(repeat=5, count=50000):
+    """Stream `count` stored events to each available export format."""
+    from sd_qt.sd_desktop.event_store import event_store
+    from sd_qt.sd_desktop.export import available_formats, export_events
+
+    event_store().put_events(synthetic_events(count))
+    results = {}
+    for fmt in available_formats():
+        path = os.path.join(_sandbox, f"export.{fmt}")
+        results[f"export_{fmt}_{count}"] = summarize(
+            measure(lambda: export_events(path, date.today(), date.today(), fmt), repeat))
+    return results
+
+
+def run_search(repeat=5, count=50000):
+    """Index `count` rows, then time filtering the Activities model as a query is typed."""
+    from sd_qt.sd_desktop.activity_list import ActivityModel
+    from sd_qt.sd_desktop.coalesce import coalesce
+
+    rows = coalesce(util.listView(synthetic_events(count)))
+    model = ActivityModel()
+    results = {f"search_index_{count}": summarize([_timed(lambda: model.update_rows(rows))])}
+    for query in ("ti", "title 4", "title 4242", "application 3"):
+        def typed(query=query):
+            for end in range(1, len(query) + 1):
+                model.set_filter(query[:end])
+            model.set_filter("")
+        # Per keystroke, searching uncached terms
+        results[f"search_keystroke_{query.replace(' ', '_')}_{count}"] = summarize(
+            [t / len(query) for t in measure(lambda: (model.search_index._results.clear(), typed()), repeat)])
+    return results
+
+
+def run_timeline(repeat=5, count=50000):
+    """Paint the day timeline with `count` events fully zoomed out, mid zoom and close up."""
+    from PySide6.QtGui import QImage
+    from sd_qt.sd_desktop.timeline import TimelineWidget, epoch
+
+    end_of_day = datetime.utcnow().replace(hour=23, minute=59, second=0, microsecond=0)
+    events = util.listView(synthetic_events(count, now=end_of_day))
+    timeline = TimelineWidget()
+    timeline.resize(560, 460)
+    timeline.show()
+    day_start = epoch(events[0]["start"])
+    timeline.set_range(day_start, day_start + 86400)
+    results = {f"timeline_load_{count}": summarize([_timed(lambda: timeline.update_events(events))])}
+
+    image = QImage(timeline.size(), QImage.Format_ARGB32_Premultiplied)
+    for name, spp in (("day", timeline._max_spp()), ("hour", 3600 / 450), ("minute", 60 / 450)):
+        timeline.spp = timeline.target_spp = spp
+        timeline.t0 = timeline.target_t0 = day_start + 3600
+        results[f"timeline_paint_{name}_{count}"] = summarize(measure(lambda: timeline.render(image), repeat))
+    return results
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_replay(capture, repeat=5):
+    """Time the recorded sequence of event refreshes from a traffic capture, replayed in order."""
+    from sd_qt.sd_desktop.traffic import ReplayServer
+
+    replay = ReplayServer(capture, speed=0).start()
+    client.host = replay.host
+    refreshes = replay.count("GET", "/0/dashboard/events")
+
+    def rewind():
+        replay.rewind()
+        util.events_cache.clear()
+
+    def refresh_all(_):
+        for _ in range(refreshes):
+            util.get_events()
+
+    try:
+        return {f"replay_get_events_{refreshes}": summarize(measure(refresh_all, repeat, setup=rewind))}
+    finally:
+        replay.stop()
+
+
+def compare(results, baseline, threshold, min_delta_ms=1.0, fast_ms=10.0):
+    """Return a list of (name, baseline_ms, current_ms, ratio) for benchmarks slower than the threshold allows.
+
+    A benchmark must also be at least `min_delta_ms` slower, so timer and
+    scheduling noise on sub-millisecond benchmarks doesn't count. Those
+    whose baseline median is under `fast_ms` are compared by their fastest
+    run, which that noise affects least.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        key = "min_ms" if previous["median_ms"] < fast_ms else "median_ms"
+        if not previous[key]:
+            continue
+        ratio = current[key] / previous[key]
+        if ratio > 1 + threshold and current[key] - previous[key] > min_delta_ms:
+            regressions.append((name, previous[key], current[key], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes, help="event counts to render and fetch")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--replay", help="also replay the event refreshes of a traffic capture (see traffic.py)")
+    parser.add_argument("--baseline", default=default_baseline,
+                        help="compare against results stored at this path, '' to skip (default: %(default)s)")
+    parser.add_argument("--save-baseline", nargs="?", const=default_baseline,
+                        help="store these results as the new baseline (default path: the committed one)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before reporting, 0.2 = 20%%")
+    parser.add_argument("--min-delta", type=float, default=1.0, help="smallest slowdown in ms worth reporting")
+    args = parser.parse_args(argv)
+
+    global stub
+    stub = StubServer().start()
+    client.host = stub.host
+    credential_store().preload({"token": "bench", "Sundial": True, "firstname": "Bench", "email": "bench@example.com"})
+    app = QApplication.instance() or QApplication([])
+
+    try:
+        results = run(args.repeat, args.sizes)
+    finally:
+        stub.stop()
+    if args.replay:
+        results.update(run_replay(args.replay, args.repeat))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pyside": pyside_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "sizes": list(args.sizes),
+        },
+        "results": results,
+    }
+
+    for name, result in results.items():
+        print(f"{name:<28} median {result['median_ms']:10.3f} ms   min {result['min_ms']:10.3f} ms")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline and args.baseline != args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before:.3f} ms -> {after:.3f} ms ({(ratio - 1) * 100:+.0f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    app.processEvents()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""A throwaway home for the settings and data files of a benchmark run."""
+import atexit
+import os
+import shutil
+import tempfile
+
+
+def enter_sandbox(prefix):
+    """Point the client's data directory and QSettings at a new temporary directory and return it.
+
+    The directory is removed when the process exits. Call it before
+    anything reads a setting or opens a file under the data directory.
+    """
+    path = tempfile.mkdtemp(prefix=prefix)
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(path, "config")
+    os.environ["XDG_DATA_HOME"] = os.path.join(path, "data")
+    os.environ["SD_DATA_DIR"] = os.path.join(path, "data", "sundial", "sd-desktop")
+
+    from PySide6.QtCore import QSettings
+    for settings_format in (QSettings.NativeFormat, QSettings.IniFormat):
+        QSettings.setPath(settings_format, QSettings.UserScope, os.path.join(path, "config"))
+    return path
@@ -0,0 +1,94 @@
+"""Stress test for page teardown: sign-in -> dashboard -> sign-out, repeated.
+
+Runs offscreen against the stub server with in-memory credentials, with
+QSettings and the data directory in a temporary directory. After a few
+warm-up cycles it checkpoints live QObject counts, RSS and tracemalloc, runs
+the remaining cycles, and fails (exit status 1) if any class's live count
+grew or RSS grew by more than --rss-tolerance MiB.
+
+    python -m sd_qt.sd_desktop.benchmarks.stress_signin_cycle --cycles 100
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from sd_qt.sd_desktop.benchmarks.sandbox import enter_sandbox
+
+_sandbox = enter_sandbox("sd-stress-")
+
+from sd_qt.sd_desktop import client
+from sd_qt.sd_desktop.credential_store import credential_store
+from sd_qt.sd_desktop.leak_tracker import LeakTracker, flush_deletes
+from sd_qt.sd_desktop.stub_server import StubServer
+
+user = {"token": "stress", "Sundial": True, "firstname": "Stress", "email": "stress@example.com"}
+
+
+def cycle(window):
+    # There is no running event loop here, so deleteLater() has to be flushed by hand
+    credential_store().set(user)
+    window.on_sign_in_completed()
+    flush_deletes()
+    window.sign_out()
+    flush_deletes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cycle sign-in, dashboard and sign-out and check for leaks.")
+    parser.add_argument("--cycles", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--rss-tolerance", type=float, default=20, help="allowed RSS growth in MiB")
+    args = parser.parse_args(argv)
+
+    stub = StubServer().start()
+    client.host = stub.host
+    credential_store().preload(dict(user, Sundial=False))
+    app = QApplication.instance() or QApplication([])
+
+    from sd_qt.sd_desktop.main import MainWindow
+    window = MainWindow()
+    window.show()
+    tracker = LeakTracker()
+
+    try:
+        for _ in range(args.warmup):
+            cycle(window)
+        before = tracker.checkpoint("cycle")
+        started = time.perf_counter()
+        for i in range(args.cycles):
+            cycle(window)
+            if (i + 1) % 10 == 0:
+                print(f"{i + 1}/{args.cycles} cycles, {time.perf_counter() - started:.1f} s", flush=True)
+                started = time.perf_counter()
+        after = tracker.checkpoint("cycle")
+    finally:
+        stub.stop()
+
+    report = tracker.compare(before, after)
+    rss_growth = report["rss_delta"] / 2 ** 20
+    print(f"RSS growth over {args.cycles} cycles: {rss_growth:+.1f} MiB")
+    for line in report["allocations"]:
+        print(f"  {line}")
+
+    failed = False
+    if report["objects"]:
+        failed = True
+        print("Objects surviving teardown:")
+        for name, count in report["objects"].items():
+            print(f"  {name}: +{count}")
+    if rss_growth > args.rss_tolerance:
+        failed = True
+        print(f"RSS grew more than {args.rss_tolerance} MiB")
+
+    print("FAIL" if failed else "OK: object counts and RSS stayed flat")
+    app.processEvents()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
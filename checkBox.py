@@ -1,10 +1,12 @@
 import os
 import sys
+import weakref
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QCheckBox
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QPainter, QPixmap
+from PySide6.QtSvg import QSvgRenderer
 
-from sd_qt.sd_desktop.ThemeManager import ThemeManager
+from sd_qt.sd_desktop.ThemeManager import theme_notifier
 
 
 base_path = os.path.abspath(os.path.join(__file__, "../../.."))
@@ -14,55 +16,76 @@ darkTheme = os.path.join(resources_path, "DarkTheme")
 lightTheme = os.path.join(resources_path, "LightTheme")
 
 
+class IndicatorPixmaps:
+    """Checkbox indicator images rasterized once per theme, size and pixel ratio.
+
+    Holds the only theme subscription for all CustomCheckBoxes and repaints
+    the live ones when the theme changes.
+    """
+
+    def __init__(self):
+        self._pixmaps = {}
+        self._boxes = weakref.WeakSet()
+        theme_notifier().theme_changed.connect(self._repaint_all)
+
+    def register(self, box):
+        self._boxes.add(box)
+
+    def pixmap(self, checked, size, ratio):
+        theme = "dark" if theme_notifier().theme == "dark" else "light"
+        key = (theme, checked, size, ratio)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            directory = darkTheme if theme == "dark" else lightTheme
+            renderer = QSvgRenderer(os.path.join(directory, "checkedbox.svg" if checked else "uncheckedbox.svg"))
+            pixmap = QPixmap(round(size * ratio), round(size * ratio))
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            renderer.render(painter)
+            painter.end()
+            pixmap.setDevicePixelRatio(ratio)
+            self._pixmaps[key] = pixmap
+        return pixmap
+
+    def _repaint_all(self):
+        for box in list(self._boxes):
+            try:
+                box.update()
+            except RuntimeError:
+                # Deleted on the C++ side; the weak set drops it once the wrapper goes
+                pass
+
+
+_indicators = None
+
+
+def indicator_pixmaps():
+    global _indicators
+    if _indicators is None:
+        _indicators = IndicatorPixmaps()
+    return _indicators
+
 
 class CustomCheckBox(QCheckBox):
+    """Checkbox that paints the themed indicator image from the shared pixmap cache."""
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.setFixedSize(22, 22)
-        self.theme_manager = ThemeManager()
-        self.theme_manager.theme_Changed.connect(self.change_theme)
-        self.tick_icon = None  # Placeholder for tick icon
-        self.unchecked_icon = None  # Placeholder for unchecked icon
-
-        # Initialize with default stylesheet
-        self.change_theme()
+        indicator_pixmaps().register(self)
 
     def change_theme(self):
-        # Set the icons based on the current theme
-        if self.theme_manager.get_theme() == "dark":
-            self.tick_icon = os.path.join(darkTheme, 'checkedbox.svg')
-            self.unchecked_icon = os.path.join(darkTheme, 'uncheckedbox.svg')
-        else:
-            self.tick_icon = os.path.join(lightTheme, 'checkedbox.svg')
-            self.unchecked_icon = os.path.join(lightTheme, 'uncheckedbox.svg')
-
-        # Update stylesheet to apply new icons
-        self.updateStyleSheet()
-
-    def updateStyleSheet(self):
-        """Apply icons in stylesheet dynamically."""
-        tick_icon_path = f"url('{self.tick_icon}')" if self.tick_icon else ""
-        unchecked_icon_path = f"url('{self.unchecked_icon}')" if self.unchecked_icon else ""
-
-        self.setStyleSheet(f"""
-            QCheckBox {{
-                background: none;
-                border: none;
-                width: 22px;
-                height: 22px;
-            }}
-            QCheckBox::indicator {{
-                width: 22px;
-                height: 22px;
-            }}
-            QCheckBox::indicator:checked {{
-                image: {tick_icon_path};
-            }}
-            QCheckBox::indicator:unchecked {{
-                image: {unchecked_icon_path};
-            }}
-        """)
+        """Repaint with the current theme's indicator."""
+        self.update()
+
+    def hitButton(self, pos):
+        return self.rect().contains(pos)
 
+    def paintEvent(self, event):
+        size = min(self.width(), self.height())
+        pixmap = indicator_pixmaps().pixmap(self.isChecked(), size, self.devicePixelRatioF())
+        painter = QPainter(self)
+        painter.drawPixmap(QRectF(0, 0, size, size), pixmap, QRectF(pixmap.rect()))
 
 
 class MainWindow(QWidget):
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import requests
+
+host = "http://localhost:7600/api"
+
+# Shared session so every view reuses the same keep-alive connection to the local server
+session = requests.Session()
+
+default_timeout = 10
+
+# Set by traffic.start_capture to record request/response pairs
+recorder = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+latency_buckets_ms = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class EndpointStats:
+    __slots__ = ("calls", "errors", "timeouts", "gui_thread_calls", "bytes_sent", "bytes_received",
+                 "total_ms", "max_ms", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.gui_thread_calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * len(latency_buckets_ms)
+
+    def percentile(self, fraction):
+        """Approximate percentile in ms: the upper bound of the bucket holding it."""
+        target = fraction * self.calls
+        seen = 0
+        for bound, count in zip(latency_buckets_ms, self.histogram):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "error_rate": self.errors / self.calls if self.calls else 0.0,
+            "timeout_rate": self.timeouts / self.calls if self.calls else 0.0,
+            "gui_thread_calls": self.gui_thread_calls,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "mean_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(0.50), 2),
+            "p95_ms": round(self.percentile(0.95), 2),
+            "p99_ms": round(self.percentile(0.99), 2),
+            "max_ms": round(self.max_ms, 2),
+            "histogram": {str(bound): count for bound, count in zip(latency_buckets_ms, self.histogram)},
+        }
+
+
+class HttpTracer:
+    """Per-endpoint call counts, latency histograms, payload sizes and failure rates."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, elapsed_ms, sent, received, error=False, timeout=False):
+        on_gui_thread = threading.current_thread() is threading.main_thread()
+        index = next(i for i, bound in enumerate(latency_buckets_ms) if elapsed_ms <= bound)
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats()
+            stats.calls += 1
+            stats.errors += error
+            stats.timeouts += timeout
+            stats.gui_thread_calls += on_gui_thread
+            stats.bytes_sent += sent
+            stats.bytes_received += received
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.histogram[index] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: stats.snapshot() for endpoint, stats in sorted(self._stats.items())}
+
+    def snapshot_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+tracer = HttpTracer()
+
+
+def request(method, path, timeout=None, **kwargs):
+    """Send a request to the local server and record it in the tracer.
+
+    `path` is relative to `host`, e.g. "/0/getallsettings".
+    """
+    endpoint = f"{method.upper()} {path.split('?', 1)[0]}"
+    body = kwargs.get("data") or kwargs.get("json")
+    sent = len(body) if isinstance(body, (str, bytes)) else len(json.dumps(body)) if body is not None else 0
+    start = time.perf_counter()
+    try:
+        response = session.request(method, host + path, timeout=timeout or default_timeout, **kwargs)
+    except requests.Timeout:
+        tracer.record(endpoint, (time.perf_counter() - start) * 1000, sent, 0, error=True, timeout=True)
+        raise
+    except requests.RequestException:
+        tracer.record(endpoint, (time.perf_counter() - start) * 1000, sent, 0, error=True)
+        raise
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    tracer.record(endpoint, elapsed_ms, sent, len(response.content), error=response.status_code >= 400)
+    if recorder is not None and recorder.wants(path):
+        recorder.record(method, path, kwargs, response, elapsed_ms)
+    return response
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "last_modified", "digest", "fetched_at")
+
+    def __init__(self, body, etag=None, last_modified=None, digest=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.fetched_at = time.monotonic()
+
+
+class RevalidatingCache:
+    """Per-endpoint response cache that revalidates with conditional GETs.
+
+    Fresh entries are served from memory. Stale entries are served immediately
+    as well, while a background request revalidates them (stale-while-revalidate).
+    A 304 response only refreshes the entry's age. Entries are keyed by path
+    and token; storing one drops the path's entries for other tokens, so a
+    previous account's responses don't stay behind after a sign-in.
+    """
+
+    def __init__(self, max_age=30):
+        self.max_age = max_age
+        self._entries = {}
+        self._inflight = set()
+        self._listeners = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, token=None, default=None, max_age=None):
+        """Return the cached body for `path`, fetching synchronously only on a cold miss."""
+        key = (path, token)
+        max_age = self.max_age if max_age is None else max_age
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            entry = self._revalidate(key)
+            return entry.body if entry else default
+
+        if time.monotonic() - entry.fetched_at > max_age:
+            self._revalidate_in_background(key)
+        return entry.body
+
+    def put(self, path, body, token=None):
+        """Store a body we already have (e.g. returned by a write) as a fresh entry.
+
+        Subscribers aren't notified; the caller made the change and applies
+        it itself. A write answer carries no validators for `path`, so the
+        entry keeps the previous entry's only when the body is unchanged;
+        otherwise the next revalidation is a full GET, which adopts the
+        server's ETag without notifying when the content matches.
+        """
+        key = (path, token)
+        digest = _digest_json(body)
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous and previous.digest == digest:
+                entry = CacheEntry(body, previous.etag, previous.last_modified, digest)
+            else:
+                entry = CacheEntry(body, digest=digest)
+            self._store(key, entry)
+
+    def invalidate(self, path=None):
+        """Drop the cached entries for `path`, or every entry when no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == path]:
+                    del self._entries[key]
+
+    def subscribe(self, path, callback):
+        """Call `callback(body)` whenever a revalidation returns changed content for `path`."""
+        self._listeners.setdefault(path, []).append(callback)
+
+    def unsubscribe(self, path, callback):
+        callbacks = self._listeners.get(path, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _revalidate_in_background(self, key):
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight.add(key)
+        threading.Thread(target=self._revalidate, args=(key,), daemon=True).start()
+
+    def _revalidate(self, key):
+        path, token = key
+        with self._lock:
+            entry = self._entries.get(key)
+
+        headers = {}
+        if token:
+            headers["Authorization"] = token
+        if entry:
+            # Only the server's own ETag can match; our content hash is compared after the response
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            response = request("GET", path, headers=headers)
+            if response.status_code == 304 and entry:
+                entry.fetched_at = time.monotonic()
+                return entry
+            if response.status_code != 200:
+                logger.warning("Error fetching %s: %s", path, response.status_code)
+                return entry
+
+            body = response.json()
+            digest = _digest_json(body)
+            if entry and entry.digest == digest:
+                # Server ignored the validators but the content is identical, so listeners aren't notified
+                entry.etag = response.headers.get("ETag", entry.etag)
+                entry.last_modified = response.headers.get("Last-Modified", entry.last_modified)
+                entry.fetched_at = time.monotonic()
+                return entry
+
+            new_entry = CacheEntry(
+                body,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                digest=digest,
+            )
+            with self._lock:
+                self._store(key, new_entry)
+            if entry:
+                self._notify(path, new_entry.body)
+            return new_entry
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Error revalidating %s: %s", path, e)
+            return entry
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def _store(self, key, entry):
+        # Called with the lock held
+        path, token = key
+        for other in [other for other in self._entries if other[0] == path and other[1] != token]:
+            del self._entries[other]
+        self._entries[key] = entry
+
+    def _notify(self, path, body):
+        for callback in list(self._listeners.get(path, [])):
+            callback(body)
+
+
+def server_ready(timeout=2):
+    """Readiness probe: True when the local server answers /0/server_status."""
+    try:
+        return request("GET", "/0/server_status", timeout=timeout).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def _digest_json(body):
+    # Hashes the decoded body, so bodies stored by put() and fetched ones compare equal
+    return hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+
+response_cache = RevalidatingCache()
@@ -0,0 +1,75 @@
+import logging
+from datetime import datetime
+
+from PySide6.QtCore import QSettings
+
+logger = logging.getLogger(__name__)
+
+default_gap_seconds = 60
+
+
+def configured_gap():
+    """Largest gap in seconds between two events of one app that still merges them; 0 only merges touching events."""
+    try:
+        return max(0, int(QSettings("ralvie.ai", "Sundial").value("coalesce_gap_seconds", default_gap_seconds)))
+    except (TypeError, ValueError):
+        return default_gap_seconds
+
+
+class Coalescer:
+    """Merges consecutive events of the same application into one display row.
+
+    Works on listView()-formatted events. A row keeps the id of its first
+    event, so it stays the same row while it grows. `ids` lists every event
+    merged into it and `titles` their distinct window titles. `add` only
+    looks at the events it's given: a new fragment either extends the last
+    row or starts a new one, and an event seen before updates the row it
+    was merged into.
+    """
+
+    def __init__(self, gap=None):
+        self.gap = configured_gap() if gap is None else gap
+        self.rows = []
+        self._row_of = {}  # event id -> row
+
+    def clear(self):
+        self.rows = []
+        self._row_of.clear()
+
+    def add(self, events):
+        """Merge formatted events in and return the rows that were added or changed, in order."""
+        changed = {}
+        for event in events:
+            row = self._row_of.get(event['id'])
+            if row is None:
+                last = self.rows[-1] if self.rows else None
+                if last is not None and last['app'] == event['app'] and \
+                        _seconds_between(last['end'], event['start']) <= self.gap:
+                    row = last
+                    row['ids'].append(event['id'])
+                else:
+                    row = dict(event, ids=[event['id']], titles=[])
+                    self.rows.append(row)
+                self._row_of[event['id']] = row
+            if event.get('title') and event['title'] not in row['titles']:
+                row['titles'].append(event['title'])
+            if event['end'] > row['end']:
+                row['end'] = event['end']
+                row['time'] = f"{row['time'].split(' - ')[0]} - {event['time'].split(' - ')[1]}"
+            changed[row['id']] = row
+        return list(changed.values())
+
+    def row_for(self, event_id):
+        """The row an event was merged into, or None."""
+        return self._row_of.get(event_id)
+
+
+def coalesce(events, gap=None):
+    """Rows for a complete list of formatted events."""
+    coalescer = Coalescer(gap)
+    coalescer.add(events)
+    return coalescer.rows
+
+
+def _seconds_between(end, start):
+    return (datetime.fromisoformat(start[:-1]) - datetime.fromisoformat(end[:-1])).total_seconds()
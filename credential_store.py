@@ -0,0 +1,79 @@
+import json
+import threading
+
+from PySide6.QtCore import QObject, Signal
+from sd_core.cache import cache_user_credentials, add_password, clear_credentials
+
+
+class CredentialStore(QObject):
+    """Memoizes the keyring credentials so the OS keyring is read once per change.
+
+    Writes go through `set` and `clear`, which update the keyring and the
+    in-memory copy together and emit `credentials_changed`.
+    """
+    credentials_changed = Signal(object)  # Emits the new credentials dict, or None when cleared
+
+    def __init__(self, key="SD_KEYS"):
+        super().__init__()
+        self.key = key
+        self._creds = None
+        self._loaded = False
+        self._persist = True
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return a copy of the cached credentials, reading the keyring only on the first call."""
+        with self._lock:
+            if not self._loaded:
+                self._creds = cache_user_credentials(self.key)
+                self._loaded = True
+            return dict(self._creds) if self._creds else self._creds
+
+    def set(self, creds):
+        """Persist new credentials to the keyring and serve them from memory."""
+        if self._persist:
+            add_password(self.key, json.dumps(creds))
+        with self._lock:
+            previous = self._creds
+            self._creds = dict(creds)
+            self._loaded = True
+        if previous != creds:
+            self.credentials_changed.emit(dict(creds))
+
+    def clear(self):
+        """Clear the cached keyring entry; the next `get` re-reads it."""
+        if self._persist:
+            clear_credentials(self.key)
+            self.invalidate()
+        else:
+            # After preload() memory is the only store; re-reading would reach the real keyring
+            with self._lock:
+                self._creds = None
+                self._loaded = True
+        self.credentials_changed.emit(None)
+
+    def preload(self, creds):
+        """Serve `creds` from memory and keep later writes out of the keyring, e.g. for benchmarks."""
+        with self._lock:
+            self._creds = dict(creds)
+            self._loaded = True
+            self._persist = False
+
+    def invalidate(self):
+        """Forget the in-memory copy, e.g. after another process rotated the token; a no-op after preload()."""
+        with self._lock:
+            if not self._persist:
+                return
+            self._creds = None
+            self._loaded = False
+
+
+_store = None
+
+
+def credential_store():
+    """Return the process-wide credential store."""
+    global _store
+    if _store is None:
+        _store = CredentialStore()
+    return _store
@@ -0,0 +1,59 @@
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+# The tables and indexes the sd-server's peewee datastore creates
+schema = (
+    'CREATE TABLE "bucketmodel" ("key" INTEGER NOT NULL PRIMARY KEY, "id" VARCHAR(255) NOT NULL, '
+    '"created" DATETIME NOT NULL, "name" VARCHAR(255), "type" VARCHAR(255) NOT NULL, '
+    '"client" VARCHAR(255) NOT NULL, "hostname" VARCHAR(255) NOT NULL, "datastr" VARCHAR(255))',
+    'CREATE UNIQUE INDEX "bucketmodel_id" ON "bucketmodel" ("id")',
+    'CREATE TABLE "eventmodel" ("id" INTEGER NOT NULL PRIMARY KEY, "bucket_id" INTEGER NOT NULL, '
+    '"timestamp" DATETIME NOT NULL, "duration" DECIMAL(10, 5) NOT NULL, "datastr" VARCHAR(255) NOT NULL, '
+    'FOREIGN KEY ("bucket_id") REFERENCES "bucketmodel" ("key"))',
+    'CREATE INDEX "eventmodel_bucket_id" ON "eventmodel" ("bucket_id")',
+    'CREATE INDEX "eventmodel_timestamp" ON "eventmodel" ("timestamp")',
+)
+
+
+def build_datastore(path, events, hostname="fixture"):
+    """Write a stand-in for the sd-server datastore at `path` holding `events`.
+
+    `events` are in the /0/dashboard/events format; each becomes a window
+    event whose row id is its event_id. An AFK bucket with one event
+    covering the whole range is added too, which the reader must skip.
+    Returns `path`.
+    """
+    db = sqlite3.connect(path, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    for statement in schema:
+        db.execute(statement)
+
+    created = datetime.now(timezone.utc).isoformat(sep=" ")
+    db.execute("BEGIN")
+    db.executemany(
+        'INSERT INTO bucketmodel (key, id, created, name, type, client, hostname) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(1, f"sd-watcher-window_{hostname}", created, None, "currentwindow", "sd-watcher-window", hostname),
+         (2, f"sd-watcher-afk_{hostname}", created, None, "afkstatus", "sd-watcher-afk", hostname)])
+    db.executemany(
+        'INSERT INTO eventmodel (id, bucket_id, timestamp, duration, datastr) VALUES (?, 1, ?, ?, ?)',
+        [(event["event_id"], _timestamp(event["start"]),
+          (_parse(event["end"]) - _parse(event["start"])).total_seconds(),
+          json.dumps({"app": event["application_name"], "title": event.get("title") or ""}))
+         for event in events])
+    if events:
+        first, last = min(event["start"] for event in events), max(event["end"] for event in events)
+        db.execute('INSERT INTO eventmodel (bucket_id, timestamp, duration, datastr) VALUES (2, ?, ?, ?)',
+                   (_timestamp(first), (_parse(last) - _parse(first)).total_seconds(),
+                    json.dumps({"status": "not-afk"})))
+    db.execute("COMMIT")
+    db.close()
+    return path
+
+
+def _parse(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+def _timestamp(value):
+    return _parse(value).isoformat(sep=" ", timespec="microseconds")
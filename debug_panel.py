@@ -0,0 +1,62 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, \
+    QApplication, QHeaderView
+
+from sd_qt.sd_desktop.client import tracer
+from sd_qt.sd_desktop.scheduler import task_scheduler
+
+
+class HttpTracePanel(QWidget):
+    """Live view of the per-endpoint HTTP trace, refreshed every second while open."""
+    columns = [("Endpoint", None), ("Calls", "calls"), ("p50 ms", "p50_ms"), ("p95 ms", "p95_ms"),
+               ("p99 ms", "p99_ms"), ("Max ms", "max_ms"), ("Errors", "errors"), ("Timeouts", "timeouts"),
+               ("GUI thread", "gui_thread_calls"), ("KB in", "bytes_received")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("HTTP trace")
+        self.resize(900, 300)
+
+        self.table = QTableWidget(0, len(self.columns), self)
+        self.table.setHorizontalHeaderLabels([title for title, _ in self.columns])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+
+        copy_button = QPushButton("Copy JSON", self)
+        copy_button.clicked.connect(lambda: QApplication.clipboard().setText(tracer.snapshot_json()))
+        reset_button = QPushButton("Reset", self)
+        reset_button.clicked.connect(self.reset)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(reset_button)
+        buttons.addWidget(copy_button)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        task_scheduler().add_job("http_trace_panel", self.refresh, 1, owner=self)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        task_scheduler().remove_job("http_trace_panel")
+
+    def reset(self):
+        tracer.reset()
+        self.refresh()
+
+    def refresh(self):
+        snapshot = tracer.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (endpoint, stats) in enumerate(snapshot.items()):
+            for column, (_, key) in enumerate(self.columns):
+                if key is None:
+                    value = endpoint
+                elif key == "bytes_received":
+                    value = f"{stats[key] / 1024:.1f}"
+                else:
+                    value = str(stats[key])
+                self.table.setItem(row, column, QTableWidgetItem(value))
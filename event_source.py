@@ -0,0 +1,203 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sd_qt.sd_desktop import client
+from sd_qt.sd_desktop.credential_store import credential_store
+from sd_qt.sd_desktop.paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+time_format = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class EventSource:
+    """Where raw activity events come from.
+
+    `events_between` takes two naive UTC datetimes and returns the events
+    overlapping them in the sd-server's /0/dashboard/events format, or
+    None when they can't be read right now.
+    """
+    name = None
+
+    def events_between(self, start_utc, end_utc):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HttpEventSource(EventSource):
+    """The sd-server's /0/dashboard/events endpoint."""
+    name = "http"
+
+    def events_between(self, start_utc, end_utc):
+        logger.debug("Fetching events from %s to %s", start_utc, end_utc)
+
+        creds = credential_store().get()
+        if not creds:
+            logger.info("No credentials found")
+            return None
+
+        response = client.request(
+            "GET", "/0/dashboard/events",
+            params={"start": str(start_utc), "end": str(end_utc)},
+            headers={"Authorization": creds['token']}
+        )
+
+        if response.status_code != 200:
+            logger.warning("Error fetching events: %s", response.status_code)
+            return None
+
+        event_data = response.json()
+        return event_data['events'] if event_data else []
+
+
+class DatastoreEventSource(EventSource):
+    """Reads window events straight from the local sd-server's SQLite datastore.
+
+    The file is opened read-only and queried by the (bucket, timestamp)
+    index the server keeps. Window events of a bucket don't overlap, so
+    besides the events starting in the range only the last one starting
+    before it can reach into it. The server keeps its datastore in WAL
+    mode, so reading never blocks its writes.
+    """
+    name = "datastore"
+    datastore_name = "peewee-sqlite.v2.db"
+    # Formatting and JSON decoding happen in SQLite, so Python only builds the dicts. The end is
+    # computed on julian days: a "+N seconds" modifier built from the duration's text is NULL for
+    # small REAL durations, which SQLite writes in exponent form (1.0e-05)
+    select = ("SELECT id, strftime('%Y-%m-%dT%H:%M:%SZ', timestamp), "
+              "strftime('%Y-%m-%dT%H:%M:%SZ', julianday(timestamp) + duration / 86400.0), "
+              "json_extract(datastr, '$.app'), json_extract(datastr, '$.title') FROM eventmodel ")
+
+    def __init__(self, path=None, bucket_type="currentwindow"):
+        self.path = path or default_datastore_path()
+        self.bucket_type = bucket_type
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._db.execute("PRAGMA query_only = 1")
+        self._db.execute("PRAGMA mmap_size = 268435456")
+        tables = {row[0] for row in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not {"bucketmodel", "eventmodel"} <= tables:
+            self._db.close()
+            raise sqlite3.DatabaseError(f"{self.path} is not an sd-server datastore")
+
+    def events_between(self, start_utc, end_utc):
+        start, end = _datastore_time(start_utc), _datastore_time(end_utc)
+        with self._lock:
+            buckets = [key for (key,) in self._db.execute(
+                "SELECT key FROM bucketmodel WHERE type = ?", (self.bucket_type,))]
+            rows = []
+            for bucket in buckets:
+                # "+bucket_id" keeps SQLite on the timestamp index rather than the per-bucket one
+                rows += self._db.execute(
+                    self.select + "WHERE +bucket_id = ? AND timestamp < ? ORDER BY timestamp DESC LIMIT 1",
+                    (bucket, start)).fetchall()
+                rows += self._db.execute(
+                    self.select + "WHERE +bucket_id = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+                    (bucket, start, end)).fetchall()
+
+        first = start_utc.strftime(time_format)
+        # A row whose times SQLite can't read has no end; it's left out rather than guessed
+        events = [{"event_id": event_id, "application_name": app, "title": title, "start": event_start,
+                   "end": event_end}
+                  for event_id, event_start, event_end, app, title in rows
+                  if event_end is not None and event_end > first]
+        if len(buckets) > 1:
+            events.sort(key=lambda event: event["start"])
+        return events
+
+    def close(self):
+        self._db.close()
+
+
+def default_datastore_path():
+    """$SD_DATASTORE, or the sd-server's datastore next to this client's data directory."""
+    return os.environ.get("SD_DATASTORE") or os.path.join(
+        os.path.dirname(data_dir()), "sd-server", DatastoreEventSource.datastore_name)
+
+
+def _datastore_time(value):
+    # The datastore keeps UTC timestamps as "YYYY-MM-DD HH:MM:SS[.ffffff]+00:00", which sort as text
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def select_event_source(candidates=None, probe_seconds=3600):
+    """The fastest of the usable event sources, falling back to HTTP.
+
+    Each source reads the last `probe_seconds` of events. A source other
+    than HTTP only counts if it returns the same events as HTTP, so a
+    datastore laid out differently from what the reader expects is never
+    used. $SD_EVENT_SOURCE ("http" or "datastore") skips the probe.
+    """
+    forced = os.environ.get("SD_EVENT_SOURCE")
+    if candidates is None:
+        candidates = [HttpEventSource]
+        if forced != "http" and os.path.exists(default_datastore_path()):
+            candidates.append(DatastoreEventSource)
+
+    sources = []
+    for candidate in candidates:
+        try:
+            sources.append(candidate())
+        except (OSError, sqlite3.Error) as error:
+            logger.info("Event source %s unavailable: %s", candidate.name, error)
+    for source in sources:
+        if source.name == forced:
+            return source
+
+    end = datetime.utcnow()
+    start = end - timedelta(seconds=probe_seconds)
+    timings = {}
+    probed = {}
+    # HTTP goes last, so an event that appears mid-probe can only be missing from the others
+    for source in sorted(sources, key=lambda source: source.name == "http"):
+        began = time.perf_counter()
+        try:
+            events = source.events_between(start, end)
+        except Exception as error:
+            logger.info("Event source %s failed its probe: %s", source.name, error)
+            continue
+        if events is not None:
+            timings[source.name] = time.perf_counter() - began
+            probed[source.name] = {str(event["event_id"]) for event in events}
+
+    reference = probed.get("http")
+    for name, ids in probed.items():
+        if name != "http" and (reference is None or not ids <= reference or len(reference - ids) > 1):
+            logger.info("Event source %s doesn't match the server, not using it", name)
+            del timings[name]
+
+    chosen = min(timings, key=timings.get) if timings else "http"
+    logger.info("Using the %s event source (probe times: %s)", chosen,
+                ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items()) or "none")
+    for source in sources:
+        if source.name != chosen:
+            source.close()
+    return next((source for source in sources if source.name == chosen), None) or HttpEventSource()
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def replace_event_source(source):
+    """Swap the process-wide event source, e.g. for HTTP once the datastore can't be read."""
+    global _source
+    with _source_lock:
+        previous, _source = _source, source
+    if previous is not None and previous is not source:
+        previous.close()
+
+
+def event_source():
+    """Return the process-wide event source, choosing it on first use."""
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = select_event_source()
+        return _source
@@ -0,0 +1,129 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from sd_qt.sd_desktop.paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+
+class EventStore:
+    """Local SQLite copy of the raw events fetched from /0/dashboard/events.
+
+    Events are kept in the server's format and keyed by `event_id`, so
+    re-fetching an event that is still growing just updates it. Days whose
+    events have all been fetched are marked complete and can be served
+    without asking the server again.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir(), "events.sqlite")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                event_id TEXT PRIMARY KEY,
+                application_name TEXT,
+                title TEXT,
+                start TEXT NOT NULL,
+                end TEXT NOT NULL
+            )
+        """)
+        # (start, event_id) orders events totally, so range reads can resume after the last row seen
+        self._db.execute("DROP INDEX IF EXISTS events_start")
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_start_id ON events (start, event_id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_end ON events (end)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS complete_days (day TEXT PRIMARY KEY, fetched_at REAL)")
+
+    def put_events(self, events):
+        """Insert or update raw events."""
+        if not events:
+            return
+        rows = [(str(event["event_id"]), event.get("application_name"), event.get("title"),
+                 event["start"], event["end"]) for event in events]
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO events (event_id, application_name, title, start, end) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(event_id) DO UPDATE SET application_name = excluded.application_name, "
+                "title = excluded.title, start = excluded.start, end = excluded.end", rows)
+            self._db.execute("COMMIT")
+
+    def events_between(self, start, end):
+        """Raw events overlapping [start, end), both "%Y-%m-%dT%H:%M:%SZ" UTC strings, ordered by start."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT event_id, application_name, title, start, end FROM events "
+                "WHERE end > ? AND start < ? ORDER BY start", (start, end)).fetchall()
+        return [_row_event(row) for row in rows]
+
+    def iter_events(self, start, end, chunk_size=5000):
+        """Yield lists of at most `chunk_size` raw events overlapping [start, end), ordered by start.
+
+        Each chunk is a separate query continuing after the last event of
+        the previous one, so only one chunk is in memory at a time and the
+        store stays writable between chunks.
+        """
+        after = ("", "")
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT event_id, application_name, title, start, end FROM events "
+                    "WHERE end > ? AND start < ? AND (start, event_id) > (?, ?) "
+                    "ORDER BY start, event_id LIMIT ?", (start, end, *after, chunk_size)).fetchall()
+            if not rows:
+                return
+            after = (rows[-1][3], rows[-1][0])
+            yield [_row_event(row) for row in rows]
+            if len(rows) < chunk_size:
+                return
+
+    def count_between(self, start, end):
+        """Number of events overlapping [start, end)."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM events WHERE end > ? AND start < ?",
+                                    (start, end)).fetchone()[0]
+
+    def mark_complete(self, day):
+        """Record that every event of the local date `day` is stored."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO complete_days (day, fetched_at) VALUES (?, ?)",
+                             (day.isoformat(), time.time()))
+
+    def clear(self):
+        """Drop every stored event and completed day, e.g. when the user signs out."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM events")
+            self._db.execute("DELETE FROM complete_days")
+            self._db.execute("COMMIT")
+
+    def is_complete(self, day):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM complete_days WHERE day = ?",
+                                    (day.isoformat(),)).fetchone() is not None
+
+
+def _row_event(row):
+    event_id, application_name, title, start, end = row
+    return {"event_id": _event_id(event_id), "application_name": application_name, "title": title,
+            "start": start, "end": end}
+
+
+def _event_id(value):
+    # The server's ids are integers; keep them that way when they round-trip through the TEXT column
+    return int(value) if value.isdigit() else value
+
+
+_store = None
+
+
+def event_store():
+    """Return the process-wide event store."""
+    global _store
+    if _store is None:
+        _store = EventStore()
+    return _store
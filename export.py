@@ -0,0 +1,228 @@
+"""Export stored activity history to CSV, JSON Lines or Parquet.
+
+Events are streamed out of the local event store in fixed-size chunks and
+written as they're read, so memory use doesn't grow with the range. Only
+events already in the store are exported; days the client never fetched
+are not downloaded for the export.
+
+    python -m sd_qt.sd_desktop.export 2024-05-01 2024-05-31 may.csv
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import date
+
+from PySide6.QtCore import QDate, QObject, Signal
+from PySide6.QtWidgets import QComboBox, QDateEdit, QDialog, QDialogButtonBox, QFormLayout
+
+from sd_qt.sd_desktop.event_store import event_store
+from sd_qt.sd_desktop.util import day_bounds_utc
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+fields = ("event_id", "application_name", "title", "start", "end")
+time_format = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fields, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, events):
+        self._writer.writerows(events)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, events):
+        self._file.writelines(json.dumps({field: event.get(field) for field in fields}) + "\n" for event in events)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Writes each chunk as its own row group."""
+
+    def __init__(self, path):
+        self._schema = pyarrow.schema([(field, pyarrow.string()) for field in fields])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, events):
+        columns = {field: [event.get(field) for event in events] for field in fields}
+        columns["event_id"] = [str(event_id) for event_id in columns["event_id"]]
+        self._writer.write_table(pyarrow.table(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+writers = {"csv": CsvWriter, "jsonl": JsonlWriter, "parquet": ParquetWriter}
+
+
+def available_formats():
+    """Export formats usable here; Parquet needs pyarrow."""
+    return [name for name in writers if name != "parquet" or pyarrow is not None]
+
+
+def format_for_path(path):
+    """The export format implied by a file name's extension, or None."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    extension = {"json": "jsonl", "ndjson": "jsonl", "pq": "parquet"}.get(extension, extension)
+    return extension if extension in writers else None
+
+
+def export_events(path, first_day, last_day, fmt=None, chunk_size=5000, progress=None, cancelled=None):
+    """Write the stored events of local days `first_day` to `last_day` inclusive to `path`.
+
+    `progress(written, total)` is called after every chunk. The file is
+    written under a temporary name and only moved into place once
+    complete, so a failed or cancelled export leaves nothing behind.
+    Returns the number of events written, or None if `cancelled()` became
+    true.
+    """
+    fmt = fmt or format_for_path(path) or "csv"
+    if fmt not in available_formats():
+        raise ValueError(f"Export format {fmt!r} is not available")
+
+    start = day_bounds_utc(first_day)[0].strftime(time_format)
+    end = day_bounds_utc(last_day)[1].strftime(time_format)
+    store = event_store()
+    total = store.count_between(start, end)
+    logger.info("Exporting %d events from %s to %s as %s to %s", total, first_day, last_day, fmt, path)
+
+    partial = path + ".part"
+    writer = writers[fmt](partial)
+    written = 0
+    complete = False
+    try:
+        for events in store.iter_events(start, end, chunk_size):
+            if cancelled and cancelled():
+                break
+            writer.write(events)
+            written += len(events)
+            if progress:
+                progress(written, max(total, written))
+        else:
+            complete = True
+    finally:
+        writer.close()
+        if not complete:
+            os.remove(partial)
+    if not complete:
+        return None
+    os.replace(partial, path)
+    return written
+
+
+class ExportJob(QObject):
+    """Runs one export on a worker thread and reports back through signals."""
+    progress = Signal(int, int)  # written, total
+    finished = Signal(str, int)  # path, events written
+    failed = Signal(str)  # error message; also emitted when cancelled
+
+    def __init__(self, path, first_day, last_day, fmt=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.first_day = first_day
+        self.last_day = last_day
+        self.fmt = fmt
+        self._cancelled = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="export", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        try:
+            written = export_events(self.path, self.first_day, self.last_day, self.fmt,
+                                    progress=self.progress.emit, cancelled=self._cancelled.is_set)
+        except Exception as error:
+            logger.exception("Export to %s failed", self.path)
+            self.failed.emit(str(error))
+            return
+        if written is None:
+            self.failed.emit("Export cancelled")
+        else:
+            self.finished.emit(self.path, written)
+
+
+class ExportDialog(QDialog):
+    """Asks for the day range and format of an export."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export activity")
+
+        today = QDate.currentDate()
+        self.first_day = QDateEdit(today.addDays(-6), self)
+        self.last_day = QDateEdit(today, self)
+        for edit in (self.first_day, self.last_day):
+            edit.setCalendarPopup(True)
+            edit.setMaximumDate(today)
+            edit.setDisplayFormat("yyyy-MM-dd")
+        self.format = QComboBox(self)
+        self.format.addItems(available_formats())
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QFormLayout(self)
+        layout.addRow("From", self.first_day)
+        layout.addRow("To", self.last_day)
+        layout.addRow("Format", self.format)
+        layout.addRow(buttons)
+
+    def selection(self):
+        """(first day, last day, format) with the days in order."""
+        first, last = sorted((self.first_day.date().toPython(), self.last_day.date().toPython()))
+        return first, last, self.format.currentText()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export stored activity history.")
+    parser.add_argument("first_day", type=date.fromisoformat, help="first local day, YYYY-MM-DD")
+    parser.add_argument("last_day", type=date.fromisoformat, help="last local day, inclusive")
+    parser.add_argument("output", help="file to write; the format follows its extension unless --format is given")
+    parser.add_argument("--format", choices=list(writers))
+    parser.add_argument("--chunk-size", type=int, default=5000, help="events read and written at a time")
+    args = parser.parse_args(argv)
+
+    def report(written, total):
+        print(f"\r{written}/{total} events", end="", file=sys.stderr, flush=True)
+
+    try:
+        written = export_events(args.output, args.first_day, args.last_day, args.format, args.chunk_size,
+                                progress=report)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"\rExported {written} events to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from PySide6.QtCore import QObject, Signal
+
+from sd_qt.sd_desktop.aggregates import day_totals
+from sd_qt.sd_desktop.coalesce import coalesce
+from sd_qt.sd_desktop.event_store import event_store
+from sd_qt.sd_desktop.util import day_bounds_utc, fetch_events, listView
+
+logger = logging.getLogger(__name__)
+
+time_format = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class DayHistory(QObject):
+    """Past days' events for the Activities date navigator, one local day per page.
+
+    A day is read from the local event store when it was already fetched in
+    full, otherwise with a start/end range query (falling back to whatever
+    the store has when the server is unreachable). Loading and prefetching
+    happen on a worker thread. The most recently used days are kept
+    materialized, bounded by `max_days`, together with their per-app
+    totals; the process-wide usage aggregates only hold today. A day read
+    from the store because the server was down is kept too, but requesting
+    it again loads it afresh.
+    """
+    day_loaded = Signal(object, object)  # date, display rows
+
+    def __init__(self, max_days=14):
+        super().__init__()
+        self.max_days = max_days
+        self._days = OrderedDict()
+        self._inflight = set()
+        self._generation = 0  # Bumped by clear(), so loads started before it are dropped
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history")
+
+    def cached(self, day):
+        """The day's display rows if they are materialized, else None."""
+        with self._lock:
+            loaded = self._days.get(day)
+            if loaded is None:
+                return None
+            self._days.move_to_end(day)
+            return loaded[0]
+
+    def cached_totals(self, day):
+        """The day's seconds per application, largest first, if it is materialized, else None."""
+        with self._lock:
+            loaded = self._days.get(day)
+            return loaded[1] if loaded is not None else None
+
+    def request(self, day):
+        """Load `day` in the background unless it's cached in full or already loading; `day_loaded` fires when done."""
+        with self._lock:
+            if (day in self._days and self._days[day][2]) or day in self._inflight:
+                return
+            self._inflight.add(day)
+            generation = self._generation
+        self._executor.submit(self._load, day, generation)
+
+    def prefetch_around(self, day):
+        """Warm the days either side of `day`, never past yesterday."""
+        for neighbour in (day - timedelta(days=1), day + timedelta(days=1)):
+            if neighbour < date.today():
+                self.request(neighbour)
+
+    def clear(self):
+        """Forget every materialized day, including those still loading, e.g. on sign-out."""
+        with self._lock:
+            self._days.clear()
+            self._inflight.clear()
+            self._generation += 1
+
+    def _load(self, day, generation):
+        try:
+            raw, complete = self._raw_events(day)
+            totals = day_totals(raw, day)
+            events = coalesce(listView(raw))
+        except Exception:
+            logger.exception("Loading events for %s failed", day)
+            return
+        finally:
+            with self._lock:
+                if generation == self._generation:
+                    self._inflight.discard(day)
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._days[day] = (events, totals, complete)
+            self._days.move_to_end(day)
+            while len(self._days) > self.max_days:
+                self._days.popitem(last=False)
+        self.day_loaded.emit(day, events)
+
+    def _raw_events(self, day):
+        """The day's raw events, and whether they are all of them rather than what the store happens to hold."""
+        start, end = day_bounds_utc(day)
+        store = event_store()
+        if store.is_complete(day):
+            return store.events_between(start.strftime(time_format), end.strftime(time_format)), True
+
+        raw = fetch_events(start, end)
+        if raw is None:
+            logger.info("Server unavailable, showing stored events for %s", day)
+            return store.events_between(start.strftime(time_format), end.strftime(time_format)), False
+
+        store.put_events(raw)
+        if day < date.today():
+            store.mark_complete(day)
+        return sorted(raw, key=lambda event: event["start"]), True
+
+
+_history = None
+
+
+def day_history():
+    """Return the process-wide day history. Must first be called on the GUI thread."""
+    global _history
+    if _history is None:
+        _history = DayHistory()
+    return _history
@@ -0,0 +1,77 @@
+import gc
+import logging
+import tracemalloc
+from collections import Counter
+
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication
+
+from sd_qt.sd_desktop.metrics import process_rss
+
+logger = logging.getLogger(__name__)
+
+
+def flush_deletes():
+    """Run pending deleteLater() calls and collect Python garbage."""
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    QApplication.processEvents()
+    gc.collect()
+
+
+def live_object_counts():
+    """Count live widgets by Qt class name and Python-wrapped QObjects by Python class name."""
+    counts = Counter(f"widget:{widget.metaObject().className()}" for widget in QApplication.allWidgets())
+    counts.update(f"py:{type(obj).__name__}" for obj in gc.get_objects() if isinstance(obj, QObject))
+    return counts
+
+
+class Checkpoint:
+    __slots__ = ("label", "counts", "rss", "snapshot")
+
+    def __init__(self, label, counts, rss, snapshot):
+        self.label = label
+        self.counts = counts
+        self.rss = rss
+        self.snapshot = snapshot
+
+
+class LeakTracker:
+    """Records live QObject counts, RSS and tracemalloc snapshots at teardown points.
+
+    Comparing two checkpoints taken at the same point of a repeated cycle
+    (e.g. after each sign-out) shows which classes and allocation sites keep
+    growing, i.e. what survives teardown.
+    """
+
+    def __init__(self, trace_frames=10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(trace_frames)
+        self.checkpoints = {}
+
+    def checkpoint(self, label):
+        flush_deletes()
+        point = Checkpoint(label, live_object_counts(), process_rss(), tracemalloc.take_snapshot())
+        previous = self.checkpoints.get(label)
+        self.checkpoints[label] = point
+        if previous:
+            report = self.compare(previous, point)
+            if report["objects"]:
+                logger.warning("Objects surviving %s: %s", label, report["objects"])
+            logger.info("Leak check at %s: RSS %+d KiB, top allocations %s", label,
+                        report["rss_delta"] // 1024, report["allocations"][:3])
+        return point
+
+    def compare(self, before, after, limit=10):
+        """Classes whose live count grew, RSS delta, and the allocation sites that grew most."""
+        objects = {name: after.counts[name] - before.counts[name] for name in after.counts
+                   if after.counts[name] > before.counts[name]}
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__),
+                   tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+        stats = after.snapshot.filter_traces(ignored).compare_to(before.snapshot.filter_traces(ignored), "lineno")
+        allocations = [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {stat.size_diff:+d} B"
+                       for stat in stats[:limit] if stat.size_diff > 0]
+        return {
+            "objects": dict(sorted(objects.items(), key=lambda item: -item[1])),
+            "rss_delta": (after.rss or 0) - (before.rss or 0),
+            "allocations": allocations,
+        }
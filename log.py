@@ -0,0 +1,97 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+from sd_qt.sd_desktop.paths import data_dir
+
+package_logger = "sd_qt.sd_desktop"
+
+_listener = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets at most `burst` records from the same call site through per `period` seconds.
+
+    When a call site is allowed through again, the message notes how many
+    similar records were suppressed in between.
+    """
+
+    def __init__(self, burst=5, period=60.0):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        site = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window_start, count, suppressed = self._sites.get(site, (now, 0, 0))
+            if now - window_start > self.period:
+                window_start, count = now, 0
+            if count >= self.burst:
+                self._sites[site] = (window_start, count, suppressed + 1)
+                return False
+            self._sites[site] = (window_start, count + 1, 0)
+
+        if suppressed:
+            record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+        return True
+
+
+def setup_logging(level=None, module_levels=None, log_dir=None, console=True):
+    """Configure the desktop client's logging.
+
+    Records are handed to a QueueHandler and written by a background
+    listener to a rotating file, so the GUI thread never waits on disk I/O.
+    The level defaults to $SD_LOG_LEVEL (INFO). Per-module levels come from
+    $SD_LOG_LEVELS, e.g. "util=DEBUG,Dashboard=WARNING". Debug calls below
+    the level cost only the level check, because messages use lazy %-style
+    arguments.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    root = logging.getLogger(package_logger)
+    root.setLevel(level or os.environ.get("SD_LOG_LEVEL", "INFO").upper())
+    root.propagate = False
+
+    levels = module_levels or os.environ.get("SD_LOG_LEVELS", "")
+    for item in filter(None, (part.strip() for part in levels.split(","))):
+        module, _, module_level = item.partition("=")
+        logging.getLogger(f"{package_logger}.{module}").setLevel(module_level.upper())
+
+    formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s")
+    log_dir = log_dir or os.path.join(data_dir(), "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(log_dir, "sd-desktop.log"), maxBytes=1_000_000, backupCount=5, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,19 +1,35 @@
-import json
+import logging
+import os
 import sys
 import time  # Import time module for measuring load time
-import schedule
 from pathlib import Path
 from PySide6.QtCore import QSettings, Signal, QEvent, QTimer
-from PySide6.QtWidgets import QMainWindow, QApplication, QStackedWidget, QSystemTrayIcon, QMenu
+from PySide6.QtWidgets import QMainWindow, QApplication, QStackedWidget, QSystemTrayIcon, QMenu, QDialog, QFileDialog
 from PySide6.QtGui import QIcon, QSurfaceFormat, QAction
 from sd_qt.sd_desktop.ThemeManager import ThemeManager
-from sd_core.cache import add_password
 from sd_qt.sd_desktop.Dashboard import Dashboard
 from sd_qt.sd_desktop.onboard import Onboarding
 from sd_qt.sd_desktop.signin import SignIn
-from sd_qt.sd_desktop.util import credentials
+from sd_qt.sd_desktop.credential_store import credential_store
+from sd_qt.sd_desktop.debug_panel import HttpTracePanel
+from sd_qt.sd_desktop.export import ExportDialog, ExportJob, main as export_main
+from sd_qt.sd_desktop.history import day_history
+from sd_qt.sd_desktop.leak_tracker import LeakTracker
+from sd_qt.sd_desktop.log import setup_logging
+from sd_qt.sd_desktop.metrics import start_metrics, stop_metrics
+from sd_qt.sd_desktop.scheduler import task_scheduler
+from sd_qt.sd_desktop.paths import data_dir
+from sd_qt.sd_desktop.profiler import Profiler
+from sd_qt.sd_desktop.settings_queue import settings_writer
+from sd_qt.sd_desktop.snapshot import clear_snapshot, load_snapshot, save_snapshot, save_snapshot_async
+from sd_qt.sd_desktop.stall_watchdog import StallWatchdog
+from sd_qt.sd_desktop.sync_helper import start_sync_helper, stop_sync_helper
+from sd_qt.sd_desktop.traffic import start_capture, stop_capture
+from sd_qt.sd_desktop.util import clear_account_data, credentials
 from sd_qt.restart import manage_watchers
 
+logger = logging.getLogger(__name__)
+
 if sys.platform == "darwin":
     from AppKit import NSApplication, NSApplicationActivationPolicyAccessory, NSApplicationActivationPolicyRegular
 
@@ -50,19 +66,39 @@ class MainWindow(QMainWindow):
         # Start with the SignIn screen
         self.view_stack()
 
-        self.schedule_timer = QTimer(self)
-        self.schedule_timer.timeout.connect(self.run_scheduled_tasks)
-        self.schedule_timer.start(20000)  # 20 seconds in milliseconds
+        # Schedule the manage_watchers task off the GUI thread
+        task_scheduler().add_job("manage_watchers", manage_watchers, 20, priority=10, jitter=1, blocking=True)
+
+        # Replay settings changes left over from a session where the server was down
+        settings_writer().start()
+
+        # Watch for event-loop stalls so UI freezes in the field can be diagnosed
+        self.watchdog = StallWatchdog()
+        self.watchdog.start()
+
+        # Opt-in loopback metrics for fleet monitoring, enabled with $SD_METRICS_PORT
+        start_metrics(self.watchdog)
+
+        self.http_trace_panel = None
+        self.export_job = None
+
+        # Captures are only taken on request from the tray; $SD_PROFILE_MODE=cprofile switches to pstats output
+        self.profiler = Profiler(mode=os.environ.get("SD_PROFILE_MODE", "sampling"))
+        self.profiler.finished.connect(self.on_profile_saved)
 
-        # Schedule the manage_watchers task
-        schedule.every(20).seconds.do(manage_watchers)
+        # Debug mode: report objects and allocations that survive page teardown
+        self.leak_tracker = LeakTracker() if os.environ.get("SD_LEAK_TRACKING") else None
 
         # Setup system tray icon
         self.setupSystemTray()
 
-    def run_scheduled_tasks(self):
-        """Run scheduled tasks."""
-        schedule.run_pending()
+    def create_dashboard(self, snapshot=None):
+        """Build the signed-in user's dashboard, starting the sync helper it reads from first."""
+        # Opt-in: run the activity sync in a supervised helper process, enabled with $SD_SYNC_HELPER.
+        # Started before the dashboard so its Activities page subscribes to it
+        start_sync_helper()
+        self.main_app_widget = Dashboard(self.sign_out, snapshot)
+        self.stack.addWidget(self.main_app_widget)
 
     def handle_navigation(self):
         """Check if onboarding is needed and navigate accordingly."""
@@ -71,8 +107,7 @@ class MainWindow(QMainWindow):
         if onboarding_status == "gGvGS*f+d9x<*E9sjk":
             # Show the main app screen
             if not self.main_app_widget:
-                self.main_app_widget = Dashboard(self.sign_out)
-                self.stack.addWidget(self.main_app_widget)
+                self.create_dashboard()
 
             self.stack.setCurrentWidget(self.main_app_widget)
         else:
@@ -81,8 +116,7 @@ class MainWindow(QMainWindow):
     def on_sign_in_completed(self):
         """Called after the sign-in is completed."""
         if not self.main_app_widget:
-            self.main_app_widget = Dashboard(self.sign_out)
-            self.stack.addWidget(self.main_app_widget)
+            self.create_dashboard()
 
         self.onboard_navigate.emit()
 
@@ -91,6 +125,9 @@ class MainWindow(QMainWindow):
             self.sign_in_widget.deleteLater()
             self.sign_in_widget = None
 
+        if self.leak_tracker:
+            QTimer.singleShot(0, lambda: self.leak_tracker.checkpoint("sign_in"))
+
     def on_onboarding_completed(self):
         """Called after the onboarding is completed."""
         # self.settings.setValue("onboarding_complete", "j?KEgMKb:^kNMpX:Bx=7s")
@@ -108,8 +145,8 @@ class MainWindow(QMainWindow):
         creds = credentials()
         if creds and creds.get('Sundial'):
             if not self.main_app_widget:
-                self.main_app_widget = Dashboard(self.sign_out)
-                self.stack.addWidget(self.main_app_widget)
+                # Warm start: show what was on screen when the last session ended until the first refresh
+                self.create_dashboard(load_snapshot())
             self.stack.setCurrentWidget(self.main_app_widget)
         else:
             if not self.sign_in_widget:
@@ -122,7 +159,13 @@ class MainWindow(QMainWindow):
         cached_creds = credentials()
         if cached_creds:
             cached_creds['Sundial'] = False
-            add_password("SD_KEYS", json.dumps(cached_creds))
+            credential_store().set(cached_creds)
+        clear_snapshot()
+        # Nothing of this account may seed the next one's Activities page or history
+        task_scheduler().remove_job("activities_refresh")
+        stop_sync_helper()
+        clear_account_data()
+        day_history().clear()
 
         if not self.sign_in_widget:
             self.sign_in_widget = SignIn(self.on_sign_in_completed)
@@ -136,6 +179,9 @@ class MainWindow(QMainWindow):
             self.main_app_widget.deleteLater()
             self.main_app_widget = None
 
+        if self.leak_tracker:
+            QTimer.singleShot(0, lambda: self.leak_tracker.checkpoint("sign_out"))
+
     def setupSystemTray(self):
         """Setup the system tray icon and menu."""
         scriptdir = Path(__file__).parent.parent
@@ -159,6 +205,28 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self.show_window)
         tray_menu.addAction(open_action)
 
+        # "UI latency report" action to dump the stall watchdog's findings
+        latency_action = QAction("Save UI latency report", self)
+        latency_action.triggered.connect(self.dump_latency_report)
+        tray_menu.addAction(latency_action)
+
+        # "HTTP trace" action to open the live per-endpoint request stats
+        http_trace_action = QAction("HTTP trace", self)
+        http_trace_action.triggered.connect(self.show_http_trace)
+        tray_menu.addAction(http_trace_action)
+
+        # "Export activity" action to write a date range of history to a file, or cancel the running export
+        self.export_action = QAction("Export activity...", self)
+        self.export_action.triggered.connect(self.toggle_export)
+        tray_menu.addAction(self.export_action)
+
+        # "Start profiling" action to take a fixed-length profile when the app feels sluggish
+        # The label says which threads a capture covers, since cProfile on older Pythons only sees the GUI thread
+        self.profile_label = f"Start profiling ({self.profiler.duration} s, {self.profiler.scope()})"
+        self.profile_action = QAction(self.profile_label, self)
+        self.profile_action.triggered.connect(self.toggle_profiling)
+        tray_menu.addAction(self.profile_action)
+
         # "Quit" action to quit the application
         quit_action = QAction("Quit", self)
         quit_action.triggered.connect(self.quit_application)
@@ -173,6 +241,72 @@ class MainWindow(QMainWindow):
         # Connect the tray icon activation to a function
         self.tray_icon.activated.connect(self.on_tray_icon_activated)
 
+    def dump_latency_report(self):
+        """Write the event-loop latency histogram and stalls to the data directory."""
+        path = os.path.join(data_dir(), f"ui_latency_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        self.watchdog.dump(path)
+        latency = self.watchdog.percentiles()
+        self.tray_icon.showMessage(
+            "UI latency report",
+            f"p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms, "
+            f"{self.watchdog.stall_count} stalls. Saved to {path}",
+            QSystemTrayIcon.Information,
+            5000
+        )
+
+    def show_http_trace(self):
+        """Open the live HTTP trace panel."""
+        if not self.http_trace_panel:
+            self.http_trace_panel = HttpTracePanel()
+        self.http_trace_panel.show()
+        self.http_trace_panel.raise_()
+
+    def toggle_export(self):
+        """Ask for a range and file and start exporting, or cancel the running export."""
+        if self.export_job and self.export_job.is_running():
+            self.export_job.cancel()
+            return
+
+        dialog = ExportDialog(self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        first_day, last_day, fmt = dialog.selection()
+        default_path = os.path.join(os.path.expanduser("~"), f"sundial_{first_day}_{last_day}.{fmt}")
+        path, _ = QFileDialog.getSaveFileName(self, "Export activity", default_path, f"{fmt.upper()} (*.{fmt})")
+        if not path:
+            return
+
+        self.export_job = ExportJob(path, first_day, last_day, fmt, self)
+        self.export_job.progress.connect(self.on_export_progress)
+        self.export_job.finished.connect(self.on_export_finished)
+        self.export_job.failed.connect(self.on_export_failed)
+        self.export_action.setText("Cancel export")
+        self.export_job.start()
+
+    def on_export_progress(self, written, total):
+        self.export_action.setText(f"Cancel export ({written * 100 // max(total, 1)}%)")
+
+    def on_export_finished(self, path, written):
+        self.export_action.setText("Export activity...")
+        self.tray_icon.showMessage("Export complete", f"{written} events saved to {path}",
+                                   QSystemTrayIcon.Information, 5000)
+
+    def on_export_failed(self, message):
+        self.export_action.setText("Export activity...")
+        self.tray_icon.showMessage("Export failed", message, QSystemTrayIcon.Warning, 5000)
+
+    def toggle_profiling(self):
+        """Start a profiling capture, or end the running one early."""
+        if self.profiler.is_running():
+            self.profiler.stop()
+        else:
+            self.profiler.start()
+            self.profile_action.setText("Stop profiling")
+
+    def on_profile_saved(self, path):
+        self.profile_action.setText(self.profile_label)
+        self.tray_icon.showMessage("Profile saved", path, QSystemTrayIcon.Information, 5000)
+
     def update_dock_icon_policy(self):
         """Update the dock icon based on the current window state (macOS specific)."""
         if sys.platform == "darwin":
@@ -191,6 +325,8 @@ class MainWindow(QMainWindow):
     def hideEvent(self, event):
         """Ensure dock icon updates when the window is hidden (macOS specific)."""
         super().hideEvent(event)
+        if self.main_app_widget:
+            save_snapshot_async(self.main_app_widget.snapshot_state())
         if sys.platform == "darwin":
             self.update_dock_icon_policy()
 
@@ -219,6 +355,16 @@ class MainWindow(QMainWindow):
     def quit_application(self):
         """Quit the application gracefully."""
         from sd_core.util import stop_server  # Import the stop_server function
+        if self.main_app_widget:
+            save_snapshot(self.main_app_widget.snapshot_state())
+        self.watchdog.stop()
+        self.profiler.stop()
+        if self.export_job:
+            self.export_job.cancel()
+        stop_metrics()
+        stop_sync_helper()
+        task_scheduler().shutdown()
+        settings_writer().stop()
         stop_server()
         QApplication.quit()
 
@@ -240,6 +386,9 @@ class MainWindow(QMainWindow):
 def run_application():
     # Start the timer to measure load time
     start_time = time.time()
+    setup_logging()
+    if os.environ.get("SD_CAPTURE"):
+        start_capture(os.environ["SD_CAPTURE"])
 
     format = QSurfaceFormat()
     format.setVersion(3, 3)  # Example: OpenGL version 3.3
@@ -253,9 +402,19 @@ def run_application():
     # Stop the timer after the window is shown
     end_time = time.time()
     load_time = end_time - start_time
-    print(f"Application load time: {load_time:.2f} seconds")
+    logger.info("Application load time: %.2f seconds", load_time)
+
+    status = app.exec()
+    stop_capture()
+    sys.exit(status)
 
-    sys.exit(app.exec())
+def run_export(argv=None):
+    """Command-line export of stored activity history; see export.py for the arguments."""
+    setup_logging()
+    export_main(argv)
 
 if __name__ == "__main__":
-    run_application()
+    if sys.argv[1:2] == ["export"]:
+        run_export(sys.argv[2:])
+    else:
+        run_application()
@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PySide6.QtWidgets import QApplication
+
+logger = logging.getLogger(__name__)
+
+prefix = "sd_desktop_"
+
+
+def process_rss():
+    """Resident set size of this process in bytes, or None when it can't be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+
+    if sys.platform == "darwin":
+        import ctypes
+
+        class MachTaskBasicInfo(ctypes.Structure):
+            _fields_ = [("virtual_size", ctypes.c_uint64), ("resident_size", ctypes.c_uint64),
+                        ("resident_size_max", ctypes.c_uint64), ("user_time", ctypes.c_int32 * 2),
+                        ("system_time", ctypes.c_int32 * 2), ("policy", ctypes.c_int32),
+                        ("suspend_count", ctypes.c_int32)]
+
+        libc = ctypes.CDLL("/usr/lib/libSystem.dylib")
+        info = MachTaskBasicInfo()
+        count = ctypes.c_uint32(ctypes.sizeof(info) // 4)
+        task = ctypes.c_uint32.in_dll(libc, "mach_task_self_")
+        mach_task_basic_info = 20
+        if libc.task_info(task, mach_task_basic_info, ctypes.byref(info), ctypes.byref(count)) == 0:
+            return info.resident_size
+    # Elsewhere only the peak is available (getrusage), which isn't what the gauge reports
+    return None
+
+
+class Summary:
+    """Rolling window of observed durations, reported as count, sum and quantiles."""
+
+    def __init__(self, help_text, window=500):
+        self.help = help_text
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def quantiles(self):
+        samples = sorted(self.samples)
+        if not samples:
+            return {}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in (0.5, 0.95, 0.99)}
+
+
+class MetricsRegistry:
+    """Gauges and latency summaries exported by the metrics server.
+
+    Gauges marked `gui_thread` touch Qt objects, so they are sampled by a
+    scheduler job on the GUI thread and the server only reads the last
+    sample. All other gauges are evaluated on the server thread per scrape.
+    """
+
+    def __init__(self):
+        self._gauges = {}
+        self._summaries = {}
+        self._gui_samples = {}
+        self._lock = threading.Lock()
+
+    def gauge(self, name, help_text, func, gui_thread=False):
+        self._gauges[name] = (help_text, func, gui_thread)
+
+    def summary(self, name, help_text):
+        with self._lock:
+            return self._summaries.setdefault(name, Summary(help_text))
+
+    def observe(self, name, seconds):
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary:
+                summary.observe(seconds)
+
+    def sample_gui_gauges(self):
+        samples = {}
+        for name, (_, func, gui_thread) in self._gauges.items():
+            if gui_thread:
+                samples[name] = self._evaluate(name, func)
+        with self._lock:
+            self._gui_samples = samples
+
+    def collect(self):
+        """Return {name: (help, value)} for gauges and {name: summary stats} for summaries."""
+        with self._lock:
+            gui_samples = dict(self._gui_samples)
+            summaries = {name: (s.help, s.count, s.total, s.quantiles()) for name, s in self._summaries.items()}
+        gauges = {}
+        for name, (help_text, func, gui_thread) in list(self._gauges.items()):
+            value = gui_samples.get(name) if gui_thread else self._evaluate(name, func)
+            gauges[name] = (help_text, value)
+        return gauges, summaries
+
+    def prometheus(self):
+        gauges, summaries = self.collect()
+        lines = []
+        for name, (help_text, value) in gauges.items():
+            if value is None:
+                continue
+            lines += [f"# HELP {prefix}{name} {help_text}", f"# TYPE {prefix}{name} gauge",
+                      f"{prefix}{name} {value}"]
+        for name, (help_text, count, total, quantiles) in summaries.items():
+            lines += [f"# HELP {prefix}{name}_seconds {help_text}", f"# TYPE {prefix}{name}_seconds summary"]
+            lines += [f'{prefix}{name}_seconds{{quantile="{q}"}} {v:.6f}' for q, v in quantiles.items()]
+            lines += [f"{prefix}{name}_seconds_sum {total:.6f}", f"{prefix}{name}_seconds_count {count}"]
+        return "\n".join(lines) + "\n"
+
+    def json(self):
+        gauges, summaries = self.collect()
+        return json.dumps({
+            "gauges": {name: value for name, (_, value) in gauges.items()},
+            "summaries": {
+                name: {"count": count, "sum": total, **{f"p{int(q * 100)}": v for q, v in quantiles.items()}}
+                for name, (_, count, total, quantiles) in summaries.items()
+            },
+        }, indent=2)
+
+    def _evaluate(self, name, func):
+        try:
+            return func()
+        except Exception:
+            logger.exception("Metric %s failed", name)
+            return None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._reply(self.registry.prometheus(), "text/plain; version=0.0.4")
+        elif self.path == "/metrics.json":
+            self._reply(self.registry.json(), "application/json")
+        else:
+            self.send_error(404)
+
+    def _reply(self, text, content_type):
+        body = text.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics: " + format, *args)
+
+
+class MetricsServer:
+    """Serves the registry as Prometheus text on /metrics and JSON on /metrics.json.
+
+    Binds to the loopback interface only and runs on a daemon thread.
+    """
+
+    def __init__(self, registry, port=0):
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+_registry = None
+_server = None
+
+
+def observe(name, seconds):
+    """Record a duration for a summary metric. Does nothing unless metrics are enabled."""
+    if _registry is not None:
+        _registry.observe(name, seconds)
+
+
+def start_metrics(watchdog=None, port=None):
+    """Start the metrics server if $SD_METRICS_PORT (or `port`) is set and return it, else None.
+
+    Nothing is registered or sampled while metrics are disabled.
+    """
+    global _registry, _server
+    if _server is not None:
+        return _server
+    port = port if port is not None else os.environ.get("SD_METRICS_PORT")
+    if port in (None, ""):
+        return None
+
+    from sd_qt.sd_desktop.scheduler import task_scheduler
+    from sd_qt.sd_desktop.settings_queue import settings_writer
+    from sd_qt.sd_desktop.util import cached_rows
+
+    registry = MetricsRegistry()
+    registry.gauge("process_resident_memory_bytes", "Resident memory of the GUI process.", process_rss)
+    registry.gauge("live_widgets", "Number of live QWidgets.",
+                   lambda: len(QApplication.allWidgets()), gui_thread=True)
+    registry.gauge("cached_events", "Events held in the activities cache.",
+                   lambda: len(cached_rows() or ()))
+    registry.gauge("scheduler_running_jobs", "Blocking scheduler jobs currently executing.",
+                   task_scheduler().queue_depth)
+    registry.gauge("scheduler_overruns", "Scheduler job runs that overran their interval.",
+                   lambda: sum(job["overruns"] for job in task_scheduler().metrics().values()))
+    registry.gauge("settings_queue_depth", "Settings changes waiting for the server.", settings_writer().depth)
+    if watchdog is not None:
+        registry.gauge("ui_stalls", "Event-loop stalls since start.", lambda: watchdog.stall_count)
+        registry.gauge("ui_latency_p99_milliseconds", "p99 event-loop latency over the recent window.",
+                       lambda: watchdog.percentiles()["p99"])
+    registry.summary("activities_refresh", "Time to render an activities refresh on the GUI thread.")
+    registry.summary("theme_switch", "Time to apply a theme change to all listeners.")
+
+    try:
+        server = MetricsServer(registry, port=int(port))
+    except (ValueError, OSError) as e:
+        logger.warning("Not serving metrics on port %r: %s", port, e)
+        return None
+    server.start()
+    task_scheduler().add_job("metrics_sample", registry.sample_gui_gauges, 5, priority=-10, run_now=True)
+    _registry, _server = registry, server
+    logger.info("Serving metrics on http://127.0.0.1:%d/metrics", server.port)
+    return server
+
+
+def stop_metrics():
+    global _registry, _server
+    if _server is not None:
+        from sd_qt.sd_desktop.scheduler import task_scheduler
+        task_scheduler().remove_job("metrics_sample")
+        _server.stop()
+        _registry, _server = None, None
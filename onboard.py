@@ -1,3 +1,4 @@
+import logging
 import os
 import sys
 
@@ -7,8 +8,10 @@ from PySide6.QtWidgets import QApplication, QWidget, QStackedLayout, QPushButton
 from PySide6.QtCore import Qt, QRect, QObject, Signal
 from PySide6 import QtGui, QtCore
 
+from sd_qt.sd_desktop import client
 from sd_qt.sd_desktop.ThemeManager import ThemeManager
 from sd_qt.sd_desktop.toggleSwitch import SwitchControl
+from sd_qt.sd_desktop.settings_queue import settings_writer
 from sd_qt.sd_desktop.util import retrieve_settings, credentials
 
 base_path = os.path.abspath(os.path.join(__file__, "../../.."))
@@ -17,6 +20,8 @@ resources_path = os.path.join(base_path, "sd_qt", "sd_desktop", "resources")
 darkTheme = os.path.join(resources_path, "DarkTheme")
 lightTheme = os.path.join(resources_path, "LightTheme")
 
+logger = logging.getLogger(__name__)
+
 
 class TransparentLabel(QLabel):
 
@@ -151,7 +156,7 @@ class Onboarding(QWidget):
                     }}
                 """)
         else:
-            print(f"Background image not found: {self.background_image}")
+            logger.warning("Background image not found: %s", self.background_image)
 
         current_page = self.onboard_widget.currentWidget()
         # Set pixmap on the relevant pages
@@ -310,7 +315,6 @@ class OnboardSettings(QWidget):
     def __init__(self, moveNext):
         super().__init__()
 
-        self.host = "http://localhost:7600/api"
         self.moveNext = moveNext
         self.settings_sundial_logo = TransparentLabel(self)
         self.settings_sundial_logo.setGeometry(20, 20, 150, 40)
@@ -420,7 +424,7 @@ class OnboardSettings(QWidget):
 
         if creds and "token" in creds:
             sundial_token = creds["token"]
-            self.send_request(f"{self.host}/0/idletime", sundial_token, params)
+            self.send_request("/0/idletime", sundial_token, params)
 
     def launch_on_start(self, status):
         params = {"status": status}
@@ -428,17 +432,23 @@ class OnboardSettings(QWidget):
 
         if creds and "token" in creds:
             sundial_token = creds["token"]
-            self.send_request(f"{self.host}/0/launchOnStart", sundial_token, params)
+            self.send_request("/0/launchOnStart", sundial_token, params)
 
-    def send_request(self, url, token, params):
+    def send_request(self, endpoint, token, params):
         try:
-            response = requests.get(url, headers={"Authorization": f"Bearer {token}"}, params=params)
+            # Queued while the server is down and delivered once it's back
+            response = settings_writer().send(
+                endpoint,
+                lambda: client.request("GET", endpoint, headers={"Authorization": f"Bearer {token}"}, params=params),
+                "GET", endpoint, params=params, auth="bearer")
+            if response is None:
+                return
             if response.status_code == 200:
-                print("Request successful")
+                logger.debug("%s request successful", endpoint)
             else:
-                print(f"Request failed: {response.status_code}, {response.text}")
+                logger.warning("Request failed: %s, %s", response.status_code, response.text)
         except requests.RequestException as e:
-            print(f"An error occurred while sending the request: {e}")
+            logger.warning("An error occurred while sending the request: %s", e)
 
 class AccessibilitySettings(QWidget):
     def __init__(self,movePrev, move_to_dashBoard):
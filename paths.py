@@ -0,0 +1,16 @@
+import os
+
+from PySide6.QtCore import QStandardPaths
+
+
+def data_dir():
+    """Directory for the desktop client's own persistent files (queues, stores, snapshots).
+
+    $SD_DATA_DIR overrides it, e.g. to keep a benchmark run's files apart.
+    """
+    path = os.environ.get("SD_DATA_DIR")
+    if not path:
+        base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericDataLocation)
+        path = os.path.join(base or os.path.expanduser("~"), "sundial", "sd-desktop")
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,149 @@
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from sd_qt.sd_desktop.paths import data_dir
+from sd_qt.sd_desktop.stall_watchdog import thread_stacks
+
+# cProfile runs on sys.monitoring from Python 3.12, which sees every thread; before that only the caller's
+cprofile_all_threads = sys.version_info >= (3, 12)
+
+
+class StackSampler:
+    """Samples the Python stacks of every thread at a fixed interval.
+
+    Samples are taken from a background thread through faulthandler (see
+    `stall_watchdog.thread_stacks`), so the profiled threads run
+    unmodified and nothing is hooked while the sampler is not running.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.frames = []
+        self._frame_index = {}
+        self.samples = {}  # thread name -> ([stack as frame indexes, root first], [weights])
+        self.started = None
+        self.ended = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.ended = time.perf_counter()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        with tempfile.TemporaryFile("w+") as dump_file:
+            while not self._stopped.wait(self.interval):
+                now = time.perf_counter()
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frames in thread_stacks(dump_file).items():
+                    if thread_id == own_id:
+                        continue
+                    stacks, weights = self.samples.setdefault(names.get(thread_id, str(thread_id)), ([], []))
+                    stacks.append(self._stack(frames))
+                    weights.append(now - last)
+                last = now
+
+    def _stack(self, frames):
+        stack = []
+        for file, _, name in frames:
+            key = (name, file)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self.frames)
+                self.frames.append({"name": name, "file": file})
+            stack.append(index)
+        return stack
+
+    def speedscope(self, name):
+        """The samples as a speedscope file (https://www.speedscope.app), one profile per thread."""
+        duration = (self.ended or time.perf_counter()) - self.started
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "sd-desktop",
+            "shared": {"frames": self.frames},
+            "profiles": [
+                {"type": "sampled", "name": thread_name, "unit": "seconds", "startValue": 0,
+                 "endValue": duration, "samples": stacks, "weights": weights}
+                for thread_name, (stacks, weights) in sorted(self.samples.items())
+            ],
+        }
+
+
+class Profiler(QObject):
+    """Fixed-duration profiling capture started from the tray.
+
+    The "sampling" mode records every thread and writes a speedscope JSON
+    file. The "cprofile" mode writes a pstats file; it covers every thread
+    on Python 3.12+ but only the GUI thread before that (see `scope`). No
+    hooks are installed until a capture starts.
+    """
+    finished = Signal(str)  # Emits the path of the saved profile
+
+    def __init__(self, mode="sampling", duration=30, interval=0.005):
+        super().__init__()
+        self.mode = mode
+        self.duration = duration
+        self.interval = interval
+        self._capture = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.stop)
+
+    def scope(self):
+        """Which threads a capture covers, for labelling it in the UI."""
+        return "GUI thread only" if self.mode == "cprofile" and not cprofile_all_threads else "all threads"
+
+    def is_running(self):
+        return self._capture is not None
+
+    def start(self):
+        if self._capture is not None:
+            return
+        if self.mode == "cprofile":
+            self._capture = cProfile.Profile()
+            self._capture.enable()
+        else:
+            self._capture = StackSampler(self.interval)
+            self._capture.start()
+        self._timer.start(int(self.duration * 1000))
+
+    def stop(self):
+        """End the capture early or on schedule, save it, and return the file path."""
+        capture, self._capture = self._capture, None
+        if capture is None:
+            return None
+        self._timer.stop()
+
+        directory = os.path.join(data_dir(), "profiles")
+        os.makedirs(directory, exist_ok=True)
+        name = f"profile_{time.strftime('%Y%m%d_%H%M%S')}"
+        if isinstance(capture, cProfile.Profile):
+            capture.disable()
+            path = os.path.join(directory, name + ".pstats")
+            capture.dump_stats(path)
+        else:
+            capture.stop()
+            path = os.path.join(directory, name + ".speedscope.json")
+            with open(path, "w") as f:
+                json.dump(capture.speedscope(name), f)
+
+        self.finished.emit(path)
+        return path
@@ -0,0 +1,67 @@
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from sd_qt.sd_desktop.scheduler import task_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class DayRollover(QObject):
+    """Announces when the local date changes.
+
+    A single-shot timer is armed for the next local midnight. Qt timers
+    run on a monotonic clock that stops while the machine sleeps, so a
+    light periodic check also compares the date and notices the wall
+    clock jumping ahead of the monotonic one, which happens on resume and
+    when the clock is changed. Either way the midnight timer is re-armed.
+    Archiving the finished day happens in `util.get_events`, which
+    listeners trigger from `day_changed`.
+    """
+    day_changed = Signal(object, object)  # finished date, new date
+
+    def __init__(self, check_interval=60, margin_ms=500):
+        super().__init__()
+        self.day = date.today()
+        self.margin_ms = margin_ms
+        self._wall = time.time()
+        self._monotonic = time.monotonic()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.check)
+        self._arm()
+        task_scheduler().add_job("day_rollover", self.check, check_interval, priority=8, owner=self)
+
+    def check(self):
+        """Emit `day_changed` if the local date moved on since the last check."""
+        wall, monotonic = time.time(), time.monotonic()
+        resumed = (wall - self._wall) - (monotonic - self._monotonic) > 5
+        self._wall, self._monotonic = wall, monotonic
+
+        today = date.today()
+        if today != self.day:
+            finished, self.day = self.day, today
+            logger.info("Local date changed from %s to %s%s", finished, today, " after resume" if resumed else "")
+            self.day_changed.emit(finished, today)
+            self._arm()
+        elif resumed or not self._timer.isActive():
+            self._arm()
+
+    def _arm(self):
+        midnight = datetime.combine(self.day + timedelta(days=1), datetime.min.time()).astimezone()
+        delay = (midnight - datetime.now().astimezone()).total_seconds()
+        # Fire just after midnight so date.today() has already moved on
+        self._timer.start(max(0, int(delay * 1000)) + self.margin_ms)
+
+
+_rollover = None
+
+
+def day_rollover():
+    """Return the process-wide day rollover. Must first be called on the GUI thread."""
+    global _rollover
+    if _rollover is None:
+        _rollover = DayRollover()
+    return _rollover
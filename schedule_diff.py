@@ -0,0 +1,43 @@
+def diff_schedule(base, current):
+    """Return only the fields of `current` that differ from `base`."""
+    return {field: value for field, value in current.items() if base.get(field) != value}
+
+
+class ScheduleTracker:
+    """Tracks edits to the weekly schedule against the last server-acknowledged copy.
+
+    Every field edit updates a set of dirty fields, so checking whether the
+    schedule needs saving and building the patch cost O(changed fields).
+    """
+
+    def __init__(self, acknowledged, current=None):
+        self.acknowledged = dict(acknowledged)
+        self.current = dict(current if current is not None else acknowledged)
+        self.dirty = set(diff_schedule(self.acknowledged, self.current))
+
+    def set_field(self, field, value):
+        self.current[field] = value
+        if field in self.acknowledged and self.acknowledged[field] == value:
+            self.dirty.discard(field)
+        else:
+            self.dirty.add(field)
+
+    def is_dirty(self):
+        return bool(self.dirty)
+
+    def patch(self):
+        """Fields that changed since the last acknowledged schedule."""
+        return {field: self.current[field] for field in self.dirty}
+
+    def acknowledge(self, patch):
+        """Mark `patch` as stored on the server."""
+        self.acknowledged.update(patch)
+        for field, value in patch.items():
+            # The field may have been edited again while the write was in flight
+            if self.current.get(field) == value:
+                self.dirty.discard(field)
+
+    def reset(self, acknowledged):
+        """Replace the acknowledged schedule, e.g. after the server sent a newer one."""
+        self.acknowledged = dict(acknowledged)
+        self.dirty = set(diff_schedule(self.acknowledged, self.current))
@@ -0,0 +1,215 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    __slots__ = ("name", "func", "interval", "priority", "jitter", "coalesce", "blocking", "on_done",
+                 "next_run", "running", "queued", "runs", "missed", "overruns", "errors",
+                 "last_duration", "max_duration", "total_duration")
+
+    def __init__(self, name, func, interval, priority, jitter, coalesce, blocking, on_done):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.priority = priority
+        self.jitter = jitter
+        self.coalesce = coalesce
+        self.blocking = blocking
+        self.on_done = on_done
+        self.next_run = 0.0
+        self.running = False
+        self.queued = 0  # runs to start on a worker thread once the current one finishes
+        self.runs = 0
+        self.missed = 0
+        self.overruns = 0
+        self.errors = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+
+    def metrics(self):
+        return {
+            "interval": self.interval,
+            "priority": self.priority,
+            "blocking": self.blocking,
+            "running": self.running,
+            "runs": self.runs,
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "errors": self.errors,
+            "last_duration": self.last_duration,
+            "max_duration": self.max_duration,
+            "mean_duration": self.total_duration / self.runs if self.runs else 0.0,
+        }
+
+
+class TaskScheduler(QObject):
+    """Single wakeup source for the app's recurring work.
+
+    Jobs are named and run by priority when due. Runs missed while the app
+    was busy or asleep, or while a blocking job's previous run was still
+    going, are coalesced into one; jobs added with `coalesce=False` make up
+    each of them instead. Blocking jobs run on a worker thread, one run at
+    a time, and hand their result back to `on_done` on the GUI thread. One
+    single-shot QTimer is re-armed for the next due job.
+    """
+    _job_finished = Signal(object, object, float, bool)  # Job, result, duration, failed
+
+    def __init__(self, max_workers=2):
+        super().__init__()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run_due_jobs)
+        self._job_finished.connect(self._on_job_finished)
+
+    def add_job(self, name, func, interval, priority=0, jitter=0.0, coalesce=True, blocking=False,
+                on_done=None, owner=None, run_now=False):
+        """Register `func` to run every `interval` seconds, replacing any job with the same name.
+
+        With an `owner` QObject the job is removed when the owner is destroyed.
+        """
+        job = Job(name, func, interval, priority, jitter, coalesce, blocking, on_done)
+        job.next_run = time.monotonic() + (0 if run_now else self._next_delay(job))
+        with self._lock:
+            self._jobs[name] = job
+        if owner is not None:
+            owner.destroyed.connect(lambda: self._remove_job(job))
+        self._rearm()
+        return job
+
+    def remove_job(self, name):
+        with self._lock:
+            self._jobs.pop(name, None)
+        self._rearm()
+
+    def run_now(self, name):
+        """Make a job due immediately."""
+        with self._lock:
+            job = self._jobs.get(name)
+            if job:
+                job.next_run = time.monotonic()
+        self._rearm()
+
+    def metrics(self):
+        """Per-job run time and overrun counters."""
+        with self._lock:
+            return {name: job.metrics() for name, job in self._jobs.items()}
+
+    def queue_depth(self):
+        """Number of blocking jobs currently executing on worker threads."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.running)
+
+    def shutdown(self):
+        self._timer.stop()
+        with self._lock:
+            self._jobs.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _remove_job(self, job):
+        # Only remove the job if it hasn't been replaced by a newer one with the same name
+        with self._lock:
+            if self._jobs.get(job.name) is job:
+                del self._jobs[job.name]
+
+    def _next_delay(self, job):
+        return max(0.0, job.interval + random.uniform(-job.jitter, job.jitter))
+
+    def _rearm(self):
+        with self._lock:
+            if not self._jobs:
+                self._timer.stop()
+                return
+            next_run = min(job.next_run for job in self._jobs.values())
+        self._timer.start(max(0, int((next_run - time.monotonic()) * 1000)))
+
+    def _run_due_jobs(self):
+        now = time.monotonic()
+        with self._lock:
+            due = sorted((job for job in self._jobs.values() if job.next_run <= now),
+                         key=lambda job: job.priority, reverse=True)
+
+        for job in due:
+            missed = int((now - job.next_run) // job.interval) if job.interval else 0
+            job.missed += missed
+            job.next_run = now + self._next_delay(job)
+            repeats = 1 if job.coalesce else missed + 1
+
+            if job.running:
+                # The previous run hasn't finished; it stands in for this one unless every run counts
+                if job.coalesce:
+                    job.missed += 1
+                else:
+                    job.queued += repeats
+                continue
+
+            if job.blocking:
+                job.running = True
+                job.queued = repeats - 1
+                self._executor.submit(self._run_in_worker, job)
+            else:
+                for _ in range(repeats):
+                    self._run_inline(job)
+
+        self._rearm()
+
+    def _run_inline(self, job):
+        start = time.perf_counter()
+        try:
+            result = job.func()
+            failed = False
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+            result, failed = None, True
+        self._on_job_finished(job, result, time.perf_counter() - start, failed)
+
+    def _run_in_worker(self, job):
+        start = time.perf_counter()
+        try:
+            result = job.func()
+            failed = False
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+            result, failed = None, True
+        self._job_finished.emit(job, result, time.perf_counter() - start, failed)
+
+    def _on_job_finished(self, job, result, duration, failed):
+        job.running = False
+        job.runs += 1
+        job.errors += failed
+        job.last_duration = duration
+        job.total_duration += duration
+        job.max_duration = max(job.max_duration, duration)
+        if duration > job.interval:
+            # Counted here only, once per run, however many ticks it spanned
+            job.overruns += 1
+
+        with self._lock:
+            current = self._jobs.get(job.name) is job
+        if current and job.queued:
+            job.queued -= 1
+            job.running = True
+            self._executor.submit(self._run_in_worker, job)
+        if current and job.on_done and not failed:
+            job.on_done(result)
+
+
+_scheduler = None
+
+
+def task_scheduler():
+    """Return the process-wide task scheduler. Must first be called on the GUI thread."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TaskScheduler()
+    return _scheduler
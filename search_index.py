@@ -0,0 +1,161 @@
+import bisect
+import re
+from collections import defaultdict
+
+token_pattern = re.compile(r"\w+")
+
+
+class Postings:
+    """The documents holding a token or token prefix.
+
+    `ordered` lists them in ascending order once somebody asked for it
+    through `in_order`, and is kept up to date from then on; postings
+    never searched for don't pay for it.
+    """
+    __slots__ = ("docs", "ordered")
+
+    def __init__(self, docs=None):
+        self.docs = set() if docs is None else docs
+        self.ordered = None
+
+    def in_order(self):
+        if self.ordered is None:
+            self.ordered = sorted(self.docs)
+        return self.ordered
+
+    def place(self, doc):
+        """Put a `doc` just added to `docs` into `ordered`."""
+        ordered = self.ordered
+        # Documents mostly arrive in order; a row gaining a title later is the exception
+        if not ordered or doc > ordered[-1]:
+            ordered.append(doc)
+        else:
+            bisect.insort(ordered, doc)
+
+
+class SearchIndex:
+    """Incremental substring search over short documents (activity rows).
+
+    Documents are split into lowercase word tokens. An inverted index maps
+    each token to the documents containing it, and the token vocabulary is
+    indexed by trigram. The documents holding a token that starts with a
+    given 1-2 characters are kept up to date as well, since those short
+    terms would otherwise union the postings of much of the vocabulary.
+    A longer query term is resolved to the vocabulary tokens containing
+    it, whose postings are unioned; the terms of a query are intersected,
+    smallest first, skipping terms every document matches. Postings keep
+    their documents in order, so a result that is one term's postings
+    comes out ordered without sorting. Cost follows the size of the
+    vocabulary and of the result, not the number of documents.
+    """
+
+    def __init__(self):
+        self._entries = {}  # token -> its Postings, then those of its 1-2 character prefixes
+        self._trigrams = defaultdict(set)  # trigram -> tokens
+        self._prefixes = defaultdict(Postings)  # 1-2 character prefix -> documents
+        self._documents = set()
+        self._results = {}  # term -> Postings, dropped whenever documents are added
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, doc, text):
+        """Index `text` under document id `doc`; calling it again for the same doc adds more text."""
+        for token in token_pattern.findall(text.lower()):
+            entry = self._entries.get(token)
+            if entry is None:
+                entry = self._entries[token] = self._new_token(token)
+            for postings in entry:
+                docs = postings.docs
+                if doc not in docs:
+                    docs.add(doc)
+                    if postings.ordered is not None:
+                        postings.place(doc)
+        self._documents.add(doc)
+        self._results.clear()
+
+    def _new_token(self, token):
+        # The postings a document with `token` goes into: the token's own and its prefixes'
+        postings = Postings()
+        for i in range(len(token) - 2):
+            self._trigrams[token[i:i + 3]].add(token)
+        if len(token) == 1:
+            return postings, self._prefixes[token]
+        return postings, self._prefixes[token[:1]], self._prefixes[token[:2]]
+
+    def clear(self):
+        self._entries.clear()
+        self._trigrams.clear()
+        self._prefixes.clear()
+        self._documents.clear()
+        self._results.clear()
+
+    def search(self, query, within=None):
+        """Ids of documents matching every word of `query`; don't modify the returned set.
+
+        Words of three or more characters match anywhere inside a token,
+        shorter ones match the start of a token. `within` is a set known to
+        hold every match, typically the result for a query this one
+        extends (see `narrows`), and saves intersecting from scratch.
+        """
+        return self._match(query, within)[0]
+
+    def search_ordered(self, query, within=None):
+        """The matches of `search` and a new list of them in ascending order, None if every document matches."""
+        result, postings = self._match(query, within)
+        if self.matches_all(result):
+            return result, None
+        return result, sorted(result) if postings is None else list(postings.in_order())
+
+    def matches_all(self, docs):
+        """Whether `docs`, a search result, holds every indexed document."""
+        return len(docs) == len(self._documents)
+
+    def _match(self, query, within):
+        # The result, and the Postings it came from unchanged, if any
+        result, source = (None if within is None or self.matches_all(within) else within), None
+        terms = [self._term(term) for term in set(token_pattern.findall(query.lower()))]
+        for postings in sorted(terms, key=lambda postings: len(postings.docs)):
+            if result is not None and self.matches_all(postings.docs):
+                continue
+            if result is None:
+                result, source = postings.docs, postings
+            else:
+                result, source = result & postings.docs, None
+            if not result:
+                return set(), None
+        return (set(), None) if result is None else (result, source)
+
+    def _term(self, term):
+        if len(term) < 3:
+            return self._prefixes.get(term) or Postings()
+        postings = self._results.get(term)
+        if postings is not None:
+            return postings
+        grams = sorted((self._trigrams.get(term[i:i + 3], set()) for i in range(len(term) - 2)), key=len)
+        tokens = set.intersection(*grams) if grams[0] else ()
+        tokens = [token for token in tokens if term in token]
+        if len(tokens) == 1:
+            postings = self._entries[tokens[0]][0]
+        else:
+            postings = Postings(set().union(*(self._entries[token][0].docs for token in tokens)))
+        self._results[term] = postings
+        return postings
+
+
+def narrows(query, previous):
+    """Whether every document matching `query` also matches `previous`.
+
+    True when each word of `previous` is implied by a word of `query`: a
+    word containing it, or for words under three characters, which match
+    token starts, a word of at most two characters starting with it.
+    """
+    words = set(token_pattern.findall(query.lower()))
+    for old in set(token_pattern.findall(previous.lower())):
+        if len(old) < 3:
+            implied = any(len(word) < 3 and word.startswith(old) for word in words)
+        else:
+            implied = any(old in word for word in words)
+        if not implied:
+            return False
+    return True
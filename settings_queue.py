@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import requests
+
+from sd_qt.sd_desktop import client
+from sd_qt.sd_desktop.paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+
+class SettingsWriteQueue:
+    """Durable write-ahead queue for settings changes made while the server is down.
+
+    Each mutation is stored in SQLite with a sequence number and replayed in
+    order by a background thread once the readiness probe reports the server
+    up, backing off exponentially while it stays down. Enqueuing a mutation
+    for a key drops any older pending entry for the same key, since only the
+    latest value matters.
+    """
+
+    def __init__(self, path=None, token_provider=None, min_backoff=1, max_backoff=60):
+        self.path = path or os.path.join(data_dir(), "settings_queue.sqlite")
+        self.token_provider = token_provider
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        # Held for a whole replay, so the writer thread and a caller never send the same entry twice
+        self._flush_lock = threading.Lock()
+        self._generation = 0  # bumped by clear(), so a replay in progress stops sending
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pending (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                method TEXT NOT NULL,
+                path TEXT NOT NULL,
+                params TEXT,
+                body TEXT,
+                auth TEXT,
+                created REAL NOT NULL
+            )
+        """)
+
+    def send(self, key, request, method, path, params=None, body=None, auth=None):
+        """Deliver a mutation through `request()`, or queue it when the server can't take it now.
+
+        The mutation is queued instead of sent while an older change to
+        `key` is still pending, so the replay can't overwrite it with the
+        stale value later. It is also queued when the request fails to
+        connect, times out or gets a 5xx answer. Returns `request()`'s
+        response, or None when the mutation was queued.
+        """
+        if not self.has_pending(key):
+            try:
+                response = request()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logger.info("Sending %s %s failed: %s", method, path, e)
+            else:
+                if response.status_code < 500:
+                    return response
+                logger.info("Sending %s %s got %s", method, path, response.status_code)
+        self.enqueue(key, method, path, params, body, auth)
+        return None
+
+    def enqueue(self, key, method, path, params=None, body=None, auth=None):
+        """Record a mutation, replacing any pending one for the same key, and return its sequence number."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM pending WHERE key = ?", (key,))
+            cursor = self._db.execute(
+                "INSERT INTO pending (key, method, path, params, body, auth, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, method, path,
+                 json.dumps(params) if params is not None else None,
+                 json.dumps(body) if body is not None else None,
+                 auth, time.time()))
+            self._db.execute("COMMIT")
+        logger.info("Queued %s %s (#%d)", method, path, cursor.lastrowid)
+        self.start()
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def pending(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, key, method, path, params, body, auth FROM pending ORDER BY seq").fetchall()
+        return [
+            {"seq": seq, "key": key, "method": method, "path": path,
+             "params": json.loads(params) if params else None,
+             "body": json.loads(body) if body else None, "auth": auth}
+            for seq, key, method, path, params, body, auth in rows
+        ]
+
+    def has_pending(self, key):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM pending WHERE key = ? LIMIT 1", (key,)).fetchone() is not None
+
+    def depth(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def clear(self):
+        """Drop every pending entry, e.g. because the account that made them signed out."""
+        with self._lock:
+            self._db.execute("DELETE FROM pending")
+            self._generation += 1
+
+    def on_replayed(self, callback):
+        """Call `callback(entry, response)` after each entry is delivered."""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def flush(self):
+        """Deliver pending entries in order; return True when the queue was drained."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        generation = self._generation
+        for entry in self.pending():
+            if self._generation != generation:
+                # clear() ran since pending() was read; the rest belongs to a signed out account
+                return True
+            try:
+                response = self._send(entry)
+            except requests.RequestException as e:
+                logger.info("Replay of #%d failed, will retry: %s", entry['seq'], e)
+                return False
+
+            if response.status_code >= 500:
+                logger.warning("Replay of #%d got %s, will retry", entry['seq'], response.status_code)
+                return False
+            if not response.ok:
+                # The server rejected the change itself, so retrying cannot help
+                logger.warning("Dropping #%d %s: %s, %s", entry['seq'], entry['path'], response.status_code,
+                               response.text)
+
+            self._remove(entry["seq"])
+            for callback in list(self._listeners):
+                callback(entry, response)
+        return True
+
+    def _run(self):
+        backoff = self.min_backoff
+        while not self._stopped.is_set():
+            if self.depth() == 0:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                backoff = self.min_backoff
+                continue
+
+            if client.server_ready() and self.flush():
+                backoff = self.min_backoff
+                continue
+
+            # Jittered exponential backoff so a recovering server isn't hit in lockstep
+            self._wakeup.wait(backoff * random.uniform(0.8, 1.2))
+            self._wakeup.clear()
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _send(self, entry):
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        token = self.token_provider() if self.token_provider and entry["auth"] else None
+        if token:
+            headers["Authorization"] = f"Bearer {token}" if entry["auth"] == "bearer" else token
+        return client.request(
+            entry["method"], entry["path"],
+            params=entry["params"],
+            data=json.dumps(entry["body"]) if entry["body"] is not None else None,
+            headers=headers)
+
+    def _remove(self, seq):
+        with self._lock:
+            self._db.execute("DELETE FROM pending WHERE seq = ?", (seq,))
+
+
+_writer = None
+
+
+def settings_writer():
+    """Return the process-wide settings write queue."""
+    global _writer
+    if _writer is None:
+        from sd_qt.sd_desktop.util import credentials
+
+        def token():
+            creds = credentials()
+            return creds.get("token") if creds else None
+
+        _writer = SettingsWriteQueue(token_provider=token)
+        # Settings writes change what /0/getallsettings returns
+        _writer.on_replayed(lambda entry, response: client.response_cache.invalidate())
+    return _writer
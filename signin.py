@@ -1,17 +1,19 @@
-import json
+import logging
 import os
 import sys
 import threading
 
-import requests
 from PySide6 import QtCore, QtGui
 from PySide6.QtCore import QCoreApplication, QTimer, Signal, Qt, Slot, QObject, QThread
 from PySide6.QtGui import QPixmap, Qt, QIcon, QCursor, QMovie
 from PySide6.QtWidgets import QWidget, QStackedWidget, QHBoxLayout, QApplication, QPushButton, QLabel, QSizePolicy, \
     QVBoxLayout, QLineEdit, QToolButton, QComboBox, QGraphicsDropShadowEffect
 
-from sd_core.cache import clear_credentials, add_password
 from sd_qt.sd_desktop.ThemeManager import ThemeManager
+from sd_qt.sd_desktop import client
+from sd_qt.sd_desktop.client import server_ready
+from sd_qt.sd_desktop.credential_store import credential_store
+from sd_qt.sd_desktop.scheduler import task_scheduler
 from sd_qt.sd_desktop.util import credentials
 
 # Define paths
@@ -21,6 +23,8 @@ resources_path = os.path.join(base_path, "sd_qt","sd_desktop", "resources")
 darkTheme = os.path.join(resources_path, "DarkTheme")
 lightTheme = os.path.join(resources_path, "LightTheme")
 
+logger = logging.getLogger(__name__)
+
 user_details = {
 
 }
@@ -50,8 +54,6 @@ class SignIn(QWidget):
         # Create QStackedWidget and layout
         self.signin_widget = QStackedWidget()
         self.on_sign_in_completed = on_sign_in_completed
-        self.server_check_timer = QTimer(self)  # Add a QTimer for server checks
-        self.server_check_timer.timeout.connect(self.check_server_and_move)
 
         # Add loading page and homepage with lazy loading
         self.loading_page = LoadingPage()
@@ -79,13 +81,13 @@ class SignIn(QWidget):
 
     def start_server_check_timer(self):
         """Start checking the server status every second."""
-        self.server_check_timer.start(1000)
+        task_scheduler().add_job("server_check", server_ready, 1, priority=20, blocking=True,
+                                 on_done=self.check_server_and_move, owner=self, run_now=True)
 
-    def check_server_and_move(self):
-        """Check the server status and move to the dashboard if available."""
-        # Assuming you have a function check_server_status in SignInPage for server availability check
-        if self.signin.check_server_status():  # Use your server status check here
-            self.server_check_timer.stop()  # Stop the timer once server is available
+    def check_server_and_move(self, server_available):
+        """Move to the dashboard once the server check reports it available."""
+        if server_available:
+            task_scheduler().remove_job("server_check")  # Stop checking once server is available
             self.navigate_to_dashboard()  # Move to the dashboard
 
     def navigate_to_dashboard(self):
@@ -161,12 +163,12 @@ class SignIn(QWidget):
                     }}
                 """)
         else:
-            print(f"Background image not found: {self.background_image}")
+            logger.warning("Background image not found: %s", self.background_image)
 
         sundial_pixmap = QPixmap(sundial_logo)
         subtitle_pixmap = QPixmap(homepage_subtitle)
         current_page = self.signin_widget.currentWidget()
-        print(current_page)
+        logger.debug("Applying theme to %s", type(current_page).__name__)
 
         # Set pixmap on the relevant pages
         if isinstance(current_page, LoadingPage):
@@ -284,7 +286,6 @@ class SignInPage(QWidget):
         self.show_pass = None
         self.companies = None
         self.companyid = None
-        self.host = "http://localhost:7600/api"
         self.loginSuccess = loginSuccess
 
         self.setGeometry(0, 0, 800, 600)
@@ -350,8 +351,6 @@ class SignInPage(QWidget):
         self.showPassButton.setToolTip('View password')
         self.showPassButton.setCursor(QCursor(Qt.PointingHandCursor))
 
-        print(f"ToolTip set: {self.showPassButton.toolTip()}")
-
         # Connect the toggle action to show/hide password
         self.showPassButton.toggled.connect(self.showPassword)
 
@@ -396,7 +395,7 @@ class SignInPage(QWidget):
         self.loading_animation.setStyleSheet("background:none")
         self.loading_animation.setGeometry((800 // 2) - 50, (600 // 2) - 50, 100, 100)  # Centered position
         self.loading_animation.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        self.loading_movie = QMovie(resources_path+"\loader.gif")  # Replace with the actual path to your GIF
+        self.loading_movie = QMovie(resources_path+"\loader.gif", parent=self)  # Replace with the actual path to your GIF
         self.loading_animation.setMovie(self.loading_movie)
 
         self.signin_message = QWidget(parent=self)
@@ -464,9 +463,9 @@ class SignInPage(QWidget):
     def perform_login_request(self, email, password):
         payload = {"userName": email, "password": password, "companyId": self.companyid or ""}
         try:
-            response = requests.post(self.host + "/0/ralvie/login", json=payload,
-                                     headers={'Content-Type': 'application/json'})
-            print(response.text)
+            response = client.request("POST", "/0/ralvie/login", json=payload,
+                                      headers={'Content-Type': 'application/json'}, timeout=30)
+            logger.debug("Login response: %s", response.status_code)
 
             if response.ok:
                 response_data = response.json()
@@ -493,16 +492,10 @@ class SignInPage(QWidget):
             5000, lambda: self.errorMessageLabel.setVisible(False))
 
     def check_server_status(self):
-        try:
-            response = requests.get(
-                self.host + "/0/server_status")
-            return response.status_code == 200
-        except requests.RequestException:
-            return False
+        return server_ready()
 
 
     def change_theme(self,theme_settings):
-        print(theme_settings)
         sign_in_pixmap = QPixmap(theme_settings.get("sign_in_SundialLogo"))
         self.sign_in_Sundial_logo.setPixmap(sign_in_pixmap)
         self.sign_in_Sundial_logo.setStyleSheet("background: transparent;")
@@ -570,7 +563,6 @@ class CompanyPage(QWidget):
         self.companyPageSwitch = companyPageSwitch
         self.move_on = move_on
 
-        self.host = "http://localhost:7600/api"
         # Sundial Logo Label
         self.company_Sundial_logo = TransparentLabel("Sundial Logo", parent=self)
         self.company_Sundial_logo.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
@@ -742,7 +734,7 @@ class CompanyPage(QWidget):
 
         # Create a QThread
         self.thread = QThread()
-        self.worker = Worker(self.host, payload)
+        self.worker = Worker(payload)
         
         # Move the worker to the thread
         self.worker.moveToThread(self.thread)
@@ -764,10 +756,11 @@ class CompanyPage(QWidget):
         self.company_loader_overlay.setVisible(False)
         if response_data["code"] == "UASI0011":
             self.sundail_token = response_data['data']['token']
-            clear_credentials("SD_KEYS")
+            # The login stored a new token in the keyring, so drop the in-memory copy first
+            credential_store().clear()
             cached_credentials = credentials()
             cached_credentials['Sundial'] = True
-            add_password("SD_KEYS", json.dumps(cached_credentials))
+            credential_store().set(cached_credentials)
             self.move_on.emit()  # Proceed to the next screen
         else:
             self.company_loader_overlay.setVisible(False)
@@ -802,7 +795,7 @@ class Loader(QWidget):
             loader_size, loader_size
         )
         self.loader_animation.setAlignment(Qt.AlignCenter)
-        self.loader_movie = QMovie(gif_path)
+        self.loader_movie = QMovie(gif_path, parent=self)
         self.loader_animation.setMovie(self.loader_movie)
 
     def start(self):
@@ -823,18 +816,18 @@ class Worker(QObject):
     finished = Signal(dict)  # Signal to emit the result of the API call
     error = Signal(str)  # Signal to emit error messages
 
-    def __init__(self, host, payload):
+    def __init__(self, payload):
         super().__init__()
-        self.host = host
         self.payload = payload
 
     @Slot()
     def run(self):
         try:
-            response = requests.post(
-                self.host + "/0/ralvie/login",
+            response = client.request(
+                "POST", "/0/ralvie/login",
                 json=self.payload,
                 headers={"Content-Type": "application/json"},
+                timeout=30,
             )
             if response.ok:
                 self.finished.emit(response.json())
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import threading
+
+from sd_qt.sd_desktop.paths import data_dir
+
+logger = logging.getLogger(__name__)
+
+snapshot_version = 1
+row_fields = ("id", "app", "time", "start", "end", "titles")
+_lock = threading.Lock()
+
+
+def snapshot_path():
+    return os.path.join(data_dir(), "ui_snapshot.json")
+
+
+def save_snapshot(state, path=None):
+    """Write the rendered-state snapshot, replacing the previous one atomically."""
+    path = path or snapshot_path()
+    payload = json.dumps(dict(state, version=snapshot_version), separators=(",", ":"))
+    with _lock:
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            file.write(payload)
+        os.replace(path + ".tmp", path)
+    logger.debug("Saved UI snapshot (%d bytes)", len(payload))
+
+
+def save_snapshot_async(state):
+    """save_snapshot on a short-lived thread, for when the GUI shouldn't wait on the disk."""
+    threading.Thread(target=save_snapshot, args=(state,), name="snapshot", daemon=True).start()
+
+
+def load_snapshot(path=None):
+    """The last saved snapshot, or None if there is none or it can't be used."""
+    path = path or snapshot_path()
+    try:
+        with open(path, encoding="utf-8") as file:
+            state = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable UI snapshot %s", path, exc_info=True)
+        return None
+    return state if isinstance(state, dict) and state.get("version") == snapshot_version else None
+
+
+def clear_snapshot(path=None):
+    """Remove the snapshot, e.g. on sign-out so another account never sees it."""
+    with _lock:
+        try:
+            os.remove(path or snapshot_path())
+        except FileNotFoundError:
+            pass
+
+
+def pack_rows(rows):
+    """Display rows as compact lists of the fields the Activities views use."""
+    return [[row.get(field) for field in row_fields] for row in rows]
+
+
+def unpack_rows(packed):
+    return [dict(zip(row_fields, values)) for values in packed]
@@ -0,0 +1,142 @@
+import faulthandler
+import json
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from PySide6.QtCore import QObject, QTimer
+
+
+frame_line = re.compile(r'\s*File "(?P<file>.*)", line (?P<line>\d+) in (?P<name>.*)')
+
+
+def thread_stacks(dump_file=None):
+    """Every thread's Python stack as {thread id: [(file, line, function), ...]}, oldest call first.
+
+    The stacks are written out by faulthandler. Walking another running
+    thread's frame objects instead (sys._current_frames() and f_back) ended
+    in a fatal "none_dealloc" error during long GUI work in the sign-in
+    cycle stress run. `dump_file` is a temporary file to reuse between
+    calls; by default one is created for the call.
+    """
+    f = dump_file or tempfile.TemporaryFile("w+")
+    try:
+        f.seek(0)
+        f.truncate()
+        faulthandler.dump_traceback(f, all_threads=True)
+        f.seek(0)
+        sections = f.read().split("\n\n")
+    finally:
+        if dump_file is None:
+            f.close()
+
+    stacks = {}
+    for section in sections:
+        header, _, body = section.strip().partition("\n")
+        # "Thread 0x... (most recent call first):", or "Current thread 0x..." for the caller
+        thread_id = next((word for word in header.split() if word.startswith("0x")), None)
+        if thread_id is None:
+            continue
+        stacks[int(thread_id, 16)] = [
+            (match["file"], int(match["line"]), match["name"])
+            for match in map(frame_line.match, reversed(body.splitlines())) if match]
+    return stacks
+
+
+class StallWatchdog(QObject):
+    """Measures GUI event-loop latency and records stalls.
+
+    A heartbeat timer on the GUI thread notes when it actually fires. The
+    lateness of each beat goes into a rolling latency window. A watcher
+    thread notices when the heartbeat stops. For any stall longer than
+    `threshold` seconds it captures the main thread's Python stack, and the
+    stall's duration is filled in once the loop recovers.
+    """
+
+    def __init__(self, interval_ms=100, threshold=0.25, window=3000, max_stalls=200):
+        super().__init__()
+        self.interval = interval_ms / 1000
+        self.threshold = threshold
+        self.latencies = deque(maxlen=window)
+        self.stalls = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._main_thread_id = threading.main_thread().ident
+        self._last_beat = time.perf_counter()
+        self._pending_stall = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._beat)
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+
+    def start(self):
+        self._last_beat = time.perf_counter()
+        self._timer.start(int(self.interval * 1000))
+        self._thread.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._stopped.set()
+
+    def _beat(self):
+        now = time.perf_counter()
+        latency = max(0.0, now - self._last_beat - self.interval)
+        self._last_beat = now
+        with self._lock:
+            self.latencies.append(latency)
+            stall, self._pending_stall = self._pending_stall, None
+            if stall:
+                stall["duration"] = round(latency + self.interval, 4)
+                self.stalls.append(stall)
+                self.stall_count += 1
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval / 2):
+            blocked_for = time.perf_counter() - self._last_beat
+            if blocked_for < self.threshold or self._pending_stall:
+                continue
+            stack = self._main_thread_stack()
+            with self._lock:
+                self._pending_stall = {
+                    "time": datetime.now().isoformat(timespec="seconds"),
+                    "stack": stack,
+                }
+
+    def _main_thread_stack(self):
+        """The GUI thread's stack, oldest call first."""
+        return [f'File "{file}", line {line} in {name}'
+                for file, line, name in thread_stacks().get(self._main_thread_id, [])]
+
+    def percentiles(self):
+        """p50/p95/p99/max event-loop latency in milliseconds over the rolling window."""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        def pick(fraction):
+            return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 2)
+
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(samples[-1] * 1000, 2)}
+
+    def report(self):
+        with self._lock:
+            stalls = list(self.stalls)
+            stall_count = self.stall_count
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "samples": len(self.latencies),
+            "latency_ms": self.percentiles(),
+            "stall_count": stall_count,
+            "stalls": stalls,
+        }
+
+    def dump(self, path):
+        """Write the latency histogram and recorded stalls as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
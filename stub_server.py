@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Minimal settings payload matching the shape returned by /0/getallsettings
+default_settings = {
+    "launch": False,
+    "idle_time": False,
+    "schedule": False,
+    "weekdays_schedule": {
+        "Monday": True, "Tuesday": True, "Wednesday": True, "Thursday": True,
+        "Friday": True, "Saturday": True, "Sunday": True,
+        "starttime": "00:00", "endtime": "23:59"
+    }
+}
+
+
+class StubServer:
+    """Local stand-in for the sd-server API on http://127.0.0.1:<port>/api.
+
+    Serves settings, events, login and status endpoints from memory and answers
+    conditional requests (If-None-Match / If-Modified-Since) with 304, so the
+    client's revalidation can be exercised without the real backend.
+
+    It can be stopped and started again on the same port. Setting
+    `fail_status` answers every request with that status and `delay`
+    holds each answer back by that many seconds, to simulate a failing or
+    hanging server.
+    """
+
+    def __init__(self, port=0, settings=None, events=None):
+        self.settings = json.loads(json.dumps(settings or default_settings))
+        self.events = list(events or [])
+        self.version = 1
+        self.modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.requests = []
+        self.fail_status = None
+        self.delay = 0
+        self.lock = threading.Lock()
+        self._port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def host(self):
+        """Base URL to assign to `client.host`."""
+        return f"http://127.0.0.1:{self._port}/api"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", self._port), _make_handler(self))
+        self._port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def update_setting(self, code, value):
+        with self.lock:
+            self.settings[code] = value
+            self.version += 1
+            self.modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    @property
+    def etag(self):
+        return f'"settings-{self.version}"'
+
+
+def _make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; without this each response waits on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            stub.requests.append(("GET", url.path))
+            if self._failed():
+                return
+            if url.path == "/api/0/getallsettings":
+                self._send_settings()
+            elif url.path == "/api/0/server_status":
+                self._send_json({"status": "ok"})
+            elif url.path == "/api/0/dashboard/events":
+                self._send_events(parse_qs(url.query))
+            elif url.path in ("/api/0/idletime", "/api/0/launchOnStart"):
+                self._send_json({"status": parse_qs(url.query).get("status", [""])[0]})
+            else:
+                self._send_json({"message": "Not found"}, status=404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            stub.requests.append(("POST", url.path))
+            if self._failed():
+                return
+            body = self._read_json()
+            if url.path == "/api/0/settings":
+                stub.update_setting(body.get("code"), body.get("value"))
+                self._send_json(stub.settings)
+            elif url.path == "/api/0/ralvie/login":
+                self._send_json({"code": "UASI0011", "data": {"token": "stub-token"}})
+            else:
+                self._send_json({"message": "Not found"}, status=404)
+
+        def do_PATCH(self):
+            url = urlparse(self.path)
+            stub.requests.append(("PATCH", url.path))
+            if self._failed():
+                return
+            body = self._read_json()
+            if url.path == "/api/0/settings" and isinstance(body.get("value"), dict):
+                current = stub.settings.get(body.get("code")) or {}
+                stub.update_setting(body.get("code"), dict(current) | body["value"])
+                self._send_json(stub.settings)
+            else:
+                self._send_json({"message": "Not found"}, status=404)
+
+        def _failed(self):
+            if stub.delay:
+                time.sleep(stub.delay)
+            if stub.fail_status is None:
+                return False
+            self._read_json()
+            self._send_json({"message": "Stub failure"}, status=stub.fail_status)
+            return True
+
+        def _send_settings(self):
+            with stub.lock:
+                etag = stub.etag
+                modified = stub.modified
+                payload = json.dumps(stub.settings).encode()
+
+            if self.headers.get("If-None-Match") == etag or self._not_modified_since(modified):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", format_datetime(modified, usegmt=True))
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _not_modified_since(self, modified):
+            since = self.headers.get("If-Modified-Since")
+            if not since or self.headers.get("If-None-Match"):
+                return False
+            try:
+                return modified <= parsedate_to_datetime(since)
+            except (TypeError, ValueError):
+                return False
+
+        def _send_events(self, query):
+            start = query.get("start", [""])[0].replace(" ", "T")[:19]
+            end = query.get("end", [""])[0].replace(" ", "T")[:19]
+            events = [event for event in stub.events
+                      if (not start or event["end"][:19] >= start) and (not end or event["start"][:19] <= end)]
+            self._send_json({"events": events})
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return {}
+            try:
+                return json.loads(self.rfile.read(length))
+            except ValueError:
+                return {}
+
+        def _send_json(self, data, status=200):
+            payload = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+if __name__ == "__main__":
+    server = StubServer(port=7600).start()
+    print(f"Stub server listening on {server.host}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
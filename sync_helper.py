@@ -0,0 +1,254 @@
+"""Optional helper process that runs the activity sync outside the GUI process.
+
+With $SD_SYNC_HELPER set, MainWindow starts this module as a child
+process. The helper owns the live activity sync: requests to the
+sd-server, the event store and the usage aggregates. It sends the GUI only
+the display rows that changed, plus the day's per-app totals, so the GUI
+process spends no time decoding or formatting event payloads. The two
+processes talk over a QLocalSocket using length-prefixed JSON messages.
+"""
+import argparse
+import json
+import logging
+import os
+import struct
+import sys
+import time
+from datetime import date
+
+from PySide6.QtCore import QCoreApplication, QObject, QProcess, QTimer, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from sd_qt.sd_desktop import client
+from sd_qt.sd_desktop.aggregates import usage_aggregates
+from sd_qt.sd_desktop.snapshot import pack_rows, unpack_rows
+from sd_qt.sd_desktop.util import events_day, get_events
+
+logger = logging.getLogger(__name__)
+
+header = struct.Struct(">I")
+
+
+def encode_message(message):
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return header.pack(len(payload)) + payload
+
+
+class MessageReader:
+    """Splits a byte stream back into the messages of encode_message."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes and return the messages completed by them."""
+        self._buffer += data
+        messages = []
+        while len(self._buffer) >= header.size:
+            (length,) = header.unpack_from(self._buffer)
+            if len(self._buffer) < header.size + length:
+                break
+            messages.append(json.loads(self._buffer[header.size:header.size + length]))
+            del self._buffer[:header.size + length]
+        return messages
+
+
+class SyncHelper(QObject):
+    """The helper process's side: syncs on a timer or when asked and sends what changed."""
+
+    def __init__(self, server_name, interval=30, batch_size=2000):
+        super().__init__()
+        self.batch_size = batch_size
+        self._day = None
+        self._sent = {}  # row id -> (time, number of titles) as last sent
+        self._reader = MessageReader()
+
+        self._socket = QLocalSocket(self)
+        self._socket.readyRead.connect(self._on_ready_read)
+        self._socket.disconnected.connect(QCoreApplication.quit)
+        self._socket.connectToServer(server_name)
+        if not self._socket.waitForConnected(5000):
+            raise ConnectionError(f"Can't connect to {server_name}: {self._socket.errorString()}")
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.sync)
+        self._timer.start(interval * 1000)
+        QTimer.singleShot(0, self.sync)
+
+    def sync(self):
+        rows = get_events()
+        if rows is None:
+            return
+        day = events_day()
+        reset = day != self._day
+        if reset:
+            self._day = day
+            self._sent.clear()
+        changed = [row for row in rows if self._sent.get(row['id']) != (row['time'], len(row['titles']))]
+        if not changed and not reset:
+            return
+
+        for first in range(0, max(len(changed), 1), self.batch_size):
+            batch = changed[first:first + self.batch_size]
+            self._send({"type": "rows", "day": day.isoformat(), "reset": reset and first == 0,
+                        "rows": pack_rows(batch)})
+        self._sent.update((row['id'], (row['time'], len(row['titles']))) for row in changed)
+        self._send({"type": "totals", "day": day.isoformat(), "totals": usage_aggregates().day_totals(day)})
+
+    def _send(self, message):
+        self._socket.write(encode_message(message))
+        self._socket.flush()
+
+    def _on_ready_read(self):
+        for message in self._reader.feed(bytes(self._socket.readAll())):
+            if message["type"] == "refresh":
+                if message.get("full"):
+                    self._day = None  # Resend every row
+                self._timer.start()
+                self.sync()
+            elif message["type"] == "quit":
+                QCoreApplication.quit()
+
+
+class SyncSupervisor(QObject):
+    """The GUI's side: launches the helper, restarts it when it dies and relays its messages.
+
+    Restarts back off exponentially up to `max_backoff` seconds; a helper
+    that stayed up for a minute resets the backoff.
+    """
+    rows_received = Signal(object, object, bool)  # date, display rows, replaces the day's rows
+    totals_received = Signal(object, object)  # date, [(app, seconds)] largest first
+
+    def __init__(self, max_backoff=60):
+        super().__init__()
+        self.max_backoff = max_backoff
+        self.server_name = f"sundial-sync-{os.getpid()}"
+        self.restarts = 0
+        self._backoff = 1
+        self._started_at = 0.0
+        self._stopping = False
+        self._process = None
+        self._socket = None
+        self._reader = None
+
+        QLocalServer.removeServer(self.server_name)
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._on_connection)
+        self._restart_timer = QTimer(self)
+        self._restart_timer.setSingleShot(True)
+        self._restart_timer.timeout.connect(self._launch)
+
+    def start(self):
+        if not self._server.listen(self.server_name):
+            raise OSError(f"Can't listen on {self.server_name}: {self._server.errorString()}")
+        self._launch()
+
+    def stop(self):
+        self._stopping = True
+        self._restart_timer.stop()
+        self._send({"type": "quit"})
+        if self._process is not None and not self._process.waitForFinished(2000):
+            self._process.kill()
+            self._process.waitForFinished(1000)
+        self._server.close()
+
+    def refresh(self, full=False):
+        """Ask the helper to sync now; `full` resends all of today's rows, not just the changed ones."""
+        self._send({"type": "refresh", "full": full})
+
+    def is_connected(self):
+        return self._socket is not None and self._socket.state() == QLocalSocket.ConnectedState
+
+    def _launch(self):
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.ForwardedChannels)
+        process.finished.connect(lambda code, status: self._on_finished(process, code))
+        process.errorOccurred.connect(lambda error: error == QProcess.FailedToStart and self._on_finished(process, -1))
+        self._process = process
+        self._started_at = time.monotonic()
+        process.start(sys.executable, ["-m", "sd_qt.sd_desktop.sync_helper", self.server_name, "--host", client.host])
+
+    def _on_finished(self, process, code):
+        if self._stopping or process is not self._process:
+            return
+        process.deleteLater()
+        if time.monotonic() - self._started_at > 60:
+            self._backoff = 1
+        self.restarts += 1
+        logger.warning("Sync helper exited with %s, restarting in %d s", code, self._backoff)
+        self._restart_timer.start(self._backoff * 1000)
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    def _on_connection(self):
+        socket = self._server.nextPendingConnection()
+        if self._socket is not None:
+            self._socket.deleteLater()
+        self._socket = socket
+        self._reader = MessageReader()
+        socket.readyRead.connect(lambda: self._on_ready_read(socket))
+
+    def _on_ready_read(self, socket):
+        if socket is not self._socket:
+            return
+        for message in self._reader.feed(bytes(socket.readAll())):
+            day = date.fromisoformat(message["day"])
+            if message["type"] == "rows":
+                self.rows_received.emit(day, unpack_rows(message["rows"]), message["reset"])
+            elif message["type"] == "totals":
+                self.totals_received.emit(day, [tuple(total) for total in message["totals"]])
+
+    def _send(self, message):
+        if self.is_connected():
+            self._socket.write(encode_message(message))
+            self._socket.flush()
+
+
+_supervisor = None
+
+
+def sync_helper():
+    """The running sync helper's supervisor, or None when the sync runs in the GUI process."""
+    return _supervisor
+
+
+def start_sync_helper():
+    """Start the helper process if $SD_SYNC_HELPER is set and return its supervisor, else None."""
+    global _supervisor
+    if _supervisor is None and os.environ.get("SD_SYNC_HELPER"):
+        _supervisor = SyncSupervisor()
+        _supervisor.start()
+        logger.info("Started sync helper on %s", _supervisor.server_name)
+    return _supervisor
+
+
+def stop_sync_helper():
+    global _supervisor
+    if _supervisor is not None:
+        _supervisor.stop()
+        _supervisor = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Activity sync helper process; started by the desktop client.")
+    parser.add_argument("server_name", help="QLocalServer name of the GUI process")
+    parser.add_argument("--host", default=client.host, help="sd-server API base URL")
+    args = parser.parse_args(argv)
+
+    from sd_qt.sd_desktop.log import setup_logging
+    from sd_qt.sd_desktop.paths import data_dir
+
+    app = QCoreApplication(sys.argv[:1])
+    setup_logging(log_dir=os.path.join(data_dir(), "logs", "sync-helper"), console=False)
+    client.host = args.host
+    try:
+        helper = SyncHelper(args.server_name)
+    except ConnectionError:
+        logger.exception("Sync helper couldn't reach the GUI")
+        return 1
+    status = app.exec()
+    del helper
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import time
+from datetime import date
+
+import pytest
+
+from sd_qt.sd_desktop.aggregates import UsageAggregates, day_totals
+
+
+@pytest.fixture(autouse=True)
+def utc(monkeypatch):
+    # Buckets are local dates and hours; pin the zone so they match the UTC timestamps below
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def raw(event_id, start, end, app="Editor"):
+    return {"event_id": event_id, "application_name": app, "start": start, "end": end}
+
+
+day = date(2026, 10, 19)
+previous_day = date(2026, 10, 18)
+
+
+def test_apply_splits_at_hours_and_days():
+    aggregates = UsageAggregates()
+    aggregates.apply([
+        raw(1, "2026-10-18T23:50:00Z", "2026-10-19T00:20:00Z"),
+        raw(2, "2026-10-19T00:20:00Z", "2026-10-19T00:30:00Z", app="Mail"),
+    ])
+
+    assert aggregates.day_totals(previous_day) == [("Editor", 600)]
+    assert aggregates.day_totals(day) == [("Editor", 1200), ("Mail", 600)]
+    assert aggregates.hour_totals(day) == {0: {"Editor": 1200, "Mail": 600}}
+    assert aggregates.day_total(day) == 1800
+
+
+def test_growing_event_replaces_its_contribution():
+    aggregates = UsageAggregates()
+    aggregates.apply([raw(1, "2026-10-19T09:50:00Z", "2026-10-19T09:55:00Z")])
+    aggregates.apply([raw(1, "2026-10-19T09:50:00Z", "2026-10-19T10:05:00Z")])
+    # Seeing the same span again changes nothing
+    aggregates.apply([raw(1, "2026-10-19T09:50:00Z", "2026-10-19T10:05:00Z")])
+
+    assert aggregates.app_total("Editor", day) == 900
+    assert aggregates.hour_totals(day) == {9: {"Editor": 600}, 10: {"Editor": 300}}
+
+
+def test_event_moved_to_another_app_leaves_no_empty_buckets():
+    aggregates = UsageAggregates()
+    aggregates.apply([raw(1, "2026-10-19T09:00:00Z", "2026-10-19T09:10:00Z")])
+    aggregates.apply([raw(1, "2026-10-19T09:00:00Z", "2026-10-19T09:10:00Z", app="Mail")])
+
+    assert aggregates.day_totals(day) == [("Mail", 600)]
+    assert aggregates.app_total("Editor", day) == 0
+
+
+def test_matches_a_fresh_computation():
+    events = [
+        raw(1, "2026-10-19T08:00:00Z", "2026-10-19T08:45:00Z"),
+        raw(2, "2026-10-19T08:45:00Z", "2026-10-19T09:15:00Z", app="Mail"),
+        raw(3, "2026-10-19T09:15:00Z", "2026-10-19T09:20:00Z", app="Browser"),
+    ]
+    aggregates = UsageAggregates()
+    for event in events:
+        aggregates.apply([event])
+
+    assert aggregates.day_totals(day) == day_totals(events, day)
+
+
+def test_forget_before_drops_earlier_days_only():
+    aggregates = UsageAggregates()
+    aggregates.apply([
+        raw(1, "2026-10-18T10:00:00Z", "2026-10-18T10:30:00Z"),
+        raw(2, "2026-10-18T23:50:00Z", "2026-10-19T00:10:00Z"),
+        raw(3, "2026-10-19T09:00:00Z", "2026-10-19T09:10:00Z"),
+    ])
+    aggregates.forget_before(day)
+
+    assert aggregates.day_totals(previous_day) == []
+    assert aggregates.hour_totals(previous_day) == {}
+    assert aggregates.day_totals(day) == [("Editor", 1200)]
+
+    # Event 2 reaches into the kept day, so it is still known and an update replaces it
+    aggregates.apply([raw(2, "2026-10-18T23:50:00Z", "2026-10-19T00:20:00Z")])
+    assert aggregates.day_totals(day) == [("Editor", 1800)]
+    # Neither that update nor a late event brings the forgotten day back
+    aggregates.apply([raw(1, "2026-10-18T10:00:00Z", "2026-10-18T10:30:00Z")])
+    assert aggregates.day_totals(previous_day) == []
+    assert aggregates.hour_totals(previous_day) == {}
+
+
+def test_clear_counts_every_day_again():
+    aggregates = UsageAggregates()
+    aggregates.forget_before(day)
+    aggregates.clear()
+    aggregates.apply([raw(1, "2026-10-18T10:00:00Z", "2026-10-18T10:30:00Z")])
+
+    assert aggregates.day_totals(previous_day) == [("Editor", 1800)]
@@ -0,0 +1,82 @@
+from sd_qt.sd_desktop.coalesce import Coalescer, coalesce
+
+
+def formatted(event_id, start, end, app="Editor", title=None):
+    return {"id": event_id, "app": app, "title": title or f"{app} {event_id}",
+            "time": f"{start[:5]} - {end[:5]}",
+            "start": f"2026-10-19T{start}Z", "end": f"2026-10-19T{end}Z"}
+
+
+def summary(rows):
+    return [(row["id"], row["app"], row["ids"], row["time"]) for row in rows]
+
+
+def test_gap_up_to_the_limit_merges():
+    rows = coalesce([
+        formatted(1, "09:00:00", "09:10:00"),
+        # Exactly the gap after the previous one ends
+        formatted(2, "09:11:00", "09:20:00"),
+    ], gap=60)
+
+    assert summary(rows) == [(1, "Editor", [1, 2], "09:00 - 09:20")]
+    assert rows[0]["titles"] == ["Editor 1", "Editor 2"]
+
+
+def test_longer_gap_splits():
+    rows = coalesce([
+        formatted(1, "09:00:00", "09:10:00"),
+        formatted(2, "09:11:01", "09:20:00"),
+    ], gap=60)
+
+    assert summary(rows) == [(1, "Editor", [1], "09:00 - 09:10"), (2, "Editor", [2], "09:11 - 09:20")]
+
+
+def test_zero_gap_merges_only_touching_events():
+    rows = coalesce([
+        formatted(1, "09:00:00", "09:10:00"),
+        formatted(2, "09:10:00", "09:20:00"),
+        formatted(3, "09:20:01", "09:30:00"),
+    ], gap=0)
+
+    assert [row["ids"] for row in rows] == [[1, 2], [3]]
+
+
+def test_other_app_in_between_splits():
+    rows = coalesce([
+        formatted(1, "09:00:00", "09:10:00"),
+        formatted(2, "09:10:00", "09:11:00", app="Mail"),
+        formatted(3, "09:11:00", "09:20:00"),
+    ], gap=60)
+
+    assert summary(rows) == [
+        (1, "Editor", [1], "09:00 - 09:10"),
+        (2, "Mail", [2], "09:10 - 09:11"),
+        (3, "Editor", [3], "09:11 - 09:20"),
+    ]
+
+
+def test_growing_event_updates_its_row():
+    coalescer = Coalescer(gap=60)
+    coalescer.add([formatted(1, "09:00:00", "09:10:00"), formatted(2, "09:10:30", "09:12:00")])
+
+    # The second event is still growing; only its row comes back
+    changed = coalescer.add([formatted(2, "09:10:30", "09:15:00")])
+    assert summary(changed) == [(1, "Editor", [1, 2], "09:00 - 09:15")]
+    assert coalescer.row_for(2) is coalescer.rows[0]
+    assert len(coalescer.rows) == 1
+
+
+def test_incremental_adds_match_one_pass():
+    events = [
+        formatted(1, "09:00:00", "09:10:00"),
+        formatted(2, "09:10:30", "09:12:00"),
+        formatted(3, "09:12:00", "09:13:00", app="Mail", title="Inbox"),
+        formatted(4, "09:13:30", "09:14:00", app="Mail", title="Inbox"),
+        formatted(5, "09:20:00", "09:25:00"),
+    ]
+    coalescer = Coalescer(gap=60)
+    for event in events:
+        coalescer.add([event])
+
+    assert summary(coalescer.rows) == summary(coalesce(events, gap=60))
+    assert coalescer.rows[1]["titles"] == ["Inbox"]
@@ -0,0 +1,74 @@
+import sqlite3
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from sd_qt.sd_desktop import client, event_source
+from sd_qt.sd_desktop.datastore_fixture import build_datastore
+from sd_qt.sd_desktop.event_source import DatastoreEventSource, HttpEventSource
+from sd_qt.sd_desktop.stub_server import StubServer
+
+
+def window_event(event_id, start, end, app="Editor"):
+    return {"event_id": event_id, "application_name": app, "title": f"{app} {event_id}",
+            "start": f"2026-10-19T{start}Z", "end": f"2026-10-19T{end}Z"}
+
+
+events = [
+    window_event(1, "08:00:00", "08:30:00", app="Mail"),
+    # Starts before the range and reaches into it
+    window_event(2, "09:00:00", "09:10:00"),
+    window_event(3, "09:10:00", "09:20:00", app="Browser"),
+    # Starts inside the range and runs past its end
+    window_event(4, "09:20:00", "09:30:00", app="Terminal"),
+    window_event(5, "09:40:00", "09:50:00", app="Mail"),
+]
+range_start = datetime(2026, 10, 19, 9, 5)
+range_end = datetime(2026, 10, 19, 9, 25)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubServer(events=list(events)).start()
+    monkeypatch.setattr(client, "host", server.host)
+    monkeypatch.setattr(event_source, "credential_store", lambda: SimpleNamespace(get=lambda: {"token": "stub-token"}))
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def datastore(tmp_path):
+    source = DatastoreEventSource(build_datastore(str(tmp_path / "datastore.db"), events))
+    yield source
+    source.close()
+
+
+def ordered(events):
+    return sorted(events, key=lambda event: (event["start"], event["event_id"]))
+
+
+def test_datastore_reads_the_same_events_as_http(stub, datastore):
+    from_http = HttpEventSource().events_between(range_start, range_end)
+    from_datastore = datastore.events_between(range_start, range_end)
+
+    assert [event["event_id"] for event in ordered(from_http)] == [2, 3, 4]
+    # The fixture's AFK bucket covers the whole range; only window events may come back
+    assert ordered(from_datastore) == ordered(from_http)
+
+
+def test_datastore_formats_the_end_of_a_tiny_event(stub, datastore):
+    # The server stores durations as REAL, and SQLite writes tiny ones in exponent form
+    db = sqlite3.connect(datastore.path)
+    db.execute("INSERT INTO eventmodel (id, bucket_id, timestamp, duration, datastr) VALUES (?, 1, ?, ?, ?)",
+               (7, "2026-10-19 09:15:00.000000+00:00", 1.0e-05, '{"app": "Clock", "title": "Clock 7"}'))
+    db.commit()
+    db.close()
+    stub.events.append(window_event(7, "09:15:00", "09:15:00", app="Clock"))
+
+    from_http = HttpEventSource().events_between(range_start, range_end)
+    from_datastore = datastore.events_between(range_start, range_end)
+
+    assert {"event_id": 7, "application_name": "Clock", "title": "Clock 7",
+            "start": "2026-10-19T09:15:00Z", "end": "2026-10-19T09:15:00Z"} in from_datastore
+    assert ordered(from_datastore) == ordered(from_http)
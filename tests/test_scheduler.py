@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from sd_qt.sd_desktop.scheduler import TaskScheduler
+
+# Long enough that the scheduler's own timer never fires during a test; ticks are driven by hand
+interval = 100
+
+
+@pytest.fixture
+def scheduler():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    scheduler = TaskScheduler()
+    yield scheduler
+    scheduler.shutdown()
+    app.processEvents()
+
+
+def due(scheduler, *names, missed=0):
+    """Make jobs due, `missed` intervals late, and run one tick."""
+    now = time.monotonic()
+    for name in names:
+        scheduler._jobs[name].next_run = now - (missed + 0.5) * interval if missed else now
+    scheduler._run_due_jobs()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    assert condition()
+
+
+def gated_job(runs):
+    """A job that records each run and blocks until its gate is set."""
+    gate = threading.Event()
+
+    def job():
+        runs.append(time.monotonic())
+        gate.wait(5)
+    return job, gate
+
+
+def test_higher_priority_runs_first(scheduler):
+    order = []
+    scheduler.add_job("low", lambda: order.append("low"), interval, priority=1)
+    scheduler.add_job("high", lambda: order.append("high"), interval, priority=5)
+    scheduler.add_job("middle", lambda: order.append("middle"), interval, priority=3)
+
+    due(scheduler, "low", "high", "middle")
+    assert order == ["high", "middle", "low"]
+
+
+def test_missed_runs_coalesce_into_one(scheduler):
+    runs = []
+    scheduler.add_job("tick", lambda: runs.append(1), interval)
+
+    due(scheduler, "tick", missed=3)
+    assert len(runs) == 1
+    assert scheduler.metrics()["tick"]["missed"] == 3
+
+
+def test_missed_runs_are_made_up_without_coalescing(scheduler):
+    runs = []
+    scheduler.add_job("tick", lambda: runs.append(1), interval, coalesce=False)
+
+    due(scheduler, "tick", missed=3)
+    assert len(runs) == 4
+
+
+def test_blocking_job_still_running_is_not_run_again(scheduler):
+    runs, results = [], []
+    job, gate = gated_job(runs)
+    scheduler.add_job("sync", job, interval, blocking=True, on_done=results.append)
+
+    due(scheduler, "sync")
+    wait_until(lambda: runs)
+    due(scheduler, "sync")
+    due(scheduler, "sync")
+    gate.set()
+    wait_until(lambda: results)
+    QCoreApplication.processEvents()
+
+    metrics = scheduler.metrics()["sync"]
+    assert (len(runs), metrics["runs"], metrics["missed"], metrics["overruns"]) == (1, 1, 2, 0)
+    assert not metrics["running"]
+
+
+def test_blocking_job_without_coalescing_runs_each_missed_tick_in_turn(scheduler):
+    runs, results = [], []
+    job, gate = gated_job(runs)
+    scheduler.add_job("sync", job, interval, blocking=True, coalesce=False, on_done=results.append)
+
+    due(scheduler, "sync")
+    wait_until(lambda: runs)
+    due(scheduler, "sync")
+    gate.set()
+    wait_until(lambda: len(results) == 2)
+
+    assert len(runs) == 2
+    assert scheduler.metrics()["sync"]["runs"] == 2
+
+
+def test_overrun_is_counted_once_per_run(scheduler):
+    runs, results = [], []
+    job, gate = gated_job(runs)
+    scheduler.add_job("sync", job, interval, blocking=True, on_done=results.append)
+    scheduler._jobs["sync"].interval = 0.05
+
+    due(scheduler, "sync")
+    wait_until(lambda: runs)
+    # Ticks that find the run still going don't count as overruns themselves
+    due(scheduler, "sync")
+    due(scheduler, "sync")
+    time.sleep(0.1)
+    gate.set()
+    wait_until(lambda: results)
+
+    metrics = scheduler.metrics()["sync"]
+    assert metrics["overruns"] == 1
+    assert metrics["runs"] == 1
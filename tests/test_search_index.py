@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from sd_qt.sd_desktop.search_index import SearchIndex, narrows, token_pattern
+
+documents = {
+    1: "Editor - search_index.py",
+    2: "Mail: Inbox (3 unread)",
+    3: "Browser - Trigram search explained",
+    4: "Terminal - pytest -q tests",
+    5: "Editor - test_search_index.py",
+    6: "Browser - Inbox zero",
+    7: "Ed",
+}
+
+
+def scan(texts, query):
+    """The documents a plain substring scan over each document's tokens matches."""
+    words = set(token_pattern.findall(query.lower()))
+    matches = set()
+    for doc, text in texts.items():
+        tokens = token_pattern.findall(text.lower())
+        if all(any(word in token if len(word) >= 3 else token.startswith(word) for token in tokens)
+               for word in words):
+            matches.add(doc)
+    return matches
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    for doc, text in documents.items():
+        index.add(doc, text)
+    return index
+
+
+@pytest.mark.parametrize("query", [
+    "e", "ed", "edi", "editor", "dit", "search", "arch", "inbox", "box", "in", "py", "test",
+    "search index", "browser inbox", "ed py", "ta", "missing", "x", "Inbox 3",
+])
+def test_matches_a_substring_scan(index, query):
+    assert index.search(query) == scan(documents, query)
+
+
+def test_ordered_results(index):
+    matches, ordered = index.search_ordered("search")
+    assert ordered == sorted(matches) == [1, 3, 5]
+
+    matches, ordered = index.search_ordered("ed")
+    assert ordered == sorted(matches) == [1, 5, 7]
+
+
+def test_within_a_narrowed_query(index):
+    previous = index.search("inb")
+    assert narrows("inbox", "inb")
+    assert index.search("inbox", within=previous) == scan(documents, "inbox")
+    # A short word matches token starts only, which "inbox" anywhere in a token doesn't imply
+    assert not narrows("inbox", "in")
+
+
+def test_added_text_and_new_documents_are_found(index):
+    assert index.search("search") == {1, 3, 5}
+    index.add(2, "Search folder")
+    index.add(8, "Researching")
+    assert index.search("search") == {1, 2, 3, 5, 8}
+    assert index.search_ordered("search")[1] == [1, 2, 3, 5, 8]
+
+
+def test_random_documents_match_a_substring_scan():
+    rng = random.Random(45)
+    alphabet = "abcde"
+    texts = {doc: " ".join("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))
+                           for _ in range(rng.randint(1, 4)))
+             for doc in range(300)}
+    index = SearchIndex()
+    for doc, text in texts.items():
+        index.add(doc, text)
+
+    for _ in range(300):
+        query = " ".join("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                         for _ in range(rng.randint(1, 2)))
+        matches, ordered = index.search_ordered(query)
+        assert matches == scan(texts, query), query
+        assert ordered is None or ordered == sorted(matches)
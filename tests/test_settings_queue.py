@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from sd_qt.sd_desktop import client, settings_queue, util
+from sd_qt.sd_desktop.settings_queue import SettingsWriteQueue
+from sd_qt.sd_desktop.stub_server import StubServer
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubServer().start()
+    monkeypatch.setattr(client, "host", server.host)
+    monkeypatch.setattr(util, "credentials", lambda: {"token": "stub-token"})
+    client.response_cache.invalidate()
+    yield server
+    server.stop()
+    client.response_cache.invalidate()
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    # A long backoff keeps the replay thread idle, so tests deliver with flush() when they choose
+    writer = SettingsWriteQueue(path=str(tmp_path / "queue.sqlite"), token_provider=lambda: "stub-token",
+                                min_backoff=30, max_backoff=30)
+    monkeypatch.setattr(settings_queue, "_writer", writer)
+    yield writer
+    writer.stop()
+
+
+def test_change_made_while_down_is_delivered_when_server_returns(stub, tmp_path, monkeypatch):
+    writer = SettingsWriteQueue(path=str(tmp_path / "queue.sqlite"), token_provider=lambda: "stub-token",
+                                min_backoff=0.1, max_backoff=0.2)
+    monkeypatch.setattr(settings_queue, "_writer", writer)
+    try:
+        stub.stop()
+        assert util.add_settings("launch", True) is None
+        assert writer.depth() == 1
+
+        stub.start()
+        deadline = time.monotonic() + 5
+        while writer.depth() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert writer.depth() == 0
+        assert stub.settings["launch"] is True
+    finally:
+        writer.stop()
+
+
+def test_newer_change_is_not_overwritten_by_the_queued_one(stub, queue):
+    stub.stop()
+    util.add_settings("launch", True)
+    stub.start()
+
+    # The server is back, but the older value is still queued, so this one has to queue behind it
+    assert util.add_settings("launch", False) is None
+    assert [entry["body"]["value"] for entry in queue.pending()] == [False]
+
+    assert queue.flush()
+    assert stub.settings["launch"] is False
+
+
+def test_server_error_is_queued(stub, queue):
+    stub.fail_status = 503
+    assert util.add_settings("idle_time", True) is None
+    assert queue.depth() == 1
+
+    stub.fail_status = None
+    assert queue.flush()
+    assert stub.settings["idle_time"] is True
+
+
+def test_timeout_is_queued(stub, queue, monkeypatch):
+    monkeypatch.setattr(client, "default_timeout", 0.2)
+    stub.delay = 1
+    assert util.add_settings("idle_time", True) is None
+    assert queue.depth() == 1
+
+    stub.delay = 0
+    assert queue.flush()
+    assert stub.settings["idle_time"] is True
+
+
+def test_client_error_is_not_queued(stub, queue):
+    stub.fail_status = 400
+    assert util.add_settings("launch", True) is not None
+    assert queue.depth() == 0
+
+
+def test_patch_while_down_queues_the_merged_schedule(stub, queue):
+    util.retrieve_settings()
+    stub.stop()
+
+    settings = util.patch_settings("weekdays_schedule", {"Monday": False})
+    assert settings["weekdays_schedule"]["Monday"] is False
+    assert settings["weekdays_schedule"]["Tuesday"] is True
+
+    stub.start()
+    assert queue.flush()
+    assert stub.settings["weekdays_schedule"]["Monday"] is False
+    assert stub.settings["weekdays_schedule"]["Tuesday"] is True
+
+
+def test_concurrent_flushes_send_each_entry_once(stub, queue):
+    stub.stop()
+    util.add_settings("launch", True)
+    stub.start()
+    stub.delay = 0.2
+    stub.requests.clear()
+
+    flushes = [threading.Thread(target=queue.flush) for _ in range(3)]
+    for flush in flushes:
+        flush.start()
+    for flush in flushes:
+        flush.join()
+    # The replay thread may probe the server's status meanwhile; only the writes count
+    assert [request for request in stub.requests if request[0] == "POST"] == [("POST", "/api/0/settings")]
+    assert queue.depth() == 0
+
+
+def test_sign_out_drops_queued_changes(stub, queue):
+    stub.stop()
+    util.add_settings("launch", True)
+    assert queue.depth() == 1
+
+    util.clear_account_data()
+    assert queue.depth() == 0
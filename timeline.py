@@ -0,0 +1,389 @@
+import bisect
+import math
+from array import array
+from datetime import datetime, timezone
+
+from PySide6.QtCore import Qt, QTimer, QLineF, QRectF
+from PySide6.QtGui import QPainter, QColor, QImage, QPalette, QPen
+from PySide6.QtWidgets import QWidget, QToolTip
+
+max_level = 16  # Level k merges spans of one app whose gap is under 2**k seconds
+
+
+def epoch(timestamp):
+    """Seconds since the epoch for a "%Y-%m-%dT%H:%M:%SZ" UTC timestamp."""
+    return datetime.fromisoformat(timestamp[:-1]).replace(tzinfo=timezone.utc).timestamp()
+
+
+class _Lane:
+    """One application's events and its level-of-detail spans.
+
+    `levels[k]` holds the app's events merged wherever the gap between them
+    is under 2**k seconds, so at any zoom the lane draws at most about one
+    span per pixel. Each level is derived from the one below it.
+    """
+
+    def __init__(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.levels = [(array('d'), array('d')) for _ in range(max_level + 1)]
+
+    def rebuild_from(self, t):
+        """Recompute every level's spans that end after time `t`."""
+        source_starts, source_ends = self.starts, self.ends
+        for k, (starts, ends) in enumerate(self.levels):
+            # Drop everything from the last span ending by `t` on (new source spans may extend it)
+            # and merge again from there
+            cut = max(0, bisect.bisect_right(ends, t) - 1)
+            t = min(t, starts[cut]) if cut < len(starts) else t
+            del starts[cut:]
+            del ends[cut:]
+            gap = 2 ** k
+            i = bisect.bisect_left(source_starts, t)
+            for i in range(i, len(source_starts)):
+                start, end = source_starts[i], source_ends[i]
+                if ends and start - ends[-1] < gap:
+                    if end > ends[-1]:
+                        ends[-1] = end
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            source_starts, source_ends = starts, ends
+
+
+class TimelineData:
+    """The day's events, grouped into one lane per application.
+
+    Events are kept in start order with a running maximum of their ends,
+    which makes the pair an interval index: the events overlapping a time
+    window are found with two bisections. `update` only touches the lanes
+    and level spans after the earliest changed event.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ids = []
+        self.apps = []
+        self.starts = array('d')
+        self.ends = array('d')
+        self.max_ends = array('d')
+        self.lanes = []
+        self.app_names = []
+        self._app_lanes = {}
+        self._rows = {}  # event id -> index
+        self._seen = {}  # event id -> (start, end, app) as received
+
+    def __len__(self):
+        return len(self.ids)
+
+    def update(self, events):
+        """Add new formatted events and apply changes to known ones (matched by id)."""
+        dirty = {}  # lane -> earliest changed time
+        first_row = len(self.ids)
+        resort = False
+        for event in events:
+            key = (event['start'], event['end'], event['app'])
+            if self._seen.get(event['id']) == key:
+                continue
+            self._seen[event['id']] = key
+            start, end, app = epoch(event['start']), epoch(event['end']), self._lane_index(event['app'])
+            row = self._rows.get(event['id'])
+            if row is None:
+                row = len(self.ids)
+                self._rows[event['id']] = row
+                self.ids.append(event['id'])
+                self.apps.append(app)
+                self.starts.append(start)
+                self.ends.append(end)
+                resort = resort or (row and start < self.starts[row - 1])
+            else:
+                previous_app, previous_start = self.apps[row], self.starts[row]
+                dirty[previous_app] = min(dirty.get(previous_app, previous_start), previous_start)
+                self.apps[row], self.starts[row], self.ends[row] = app, start, end
+                resort = resort or (row and start < self.starts[row - 1]) or \
+                    (row + 1 < len(self.ids) and start > self.starts[row + 1])
+            dirty[app] = min(dirty.get(app, start), start)
+            first_row = min(first_row, row)
+
+        if resort:
+            self._rebuild()
+        elif dirty:
+            self._refresh_max_ends(first_row)
+            self._refresh_lanes(dirty)
+
+    def lane_spans(self, app, level, t0, t1):
+        """Start/end pairs of `app`'s spans at `level` (None = unmerged events) overlapping [t0, t1)."""
+        lane = self.lanes[app]
+        starts, ends = (lane.starts, lane.ends) if level is None else lane.levels[level]
+        if level is None:
+            # Raw events of one app may overlap, so their ends aren't sorted
+            first = max(0, bisect.bisect_left(starts, t0) - 1)
+            while first > 0 and ends[first - 1] > t0:
+                first -= 1
+        else:
+            first = bisect.bisect_right(ends, t0)
+        last = bisect.bisect_left(starts, t1, lo=first)
+        return starts[first:last], ends[first:last]
+
+    def events_between(self, t0, t1):
+        """Indices of events overlapping [t0, t1), in start order."""
+        first = bisect.bisect_right(self.max_ends, t0)
+        last = bisect.bisect_left(self.starts, t1, lo=first)
+        return [row for row in range(first, last) if self.ends[row] > t0]
+
+    def _lane_index(self, app):
+        index = self._app_lanes.get(app)
+        if index is None:
+            index = self._app_lanes[app] = len(self.app_names)
+            self.app_names.append(app)
+            self.lanes.append(_Lane())
+        return index
+
+    def _refresh_max_ends(self, first):
+        del self.max_ends[first:]
+        running = self.max_ends[-1] if self.max_ends else float("-inf")
+        for row in range(first, len(self.ends)):
+            running = max(running, self.ends[row])
+            self.max_ends.append(running)
+
+    def _refresh_lanes(self, dirty):
+        """Re-collect each dirty lane's events from its earliest changed time with one pass over the rows."""
+        cuts = {}
+        for app, t in dirty.items():
+            lane = self.lanes[app]
+            cut = bisect.bisect_left(lane.starts, t)
+            cuts[app] = t
+            del lane.starts[cut:]
+            del lane.ends[cut:]
+        for row in range(bisect.bisect_left(self.starts, min(cuts.values())), len(self.ids)):
+            app = self.apps[row]
+            if app in cuts and self.starts[row] >= cuts[app]:
+                self.lanes[app].starts.append(self.starts[row])
+                self.lanes[app].ends.append(self.ends[row])
+        for app, t in cuts.items():
+            self.lanes[app].rebuild_from(t)
+
+    def _rebuild(self):
+        order = sorted(range(len(self.ids)), key=self.starts.__getitem__)
+        self.ids = [self.ids[row] for row in order]
+        self.apps = [self.apps[row] for row in order]
+        self.starts = array('d', (self.starts[row] for row in order))
+        self.ends = array('d', (self.ends[row] for row in order))
+        self._rows = {event_id: row for row, event_id in enumerate(self.ids)}
+        self.max_ends = array('d')
+        self._refresh_max_ends(0)
+        self.lanes = [_Lane() for _ in self.app_names]
+        if self.lanes:
+            self._refresh_lanes({app: float("-inf") for app in range(len(self.lanes))})
+
+
+class TimelineWidget(QWidget):
+    """The day's events as coloured spans on a time axis, one lane per application.
+
+    Everything is drawn in one paintEvent. The level of detail is picked
+    from the current zoom so a lane never draws much more than one span per
+    pixel column. The mouse wheel zooms around the cursor, dragging pans,
+    and a double click fits the whole day again. Hovering shows the events
+    under the cursor.
+    """
+    axis_height = 22
+    label_width = 110
+    min_seconds_per_pixel = 0.05
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data = TimelineData()
+        self.setMouseTracking(True)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.day_start = 0.0
+        self.day_end = 86400.0
+        # Shown view (t0, seconds per pixel) eases towards the target one
+        self.t0 = self.target_t0 = 0.0
+        self.spp = self.target_spp = 1.0
+        self._drag_x = None
+        self._colors = {}
+        self._pending = {}  # id -> latest formatted event received while hidden
+        self._animation = QTimer(self)
+        self._animation.setInterval(16)
+        self._animation.timeout.connect(self._step_animation)
+
+    def set_range(self, start, end):
+        """Show the events of [start, end), epoch seconds; clears the events if the range changed."""
+        if (start, end) != (self.day_start, self.day_end):
+            self.day_start, self.day_end = start, end
+            self.data.clear()
+            self._pending.clear()
+            self.fit()
+
+    def update_events(self, events):
+        """Add or update formatted events. While hidden they're only queued, so the list view pays nothing."""
+        if self.isVisible():
+            self.data.update(events)
+            self.update()
+        else:
+            # Refreshes repeat the whole day, so only each event's latest version is kept
+            self._pending.update((event['id'], event) for event in events)
+
+    def showEvent(self, event):
+        if self._pending:
+            self.data.update(self._pending.values())
+            self._pending.clear()
+        super().showEvent(event)
+
+    def fit(self):
+        self._animation.stop()
+        self.t0 = self.target_t0 = self.day_start
+        self.spp = self.target_spp = self._max_spp()
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        palette = self.palette()
+        dark = palette.color(QPalette.Window).lightness() < 128
+        painter.fillRect(self.rect(), palette.color(QPalette.Base))
+        plot_width = self.width() - self.label_width
+        t0, spp = self.t0, self.spp
+        t1 = t0 + plot_width * spp
+
+        self._paint_axis(painter, palette, t0, t1, spp)
+
+        lanes = len(self.data.lanes)
+        if not lanes:
+            painter.end()
+            return
+        lane_height = self._lane_height()
+        lanes = min(lanes, math.ceil((self.height() - self.axis_height) / lane_height))
+        level = self._level(spp)
+        width = max(1, int(plot_width))
+
+        # Rasterize every lane into one row of an indexed image (a pixel holds its lane's
+        # colour index), then draw it stretched to the lane heights with a single drawImage
+        pixels = bytearray(width * lanes)
+        for app in range(lanes):
+            row = app * width
+            fill = bytes((app % 255 + 1,)) * width
+            starts, ends = self.data.lane_spans(app, level, t0, t1)
+            for start, end in zip(starts, ends):
+                x1 = min(width, math.ceil((end - t0) / spp))
+                if x1 > 0:
+                    x0 = max(0, int((start - t0) / spp))
+                    x1 = max(x1, x0 + 1)
+                    pixels[row + x0:row + x1] = fill[:x1 - x0]
+        image = QImage(bytes(pixels), width, lanes, width, QImage.Format_Indexed8)
+        image.setColorTable([0] + [self._color(app, dark).rgba() for app in range(min(lanes, 255))])
+        painter.drawImage(QRectF(self.label_width, self.axis_height, width, lanes * lane_height), image)
+
+        # Separate the lanes and label them when there's room
+        if lane_height >= 6:
+            painter.setPen(QPen(palette.color(QPalette.Base), 1))
+            painter.drawLines([QLineF(self.label_width, self.axis_height + app * lane_height,
+                                      self.width(), self.axis_height + app * lane_height) for app in range(1, lanes)])
+        if lane_height >= 12:
+            painter.setPen(palette.color(QPalette.Text))
+            metrics = painter.fontMetrics()
+            for app in range(lanes):
+                painter.drawText(QRectF(4, self.axis_height + app * lane_height, self.label_width - 8, lane_height),
+                                 Qt.AlignVCenter | Qt.AlignLeft,
+                                 metrics.elidedText(self.data.app_names[app], Qt.ElideRight, self.label_width - 8))
+        painter.end()
+
+    def _paint_axis(self, painter, palette, t0, t1, spp):
+        painter.setPen(QPen(palette.color(QPalette.Mid), 1))
+        # Pick a tick spacing that leaves at least ~70 px between labels
+        step = next((s for s in (60, 300, 900, 1800, 3600, 7200, 14400, 21600) if s / spp >= 70), 43200)
+        offset = datetime.fromtimestamp(t0).astimezone().utcoffset().total_seconds()
+        tick = ((t0 + offset) // step + 1) * step - offset
+        while tick < t1:
+            x = self.label_width + (tick - t0) / spp
+            painter.drawLine(int(x), self.axis_height - 4, int(x), self.height())
+            painter.drawText(int(x) + 3, self.axis_height - 7, datetime.fromtimestamp(tick).strftime("%H:%M"))
+            tick += step
+
+    def mouseMoveEvent(self, event):
+        x = event.position().x()
+        if self._drag_x is not None:
+            self._pan_to(self.t0 - (x - self._drag_x) * self.spp)
+            self._drag_x = x
+            return
+        if x < self.label_width:
+            QToolTip.hideText()
+            return
+        t = self.t0 + (x - self.label_width) * self.spp
+        rows = self.data.events_between(t - self.spp, t + self.spp)
+        lane = int((event.position().y() - self.axis_height) // self._lane_height())
+        if 0 <= lane < len(self.data.lanes):
+            rows = [row for row in rows if self.data.apps[row] == lane]
+        if not rows:
+            QToolTip.hideText()
+            return
+        lines = [f"{self.data.app_names[self.data.apps[row]]}  "
+                 f"{datetime.fromtimestamp(self.data.starts[row]):%H:%M:%S} - "
+                 f"{datetime.fromtimestamp(self.data.ends[row]):%H:%M:%S}" for row in rows[:8]]
+        if len(rows) > 8:
+            lines.append(f"and {len(rows) - 8} more")
+        QToolTip.showText(event.globalPosition().toPoint(), "\n".join(lines), self)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_x = event.position().x()
+            self._animation.stop()
+            self.target_spp = self.spp
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.fit()
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if not steps:
+            return
+        anchor_x = max(0.0, event.position().x() - self.label_width)
+        anchor_t = self.target_t0 + anchor_x * self.target_spp
+        self.target_spp = min(self._max_spp(), max(self.min_seconds_per_pixel, self.target_spp * 0.8 ** steps))
+        self.target_t0 = self._clamp_t0(anchor_t - anchor_x * self.target_spp, self.target_spp)
+        self._animation.start()
+
+    def _step_animation(self):
+        # Ease 35% of the way to the target each frame; zoom eases in log space
+        self.spp *= (self.target_spp / self.spp) ** 0.35
+        self.t0 += (self.target_t0 - self.t0) * 0.35
+        if abs(self.spp / self.target_spp - 1) < 0.005 and abs(self.t0 - self.target_t0) < self.spp:
+            self.spp, self.t0 = self.target_spp, self.target_t0
+            self._animation.stop()
+        self.update()
+
+    def _pan_to(self, t0):
+        self.t0 = self.target_t0 = self._clamp_t0(t0, self.spp)
+        self.update()
+
+    def _clamp_t0(self, t0, spp):
+        visible = (self.width() - self.label_width) * spp
+        return min(max(t0, self.day_start), max(self.day_start, self.day_end - visible))
+
+    def _max_spp(self):
+        return (self.day_end - self.day_start) / max(1, self.width() - self.label_width)
+
+    def _lane_height(self):
+        return max(3.0, (self.height() - self.axis_height) / max(1, len(self.data.lanes)))
+
+    def _level(self, spp):
+        if spp < 1:
+            return None
+        return min(max_level, int(spp).bit_length() - 1)
+
+    def _color(self, app, dark):
+        color = self._colors.get((app, dark))
+        if color is None:
+            hue = (app * 137.5) % 360 / 360
+            color = self._colors[(app, dark)] = QColor.fromHsvF(hue, 0.55, 0.6) if dark else \
+                QColor.fromHsvF(hue, 0.35, 0.92)
+        return color
+
+    def resizeEvent(self, event):
+        self.target_spp = self.spp = min(self.spp, self._max_spp())
+        self.t0 = self.target_t0 = self._clamp_t0(self.t0, self.spp)
+        super().resizeEvent(event)
@@ -1,44 +1,102 @@
 import sys
-from PySide6.QtWidgets import QApplication, QVBoxLayout, QWidget, QLabel, QPushButton
-from PySide6.QtCore import Qt, QEasingCurve, QPoint, QPropertyAnimation, Signal
-from PySide6.QtGui import QPainter, QColor
+import time
+from PySide6.QtWidgets import QApplication, QVBoxLayout, QWidget, QLabel
+from PySide6.QtCore import Qt, QEasingCurve, QObject, QRectF, QTimer, Property, Signal
+from PySide6.QtGui import QPainter, QColor, QBrush, QPen
+
+_brushes = {}
+
+
+def _brush(color):
+    """Shared brush per colour, so switches don't allocate one per paint."""
+    brush = _brushes.get(color)
+    if brush is None:
+        brush = _brushes[color] = QBrush(QColor(color))
+    return brush
+
+
+class _SwitchAnimator(QObject):
+    """Drives the knob animation of every moving switch from one timer."""
+
+    def __init__(self, interval_ms=16):
+        super().__init__()
+        self._moving = {}  # switch -> (start progress, end progress, start time, duration, curve)
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def animate(self, switch, end, duration, curve):
+        self._moving[switch] = (switch.progress, end, time.perf_counter(), duration / 1000, curve)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _tick(self):
+        now = time.perf_counter()
+        for switch, (start, end, started, duration, curve) in list(self._moving.items()):
+            t = min(1.0, (now - started) / duration) if duration else 1.0
+            try:
+                switch.progress = start + (end - start) * curve.valueForProgress(t)
+            except RuntimeError:
+                # The switch was deleted mid-animation
+                t = 1.0
+            if t >= 1.0:
+                del self._moving[switch]
+        if not self._moving:
+            self._timer.stop()
+
+
+_animator = None
+
+
+def switch_animator():
+    global _animator
+    if _animator is None:
+        _animator = _SwitchAnimator()
+    return _animator
 
 
 class SwitchControl(QWidget):
+    """On/off switch painted in a single paintEvent.
+
+    The knob position is the animatable `progress` property (0 = off, 1 = on),
+    moved by the shared animator. Space, Enter, Left and Right work when the
+    switch has keyboard focus.
+    """
     # Define a custom signal to emit state changes
     stateChanged = Signal(bool)  # Emits True if ON, False if OFF
 
+    knob_size = 20
+    knob_margin = 4
+
     def __init__(self, parent=None, bg_color="#888888", circle_color="#FFFFFF", active_color="#FFA500",
                  animation_curve=QEasingCurve.OutBounce, animation_duration=300, checked=False):
         super().__init__(parent)
 
         # Set the size of the switch
         self.setFixedSize(44, 24)
+        self.setFocusPolicy(Qt.StrongFocus)
 
         # Store colors and state
         self.bg_color = bg_color
         self.circle_color = circle_color
         self.active_color = active_color
         self._is_checked = checked  # Internal variable to track the state
+        self._progress = 1.0 if checked else 0.0
+        self.animation_curve = QEasingCurve(animation_curve)
+        self.animation_duration = animation_duration
+        self._focus_pen = QPen(QColor(active_color), 1.5)
 
         # Set the cursor to a pointing hand for the switch
         self.setCursor(Qt.PointingHandCursor)
 
-        # Create the circle button inside the switch
-        self.circle = QPushButton(self)
-        self.circle.setFixedSize(20, 20)
-        self.circle.setStyleSheet(f"background-color: {circle_color}; border: none; border-radius: 10px;")
+    def get_progress(self):
+        return self._progress
 
-        # Create animation for the circle movement
-        self.animation = QPropertyAnimation(self.circle, b"pos")
-        self.animation.setEasingCurve(animation_curve)
-        self.animation.setDuration(animation_duration)
+    def set_progress(self, value):
+        self._progress = value
+        self.update()
 
-        # Set the initial position of the circle
-        self.update_circle_position(animate=False)
-
-        # Connect the circle's click event to toggle the switch
-        self.circle.clicked.connect(self.toggle)
+    progress = Property(float, get_progress, set_progress)
 
     def isChecked(self):
         """Return the current checked state."""
@@ -54,38 +112,61 @@ class SwitchControl(QWidget):
 
     def set_circle_color(self, color):
         """Dynamically change the circle's color."""
-        self.circle_color = color  # Store the new color
-        self.circle.setStyleSheet(f"background-color: {color}; border: none; border-radius: 10px;")
+        if color != self.circle_color:
+            self.circle_color = color
+            self.update()
 
     def toggle(self):
         """Toggle the switch state."""
         self.setChecked(not self._is_checked)
 
     def update_circle_position(self, animate=True):
-        """Update the position of the circle based on the switch state."""
-        target_x = self.width() - 24 if self._is_checked else 4
-        if animate:
-            self.animation.setEndValue(QPoint(target_x, 2))  # Centered vertically
-            self.animation.start()
+        """Move the knob to match the switch state."""
+        target = 1.0 if self._is_checked else 0.0
+        if animate and self.isVisible():
+            switch_animator().animate(self, target, self.animation_duration, self.animation_curve)
         else:
-            self.circle.move(target_x, 2)
+            self.progress = target
 
     def paintEvent(self, event):
-        """Custom paint event to draw the background."""
+        """Draw the track and the knob."""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         painter.setPen(Qt.NoPen)
 
-        # Draw the background based on the checked state
-        bg_color = self.active_color if self._is_checked else self.bg_color
-        painter.setBrush(QColor(bg_color))
-        painter.drawRoundedRect(0, 0, self.width(), self.height(), self.height() / 2, self.height() / 2)
+        radius = self.height() / 2
+        painter.setBrush(_brush(self.active_color if self._is_checked else self.bg_color))
+        painter.drawRoundedRect(self.rect(), radius, radius)
+
+        travel = self.width() - self.knob_size - 2 * self.knob_margin
+        knob = QRectF(self.knob_margin + travel * self._progress, (self.height() - self.knob_size) / 2,
+                      self.knob_size, self.knob_size)
+        painter.setBrush(_brush(self.circle_color))
+        painter.drawEllipse(knob)
+
+        if self.hasFocus():
+            painter.setPen(self._focus_pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(QRectF(self.rect()).adjusted(0.75, 0.75, -0.75, -0.75), radius, radius)
 
     def mousePressEvent(self, event):
-        """Handle clicks on the background and toggle the switch."""
-        if not self.circle.underMouse():  # If the circle itself is not clicked
+        """Toggle the switch on click."""
+        if event.button() == Qt.LeftButton:
             self.toggle()
-        super().mousePressEvent(event)
+            event.accept()
+        else:
+            super().mousePressEvent(event)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter, Qt.Key_Select):
+            self.toggle()
+        elif key == Qt.Key_Left:
+            self.setChecked(False)
+        elif key == Qt.Key_Right:
+            self.setChecked(True)
+        else:
+            super().keyPressEvent(event)
 
 
 class ExampleWindow(QWidget):
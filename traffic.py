@@ -0,0 +1,269 @@
+"""Record-and-replay of the client's API traffic.
+
+Capture (set $SD_CAPTURE to a file path, or call `start_capture`) records the
+request/response pairs for the events, settings and login endpoints as
+gzipped JSON lines. Tokens, passwords and the user's personal details (names,
+contact and company fields, profile objects) are redacted, and times are
+stored as offsets from the start of the capture. The replay server serves a
+capture on a local port, so the GUI or the benchmark suite can run a real
+day's workload without the backend:
+
+    python -m sd_qt.sd_desktop.traffic capture.jsonl.gz --port 7600 --speed 60
+"""
+import argparse
+import gzip
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from sd_qt.sd_desktop import client
+
+logger = logging.getLogger(__name__)
+
+captured_paths = ("/0/dashboard/events", "/0/getallsettings", "/0/settings", "/0/idletime", "/0/launchOnStart",
+                  "/0/ralvie/login")
+
+# Compared in lower case. A user or profile object is replaced as a whole, whatever fields it has
+redacted_keys = {"token", "access_token", "refresh_token", "authorization", "password", "username", "email",
+                 "phone", "mobile", "firstname", "lastname", "fullname", "displayname", "name", "companyname",
+                 "address", "user", "profile", "userdetails", "user_details"}
+
+redacted = "<redacted>"
+
+# Response headers worth keeping for conditional requests
+kept_headers = ("Content-Type", "ETag", "Last-Modified")
+
+
+def redact(value):
+    """Return a copy of a JSON value with credential and identity fields replaced."""
+    if isinstance(value, dict):
+        return {key: redacted if key.lower() in redacted_keys and value[key] else redact(value[key])
+                for key in value}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _json_or_text(content):
+    if not content:
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        return content.decode("utf-8", "replace") if isinstance(content, bytes) else content
+
+
+class TrafficRecorder:
+    """Appends redacted request/response records to a gzipped JSON-lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({"format": "sd-capture", "version": 1})
+
+    def wants(self, path):
+        return path.split("?", 1)[0] in captured_paths
+
+    def record(self, method, path, kwargs, response, elapsed_ms):
+        body = kwargs.get("json")
+        if body is None and kwargs.get("data") is not None:
+            body = _json_or_text(kwargs["data"])
+        self._write({
+            "t": round(time.monotonic() - self._started, 3),
+            "ms": round(elapsed_ms, 2),
+            "method": method.upper(),
+            "path": path.split("?", 1)[0],
+            "params": redact(kwargs.get("params")),
+            "body": redact(body),
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in kept_headers if name in response.headers},
+            "response": redact(_json_or_text(response.content)),
+        })
+        self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _write(self, record):
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            if self._file:
+                self._file.write(line + "\n")
+
+
+def start_capture(path):
+    """Record matching traffic sent through `client.request` to `path`."""
+    stop_capture()
+    client.recorder = TrafficRecorder(path)
+    logger.info("Capturing API traffic to %s", path)
+    return client.recorder
+
+
+def stop_capture():
+    recorder, client.recorder = client.recorder, None
+    if recorder:
+        recorder.close()
+        logger.info("Captured %d requests to %s", recorder.count, recorder.path)
+
+
+def load_capture(path):
+    """Return the records of a capture file, without its header."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records or records[0].get("format") != "sd-capture":
+        raise ValueError(f"{path} is not a traffic capture")
+    return records[1:]
+
+
+class ReplayServer:
+    """Serves a capture on http://127.0.0.1:<port>/api in place of the sd-server.
+
+    With `speed` > 0 the capture's clock runs `speed` times faster than real
+    time: each endpoint answers with the latest response recorded up to the
+    current replay time, after the original latency divided by `speed`. With
+    `speed` 0 each endpoint's responses are served in recorded order as fast
+    as possible, which makes runs deterministic. Requests the capture never
+    saw are answered with 404.
+    """
+
+    def __init__(self, capture, speed=1.0, port=0):
+        records = load_capture(capture) if isinstance(capture, str) else list(capture)
+        self.speed = speed
+        self.responses = {}
+        for record in records:
+            self.responses.setdefault((record["method"], record["path"]), []).append(record)
+        self._port = port
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.rewind()
+
+    @property
+    def host(self):
+        """Base URL to assign to `client.host`."""
+        return f"http://127.0.0.1:{self._port}/api"
+
+    def count(self, method, path):
+        return len(self.responses.get((method, path), ()))
+
+    def rewind(self):
+        """Restart the replay from the beginning of the capture."""
+        with self._lock:
+            self._started = time.monotonic()
+            self._positions = {}
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", self._port), _make_handler(self))
+        self._port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def next_response(self, method, path, conditional):
+        """Pick the record to answer a request with, or None when the capture has none."""
+        records = self.responses.get((method, path))
+        if not records:
+            return None
+        with self._lock:
+            if self.speed:
+                now = (time.monotonic() - self._started) * self.speed
+                index = max(0, sum(1 for record in records if record["t"] <= now) - 1)
+            else:
+                index = min(self._positions.get((method, path), 0), len(records) - 1)
+                self._positions[(method, path)] = index + 1
+
+        if records[index]["status"] == 304 and not conditional:
+            # The client has nothing cached yet, so answer with the last full response instead
+            full = [record for record in records[:index + 1] if record["status"] == 200]
+            if full:
+                return full[-1]
+        return records[index]
+
+
+def _make_handler(replay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # See StubServer: keeps responses from stalling on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self._replay("GET")
+
+        def do_POST(self):
+            self._replay("POST")
+
+        def do_PATCH(self):
+            self._replay("PATCH")
+
+        def _replay(self, method):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+
+            url = urlparse(self.path)
+            path = url.path[len("/api"):] if url.path.startswith("/api/") else url.path
+            if path == "/0/server_status" and not replay.count(method, path):
+                return self._send(200, {"Content-Type": "application/json"}, {"status": "ok"})
+
+            conditional = bool(self.headers.get("If-None-Match") or self.headers.get("If-Modified-Since"))
+            record = replay.next_response(method, path, conditional)
+            if record is None:
+                return self._send(404, {"Content-Type": "application/json"}, {"message": "Not in capture"})
+            if replay.speed:
+                time.sleep(record["ms"] / 1000 / replay.speed)
+            self._send(record["status"], record["headers"], record["response"])
+
+        def _send(self, status, headers, body):
+            if body is None:
+                payload = b""
+            elif isinstance(body, str):
+                payload = body.encode()
+            else:
+                payload = json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a recorded API capture in place of the sd-server.")
+    parser.add_argument("capture", help="capture file written with $SD_CAPTURE")
+    parser.add_argument("--port", type=int, default=7600)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay clock speed-up; 0 serves responses in order without delays")
+    args = parser.parse_args(argv)
+
+    server = ReplayServer(args.capture, speed=args.speed, port=args.port).start()
+    total = sum(len(records) for records in server.responses.values())
+    print(f"Replaying {total} responses on {server.host}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,198 @@
 import json
-from datetime import datetime
+import logging
+import sqlite3
+import threading
+from datetime import date, datetime, time, timedelta
 import pytz
-import requests
 from cachetools import LRUCache
-from sd_core.cache import cache_user_credentials
 
-host = "http://localhost:7600/api"
+from sd_qt.sd_desktop import client
+from sd_qt.sd_desktop.aggregates import usage_aggregates
+from sd_qt.sd_desktop.client import response_cache
+from sd_qt.sd_desktop.coalesce import Coalescer
+from sd_qt.sd_desktop.credential_store import credential_store
+from sd_qt.sd_desktop.event_source import HttpEventSource, event_source, replace_event_source
+from sd_qt.sd_desktop.event_store import event_store
+from sd_qt.sd_desktop.settings_queue import settings_writer
 
-cache = LRUCache(maxsize=100)
 events_cache = LRUCache(maxsize=2000)
 
 events_cache_key = "event_cache"
-cache_key = "settings"
+today_rows = Coalescer()  # Today's events merged into display rows, owned by the refreshing thread
+cache_day = None  # Local date today_rows belong to
+_events_lock = threading.Lock()  # Held by a refresh, including its fetch
+_cache_lock = threading.Lock()  # Held only briefly, around events_cache
+_row_copies = {}  # Row id -> the copy of that row last published to the cache
+time_format = "%Y-%m-%dT%H:%M:%SZ"
+settings_path = "/0/getallsettings"
+
+logger = logging.getLogger(__name__)
 
 def credentials():
-    creds = cache_user_credentials("SD_KEYS")
+    creds = credential_store().get()
     return creds
 
 
+def fetch_events(start_time_utc, end_time_utc):
+    """Raw events between two naive UTC datetimes, or None when they can't be fetched."""
+    source = event_source()
+    try:
+        return source.events_between(start_time_utc, end_time_utc)
+    except sqlite3.Error:
+        logger.warning("Reading events from the %s source failed, switching to HTTP", source.name, exc_info=True)
+        replace_event_source(HttpEventSource())
+        return None
+
+
+def day_bounds_utc(day):
+    """The naive UTC datetimes at which local date `day` starts and ends."""
+    start = datetime.combine(day, time.min).astimezone().astimezone(pytz.utc).replace(tzinfo=None)
+    end = datetime.combine(day + timedelta(days=1), time.min).astimezone().astimezone(pytz.utc).replace(tzinfo=None)
+    return start, end
+
+
 def get_events():
-    print("Working")
-    # Check if there's an existing cached event to set start_time_utc
-    current_utc_date = datetime.utcnow().date()
-
-    # Check if there is an existing cached event to set start_time_utc
-    cached_events = events_cache.get(events_cache_key)
-    if cached_events and len(cached_events) > 0:
-        # Get the end time of the last event in the cache as start_time_utc
-        start_time_utc = datetime.strptime(
-            cached_events[-1]['end'], "%Y-%m-%dT%H:%M:%SZ"
-        )
-    else:
-        # If no cached event exists, set the start time to the beginning of the current UTC day
-        start_time_utc = datetime(current_utc_date.year, current_utc_date.month, current_utc_date.day)
-
-    # Set the current UTC time as end_time_utc
-    end_time_utc = datetime.utcnow()
-
-    print(start_time_utc, end_time_utc)
+    """Fetch today's new events and return today's display rows, or None if the fetch failed.
 
-    creds = credentials()
-    if not creds:
-        print("No credentials found")
-        return
+    Only events after the last cached one are requested. When the local
+    date has changed since the rows were built, the finished day is
+    archived first (see `_roll_over`).
+    """
+    with _events_lock:
+        today = date.today()
+        if cache_day is None:
+            # First refresh of this process: resume from what earlier sessions stored
+            _seed_from_store(today)
+        cached_events = cached_rows()
+        if cached_events and cache_day != today:
+            return _roll_over(cache_day, today)
+
+        if cached_events:
+            # Continue from the end of the last cached event
+            start_time_utc = datetime.strptime(cached_events[-1]['end'], time_format)
+        else:
+            # Nothing cached yet: start from the beginning of the local day
+            start_time_utc = day_bounds_utc(today)[0]
+
+        new_events = fetch_events(start_time_utc, datetime.utcnow())
+        if new_events is None:
+            return
+
+        if not cached_events:
+            _clear_today()
+        return _merge_today(new_events, today)
+
+
+def events_day():
+    """The local date the cached rows belong to, or None before the first fetch."""
+    return cache_day
+
+
+def cached_rows():
+    """Today's display rows as last published by a refresh, or None before the first one.
+
+    The result is a tuple of row copies that is never modified, so the GUI
+    thread can keep and read it while the next refresh merges new events.
+    """
+    with _cache_lock:
+        return events_cache.get(events_cache_key)
+
+
+def clear_account_data():
+    """Forget the signed-in account's data: today's rows, the event store, the totals, cached responses
+    and settings changes still waiting for the server.
 
-    sundial_token = creds['token']
-    response = requests.get(
-        f"{host}/0/dashboard/events?start={start_time_utc}&end={end_time_utc}",
-        headers={"Authorization": sundial_token}
-    )
+    Called on sign-out, so the next account's first refresh can't resume
+    from the previous account's events, nor replay its settings. Waits for a refresh in progress,
+    so nothing it fetched lands after the reset.
+    """
+    global cache_day
+    with _events_lock:
+        _clear_today()
+        with _cache_lock:
+            events_cache.clear()
+        cache_day = None
+        event_store().clear()
+        usage_aggregates().clear()
+    settings_writer().clear()
+    response_cache.invalidate()
 
-    if response.status_code != 200:
-        print(f"Error fetching events: {response.status_code}")
+
+def _publish(changed):
+    """Publish today's rows to the cache, copying the rows in `changed` and reusing the other copies."""
+    for row in changed:
+        _row_copies[row['id']] = dict(row, ids=tuple(row['ids']), titles=tuple(row['titles']))
+    rows = tuple(_row_copies[row['id']] for row in today_rows.rows)
+    with _cache_lock:
+        events_cache[events_cache_key] = rows
+    logger.debug("Events cache holds %d rows", len(rows))
+    return rows
+
+
+def _clear_today():
+    today_rows.clear()
+    _row_copies.clear()
+
+
+def _merge_today(new_events, today):
+    global cache_day
+    changed = []
+    if new_events:
+        # Events refetched at the boundary update the row they're already in instead of being appended again
+        changed = today_rows.add(listView(new_events))
+        event_store().put_events(new_events)
+        usage_aggregates().apply(new_events)
+    cache_day = today
+    return _publish(changed)
+
+
+def _seed_from_store(today):
+    """Rebuild today's rows from the event store, so the first fetch only asks for newer events.
+
+    The store's events for today were written by earlier refreshes, which
+    fetch contiguously from local midnight.
+    """
+    start, end = (bound.strftime(time_format) for bound in day_bounds_utc(today))
+    stored = event_store().events_between(start, end)
+    if not stored:
         return
+    global cache_day
+    _clear_today()
+    _publish(today_rows.add(listView(stored)))
+    usage_aggregates().apply(stored)
+    cache_day = today
+    logger.info("Resuming today's events from %d stored events", len(stored))
 
-    event_data = response.json()
-    new_events = []
-    if event_data and len(event_data) > 0:
-        new_events = event_data['events']
-        # Process the new events using listView
-        formatted_events = listView(new_events)
-    else:
-        formatted_events = []
-
-    # Append new events or handle cache logic as needed
-    if cached_events:
-        last_cached_event = cached_events[-1]
-        last_new_event = new_events[-1] if new_events else None
-
-        if last_new_event and last_cached_event['id'] == last_new_event['id']:
-            # Replace the last cached event if IDs match
-            cached_events[-1] = formatted_events[-1]
-        else:
-            # Append formatted new events to the cache
-            cached_events.extend(formatted_events)
-            events_cache[events_cache_key] = cached_events
-    else:
-        # Initialize cache if empty
-        events_cache[events_cache_key] = formatted_events
 
-    # Clear the cache if the current date has passed
-    if formatted_events and datetime.now().date() > datetime.strptime(formatted_events[-1]['end'], "%Y-%m-%dT%H:%M:%SZ").date():
-        events_cache.clear()
-        print("Cache cleared as the day has passed.")
+def _roll_over(finished, today):
+    """Archive the days since `finished` and start today's rows from the event store.
 
-    print(events_cache.get(events_cache_key))
+    The fetch continues from the last cached event, so it covers the rest
+    of the finished day and everything since. Every day up to yesterday is
+    then fully stored and marked complete for the history view. Today's
+    rows are rebuilt from the store's events overlapping today, which
+    includes any event that started before midnight and is still running,
+    so nothing is downloaded twice.
+    """
+    start_time_utc = datetime.strptime(today_rows.rows[-1]['end'], time_format)
+    new_events = fetch_events(start_time_utc, datetime.utcnow())
+    if new_events is None:
+        # Keep the old partition and try again on the next refresh
+        return
+    store = event_store()
+    store.put_events(new_events)
+    usage_aggregates().apply(new_events)
+    day = finished
+    while day < today:
+        store.mark_complete(day)
+        day += timedelta(days=1)
+    # The summary only reads today from the aggregates; past days' totals are computed by the history
+    usage_aggregates().forget_before(today)
+    logger.info("Rolled over from %s to %s, archived %d new events", finished, today, len(new_events))
 
-    return events_cache.get(events_cache_key)
+    start, end = (bound.strftime(time_format) for bound in day_bounds_utc(today))
+    _clear_today()
+    return _merge_today(store.events_between(start, end), today)
 
 def listView( events):
     list_view_events = []
@@ -102,7 +208,9 @@ def listView( events):
         formatted_event = {
             'time': f"{start_time_local} - {end_time_local}",
             'app': event['application_name'],  # Using 'application_name' as specified in your data
+            'title': event.get('title') or '',
             'id': event['event_id'],           # Using 'event_id' as the unique identifier
+            'start': event['start'],
             'end': event['end']                # Including 'end' for cache clearing checks
         }
         list_view_events.append(formatted_event)
@@ -113,26 +221,55 @@ def listView( events):
 def add_settings(key, value):
     headers = {'Content-Type': 'application/json',
                'Accept': 'application/json'}
-    data = json.dumps({"code": key, "value": value})
-    settings = requests.post(host + "/0/settings", data=data, headers=headers)
-    print(settings.json())
-    cache[cache_key] = settings.json()
+    body = {"code": key, "value": value}
+    settings = settings_writer().send(
+        f"settings:{key}", lambda: client.request("POST", "/0/settings", data=json.dumps(body), headers=headers),
+        "POST", "/0/settings", body=body)
+    if settings is None:
+        return None
+    logger.debug("Saved setting %s", key)
+    # The server answers with the full settings map, so it becomes the fresh cached copy
+    response_cache.put(settings_path, settings.json(), token=_token())
+    return settings.json()
+
+def patch_settings(key, patch):
+    """Send only the changed fields of a dict setting and return the server's settings."""
+    headers = {'Content-Type': 'application/json',
+               'Accept': 'application/json'}
+    token = _token()
+    cached = response_cache.get(settings_path, token=token, default={}) or {}
+    merged = dict(cached.get(key) or {}) | patch
+
+    def send():
+        response = client.request("PATCH", "/0/settings", data=json.dumps({"code": key, "value": patch}),
+                                  headers=headers)
+        if response.status_code in (404, 405):
+            # Older servers only accept whole-object writes
+            response = client.request("POST", "/0/settings", data=json.dumps({"code": key, "value": merged}),
+                                      headers=headers)
+        return response
+
+    # A queued write carries the whole merged value so later edits to the same key supersede it
+    response = settings_writer().send(f"settings:{key}", send, "POST", "/0/settings",
+                                      body={"code": key, "value": merged})
+    if response is None:
+        settings = dict(cached) | {key: merged}
+        response_cache.put(settings_path, settings, token=token)
+        return settings
+    response.raise_for_status()
+
+    settings = response.json()
+    if not isinstance(settings, dict) or key not in settings:
+        # The server only acknowledged the write, so apply the patch to our copy
+        settings = dict(cached) | {key: merged}
+    response_cache.put(settings_path, settings, token=token)
+    return settings
 
 def retrieve_settings():
+    """Return all settings, served from the revalidating cache when possible."""
+    settings = response_cache.get(settings_path, token=_token(), default={})
+    return settings if settings is not None else {}
+
+def _token():
     creds = credentials()
-    sundail_token = ""
-    cached_settings = cache.get(cache_key)
-    if cached_settings:
-        print("---------->",cached_settings)
-        return cached_settings
-    else:
-        if creds:
-            sundail_token = creds["token"] if creds['token'] else None
-        try:
-            sett = requests.get(host + "/0/getallsettings",
-                                headers={"Authorization": sundail_token})
-            settings = sett.json()
-            print(settings)
-        except:
-            settings = {}
-        return settings
\ No newline at end of file
+    return creds.get("token") if creds else None